@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+"""
+fbxtools benchmarks: fbxo decoding, Fbx helpers and client round trips
+against a local fake Freebox OS server. Results are printed as JSON.
+
+    python benchmarks/bench.py
+    python benchmarks/bench.py --only decode --output decode.json
+    python benchmarks/bench.py --record fixtures/
+    python benchmarks/bench.py --fixtures fixtures/
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+# benchmark the working tree, not an installed fbxtools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fbxtools.fbx import Fbx
+from fbxtools.fbxo import Calls, Contacts, LanHosts, Static_Leases
+from fbxtools.fakebox import FakeFreebox, FakeDataset
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+# size of the generated fixtures
+FIXTURE_SIZES = {
+    'calls': 10000,
+    'contacts': 5000,
+    'numbers_per_contact': 2,
+    'addresses_per_contact': 1,
+    'lanhosts': 2000,
+    'static_leases': 2000,
+    'dynamic_leases': 0,
+}
+
+# modules whose import is benchmarked: max milliseconds above a bare
+# interpreter start, modules they must not pull in
+IMPORT_BUDGETS = {
+    'fbxtools.fbx': (50, ('requests', 'urllib3', 'apize')),
+    'fbxtools.fbxo': (30, ('requests', 'urllib3', 'apize')),
+}
+
+_benchmarks = []
+
+
+def bench(name):
+    def register(func):
+        _benchmarks.append((name, func))
+        return func
+    return register
+
+
+def measure(run, items=1, repeat=5, setup=None):
+    """
+    Time run(setup()) repeat times, setup is not timed.
+    """
+    durations = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        gc.collect()
+        start = _clock()
+        run(arg)
+        durations.append(_clock() - start)
+    durations.sort()
+    return {
+        'items': items,
+        'repeat': repeat,
+        'min_s': durations[0],
+        'median_s': durations[len(durations) // 2],
+        'max_s': durations[-1],
+        'items_per_s': items / durations[0] if durations[0] else None,
+    }
+
+
+def load_fixtures(directory=None):
+    if directory is None:
+        return FakeDataset(**FIXTURE_SIZES).records()
+    fixtures = {}
+    for name in os.listdir(directory):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name)) as f:
+                fixtures[name[:-len('.json')]] = json.load(f)
+    return fixtures
+
+
+def record_fixtures(directory):
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    for name, records in FakeDataset(**FIXTURE_SIZES).records().items():
+        with open(os.path.join(directory, '%s.json' % name), 'w') as f:
+            json.dump(records, f)
+
+
+def _decoded(container_class, records):
+    container = container_class()
+    container.load_data(records)
+    return getattr(container, container._decoder().list_field[0])
+
+
+#
+# decoding
+#
+
+@bench('decode.calls')
+def bench_decode_calls(fixtures, options):
+    records = fixtures['calls']
+    return measure(lambda arg: Calls().load_data(records),
+                   items=len(records), repeat=options.repeat)
+
+
+@bench('decode.contacts')
+def bench_decode_contacts(fixtures, options):
+    records = fixtures['contacts']
+    return measure(lambda arg: Contacts().load_data(records),
+                   items=len(records), repeat=options.repeat)
+
+
+@bench('decode.lanhosts')
+def bench_decode_lanhosts(fixtures, options):
+    records = fixtures['lanhosts']
+    return measure(lambda arg: LanHosts().load_data(records),
+                   items=len(records), repeat=options.repeat)
+
+
+#
+# Fbx helpers
+#
+
+@bench('helpers.build_stlhostinfos')
+def bench_build_stlhostinfos(fixtures, options):
+    records = fixtures['static_leases']
+    app = Fbx('http://127.0.0.1:1/api/v3', mute=True)
+
+    def run(leases):
+        for stl in leases:
+            app._build_stlhostinfos(stl)
+
+    return measure(run, items=len(records), repeat=options.repeat,
+                   setup=lambda: _decoded(Static_Leases, records))
+
+
+@bench('helpers.fbobj2dict.calls')
+def bench_fbobj2dict_calls(fixtures, options):
+    calls = _decoded(Calls, fixtures['calls'])
+    return measure(lambda arg: [call.fbobj2dict() for call in calls],
+                   items=len(calls), repeat=options.repeat)
+
+
+@bench('helpers.fbobj2dict.contacts')
+def bench_fbobj2dict_contacts(fixtures, options):
+    contacts = _decoded(Contacts, fixtures['contacts'])
+    return measure(lambda arg: [contact.fbobj2dict() for contact in contacts],
+                   items=len(contacts), repeat=options.repeat)
+
+
+#
+# client round trips
+#
+
+def _import_time(statement, repeat):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    durations = []
+    for _ in range(repeat):
+        start = _clock()
+        output = subprocess.check_output([sys.executable, '-c', statement],
+                                         cwd=root)
+        durations.append(_clock() - start)
+    return min(durations), output
+
+
+@bench('import')
+def bench_import(fixtures, options):
+    baseline, _ = _import_time('pass', options.repeat)
+    results = {}
+    for module, (budget_ms, forbidden) in sorted(IMPORT_BUDGETS.items()):
+        duration, output = _import_time(
+            'import sys, %s; print(" ".join(sorted(sys.modules)))' % module,
+            options.repeat)
+        loaded = set(output.decode('utf8').split())
+        import_ms = (duration - baseline) * 1000
+        results[module] = {
+            'import_ms': import_ms,
+            'budget_ms': budget_ms,
+            'loaded': sorted(name for name in forbidden if name in loaded),
+            'over_budget': import_ms > budget_ms or
+                any(name in loaded for name in forbidden),
+        }
+    return results
+
+
+@bench('client')
+def bench_client(fixtures, options):
+    dataset = FakeDataset(**FIXTURE_SIZES)
+    results = {}
+    with FakeFreebox(dataset, latency=options.latency) as box:
+        directory = tempfile.mkdtemp()
+        app_infos, app_auth = box.write_app_files(directory)
+        app = Fbx(box.url, app_infos=app_infos, app_auth=app_auth,
+                  app_session=os.path.join(directory, 'app_session.json'),
+                  mute=True)
+        app.get_session_token()
+
+        results['get_session_token'] = measure(
+            lambda arg: app.get_session_token(use_cache=False),
+            repeat=options.repeat)
+        for name, run, items in (
+                ('get_boxinfos', app.get_boxinfos, 1),
+                ('get_contact', lambda: app.get_contact(1), 1),
+                ('get_calls', app.get_calls, len(dataset.calls)),
+                ('get_contacts', app.get_contacts, len(dataset.contacts)),
+                ('get_lanhosts', lambda: app.get_lanhosts(args={'interface': 'pub'}),
+                 len([h for h in dataset.lanhosts if h['interface'] == 'pub'])),
+                ('get_stleases', app.get_stleases, len(dataset.static_leases))):
+            results[name] = measure(lambda arg, run=run: run(), items=items,
+                                    repeat=options.repeat)
+        app.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='fbxtools benchmarks')
+    parser.add_argument('--only', action='append', default=[],
+                        help='run the benchmarks whose name starts with this')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='fake server latency in seconds')
+    parser.add_argument('--fixtures', help='load recorded fixtures from there')
+    parser.add_argument('--record', help='write the fixtures there and exit')
+    parser.add_argument('--output', help='write the JSON results there')
+    parser.add_argument('--check', action='store_true',
+                        help='exit with status 1 if an import is over budget')
+    options = parser.parse_args()
+
+    if options.record:
+        record_fixtures(options.record)
+        return
+
+    fixtures = load_fixtures(options.fixtures)
+    report = {
+        'fbxtools': Fbx('http://127.0.0.1:1/api/v3', mute=True).version,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'time': int(time.time()),
+        'options': {'repeat': options.repeat, 'latency': options.latency,
+                    'fixtures': options.fixtures},
+        'results': {},
+    }
+    for name, func in _benchmarks:
+        if options.only and not any(name.startswith(prefix)
+                                    for prefix in options.only):
+            continue
+        report['results'][name] = func(fixtures, options)
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    over_budget = [module for module, result
+                   in report['results'].get('import', {}).items()
+                   if result['over_budget']]
+    if options.check and over_budget:
+        sys.exit('import over budget: %s' % ', '.join(over_budget))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@
 # -*- coding: utf8 -*-
 
 from fbxtools.fbx import *
+from fbxtools.export import CallSink
 import time
 import datetime
 
@@ -45,31 +46,17 @@ if __name__ == "__main__":
 	# update calls
 	#
 
-	nbcalls = 0
-	nbinserts = 0
-		
 	(cnx,cursor) = get_cursor()
-	
-	query = "SELECT `id` FROM `calls` ORDER BY `id` DESC LIMIT 1;"
-	cursor.execute(query)
-	for row in cursor :
-		last_id = row[0]
-	
-	for call in app.calls:
-		nbcalls += 1
-		st = str(call.datetime)
-		curr_id = int(call.id)
-		if curr_id > last_id :
-			nbinserts += 1
-			query = "INSERT INTO `FREEBOX`.`calls` (`id`, `type`, `datetime`, `number`, `name`, `duration`, `new`, `contact_id`) VALUES ('%s', '%s', '%s', '%s', '%s', '%s', %s, '%s');"\
-				% (call.id,call.type,st,call.number,call.name,call.duration,call.new,call.contact_id)
-			print (query)
-			cursor.execute(query)
-	cnx.commit()
+	cursor.close()
+
+	# only the calls newer than the last stored id are decoded,
+	# then upserted oldest first with executemany batches
+	sink = CallSink(cnx, table='calls')
+	(nbinserts, last_id) = sink.sync(app)
 	cnx.close()
 	
 	if mute == False :
-		print ("\r\nNb calls: %d, nb inserts: %d\r\n" % (nbcalls,nbinserts))
+		print ("\r\nNb inserts: %d, last id: %s\r\n" % (nbinserts,last_id))
 		
 	quit()
 	
@@ -91,7 +91,6 @@ for number in contact.numbers:
     print("=====================")
     print(number)
     print(app.delete_number(number_id))
-    print_number(app,number_id)
 print_contact(app,contact_id)
 
 # address
@@ -18,7 +18,7 @@ def main():
     for sl in stls:
         print(u'+++')
         print(u'mac: %s' % (str(sl.mac)))
-        print(u'sl: %s' % (sl.__dict__))
+        print(u'sl: %s' % (sl.fbobj2dict()))
         print(u'id: %s' % (sl.id))
         print(u'mac: %s' % (sl.mac))
         print(u'ip %s:' % (sl.ip))
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+"""
+asyncio front end for Fbx.
+
+Requests run on the pooled Fbx transport from a bounded thread pool, so
+many of them can be in flight from one event loop while the results are
+the very same fbxo objects the synchronous API returns.
+
+    app = AsyncFbx('http://mafreebox.freebox.fr/api/v3')
+    await app.get_session_token()
+    calls, contacts = await asyncio.gather(app.get_calls(), app.get_contacts())
+    found = await asyncio.gather(*[app.get_contact(i) for i in ids])
+    async for call in app.iter_calls_since(last_id):
+        ...
+"""
+
+import asyncio
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+from fbxtools.fbx import Fbx
+
+
+def _run(executor, func, *args, **kwargs):
+    loop = asyncio.get_event_loop()
+    return loop.run_in_executor(executor,
+                                functools.partial(func, *args, **kwargs))
+
+
+def _executor_of(fbxobj):
+    executor = getattr(fbxobj._fbx, '_executor', None)
+    if executor is None:
+        raise ValueError('%s is not bound to an AsyncFbx' % fbxobj.__class__.__name__)
+    return executor
+
+
+async def get_by_id(fbxobj, id=None, data={}, params={}, args={}):
+    return await _run(_executor_of(fbxobj), fbxobj.get_by_id,
+                      id=id, data=data, params=params, args=args)
+
+
+async def set_by_id(fbxobj, id, data):
+    return await _run(_executor_of(fbxobj), fbxobj.set_by_id, id, data)
+
+
+async def new_fbxobj(fbxobj, data):
+    return await _run(_executor_of(fbxobj), fbxobj.new_fbxobj, data)
+
+
+async def delete_by_id(fbxobj, id):
+    return await _run(_executor_of(fbxobj), fbxobj.delete_by_id, id)
+
+
+def _async_method(name):
+    sync_method = getattr(Fbx, name)
+
+    async def method(self, *args, **kwargs):
+        return await _run(self._executor, getattr(self.fbx, name),
+                          *args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = sync_method.__doc__
+    return method
+
+
+class _AsyncIterator(object):
+    """
+    Async iterator over a synchronous one (iter_* streams): each next()
+    runs in the executor. Other attributes (CallLog.high_water) are the
+    ones of the wrapped iterator.
+    """
+
+    def __init__(self, executor, iterator):
+        self._executor = executor
+        self._iterator = iterator
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        elem = await _run(self._executor, next, self._iterator, _END)
+        if elem is _END:
+            raise StopAsyncIteration
+        return elem
+
+    def __getattr__(self, name):
+        return getattr(self._iterator, name)
+
+
+_END = object()
+
+
+def _async_iter_method(name):
+    sync_method = getattr(Fbx, name)
+
+    def method(self, *args, **kwargs):
+        # creating the iterator sends nothing, requests start on iteration
+        return _AsyncIterator(self._executor,
+                              iter(getattr(self.fbx, name)(*args, **kwargs)))
+
+    method.__name__ = name
+    method.__doc__ = sync_method.__doc__
+    return method
+
+
+# Fbx methods sending no request, called directly (lanhost_events runs
+# its own thread)
+_SYNC_METHODS = ('close', 'invalidate', 'stats', 'reset_stats',
+                 'lanhost_events')
+
+
+def _fbx_methods():
+    # every public Fbx method, so that AsyncFbx cannot drift from Fbx
+    return tuple(sorted(name for name, value in vars(Fbx).items()
+                        if not name.startswith('_') and inspect.isfunction(value)))
+
+
+class AsyncFbx(object):
+    """
+    Same surface as Fbx: every public Fbx method is a coroutine, except
+    the iter_* streams, async iterators here, and the methods in
+    _sync_methods. Collection properties (calls, contacts...) are
+    reached through their get_* coroutine.
+    """
+
+    _sync_methods = _SYNC_METHODS
+
+    _methods = tuple(name for name in _fbx_methods()
+                     if name not in _SYNC_METHODS)
+
+    def __init__(self, url, app_infos='app_infos.json',
+                 app_auth='app_auth.json', verify_cert=False, mute=False,
+                 timeout=8, max_workers=16, **options):
+        self.fbx = Fbx(url, app_infos=app_infos, app_auth=app_auth,
+                       verify_cert=verify_cert, mute=mute, timeout=timeout,
+                       pool_maxsize=max_workers, **options)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # fbxo objects built through self.fbx reach the executor from
+        # their _fbx back-pointer
+        self.fbx._executor = self._executor
+
+    @property
+    def url(self):
+        return self.fbx.url
+
+    @property
+    def permissions(self):
+        return self.fbx.permissions
+
+    def stats(self):
+        return self.fbx.stats()
+
+    def reset_stats(self):
+        self.fbx.reset_stats()
+
+    def invalidate(self, *names):
+        self.fbx.invalidate(*names)
+
+    def lanhost_events(self, *args, **kwargs):
+        return self.fbx.lanhost_events(*args, **kwargs)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.fbx.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+
+for _name in AsyncFbx._methods:
+    if _name.startswith('iter_'):
+        setattr(AsyncFbx, _name, _async_iter_method(_name))
+    else:
+        setattr(AsyncFbx, _name, _async_method(_name))
+del _name
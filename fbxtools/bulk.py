@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from __future__ import absolute_import
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from fbxtools.fbxo import FreeboxObj, Contact, Number, Address, Email, Url
+
+# Contact fields holding sub-resources, created after the contact
+_SUBRESOURCES = (
+    ('numbers', Number),
+    ('addresses', Address),
+    ('emails', Email),
+    ('urls', Url),
+)
+
+
+class BulkResult(object):
+    """
+    Outcome of one item of a bulk import: the created contact (None if
+    its creation failed) and the errors met, sub-resources included.
+    """
+
+    __slots__ = ('item', 'contact', 'errors')
+
+    def __init__(self, item):
+        self.item = item
+        self.contact = None
+        self.errors = []
+
+    @property
+    def ok(self):
+        return self.contact is not None and not self.errors
+
+    def __repr__(self):
+        return '<BulkResult ok=%s contact=%s errors=%s>' % (
+            self.ok, getattr(self.contact, 'id', None), self.errors)
+
+
+# fields set by the box, not sent when creating a copy
+_SERVER_FIELDS = ('id', 'contact_id', 'last_update', 'photo_url')
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return int(time.mktime(value.timetuple()))
+    if isinstance(value, timedelta):
+        return int(value.total_seconds())
+    return value
+
+
+def _as_dict(obj):
+    if isinstance(obj, FreeboxObj):
+        obj = obj.fbobj2dict()
+    return dict((field_name, _json_value(value))
+                for field_name, value in dict(obj).items()
+                if field_name not in _SERVER_FIELDS)
+
+
+def _split_contact(item):
+    contactinfos = _as_dict(item)
+    subresources = []
+    for field_name, fbxobj_class in _SUBRESOURCES:
+        for sub in contactinfos.pop(field_name, None) or []:
+            subresources.append((field_name, fbxobj_class, _as_dict(sub)))
+    return contactinfos, subresources
+
+
+def _new_contact(fbx, result, contactinfos):
+    try:
+        contact = Contact(fbx=fbx)
+        contact.load_data(fbx.request_result(Contact._url_get, method='POST',
+                                             data=contactinfos))
+        result.contact = contact
+    # a bad item must not abort the batch, every item gets its result
+    except Exception as e:
+        result.errors.append(e)
+
+
+def _new_subresource(fbx, result, fbxobj_class, data):
+    data['contact_id'] = result.contact.id
+    data.pop('id', None)
+    try:
+        sub = fbxobj_class()
+        sub.load_data(fbx.request_result(fbxobj_class._url_get, method='POST',
+                                         data=data))
+        return sub
+    except Exception as e:
+        result.errors.append(e)
+
+
+def bulk_new_contacts(fbx, contacts, max_workers=8):
+    """
+    Create contacts (dicts or Contact objects, numbers/addresses/emails/
+    urls included) with at most max_workers requests in flight: the
+    contacts first, then all their sub-resources.
+    Return one BulkResult per contact, in order.
+    """
+    items = []
+    for item in contacts:
+        result = BulkResult(item)
+        try:
+            items.append((result, _split_contact(item)))
+        except Exception as e:
+            result.errors.append(e)
+            items.append((result, None))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_new_contact, fbx, result, infos[0])
+                   for result, infos in items if infos is not None]
+        for future in futures:
+            future.result()
+
+        futures = []
+        for result, infos in items:
+            if result.contact is None:
+                continue
+            for field_name, fbxobj_class, data in infos[1]:
+                futures.append((result, field_name,
+                                executor.submit(_new_subresource, fbx, result,
+                                                fbxobj_class, data)))
+        for result, field_name, future in futures:
+            sub = future.result()
+            if sub is None:
+                continue
+            if getattr(result.contact, field_name, None) is None:
+                setattr(result.contact, field_name, [])
+            getattr(result.contact, field_name).append(sub)
+
+    return [result for result, infos in items]
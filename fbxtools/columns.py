@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+"""
+Column oriented call log, built from the /call/log/ JSON records without
+a Call object per row.
+
+    columns = app.calls_frame()                  # numpy, arrow or array
+    columns = app.calls_frame(backend='array')   # {'id': array('q'), ...}
+"""
+
+from __future__ import absolute_import
+
+from array import array
+from datetime import datetime
+
+# (column, array typecode or None for strings)
+CALL_COLUMNS = (
+    ('id', 'q'),
+    ('type', None),
+    ('datetime', 'q'),
+    ('duration', 'q'),
+    ('number', None),
+    ('contact_id', 'q'),
+    ('line_id', 'q'),
+)
+
+BACKENDS = ('numpy', 'arrow', 'array')
+
+
+def _raw_record(call):
+    """
+    Column values of a Call object, as they came in the JSON.
+    """
+    record = {}
+    for column, typecode in CALL_COLUMNS:
+        value = getattr(call, column, None)
+        if isinstance(value, datetime):
+            value = int(value.timestamp())
+        elif hasattr(value, 'total_seconds'):
+            value = int(value.total_seconds())
+        record[column] = value
+    return record
+
+
+def array_columns(records):
+    """
+    One pass over call records (dicts or Call objects): int64 array
+    columns, str lists for type and number. datetime is in epoch seconds.
+    """
+    columns = dict((column, array(typecode) if typecode else [])
+                   for column, typecode in CALL_COLUMNS)
+    ids, types, times, durations, numbers, contact_ids, line_ids = (
+        columns[column] for column, typecode in CALL_COLUMNS)
+    for record in records:
+        if not isinstance(record, dict):
+            record = _raw_record(record)
+        get = record.get
+        ids.append(get('id') or 0)
+        types.append(get('type') or '')
+        times.append(get('datetime') or 0)
+        durations.append(get('duration') or 0)
+        numbers.append(get('number') or '')
+        contact_ids.append(get('contact_id') or 0)
+        line_ids.append(get('line_id') or 0)
+    return columns
+
+
+def _numpy_columns(columns, numpy):
+    size = len(columns['id'])
+    dtype = []
+    for column, typecode in CALL_COLUMNS:
+        if column == 'datetime':
+            dtype.append((column, 'datetime64[s]'))
+        elif typecode:
+            dtype.append((column, 'i8'))
+        else:
+            width = max([len(value) for value in columns[column]] or [1])
+            dtype.append((column, 'U%d' % width))
+    frame = numpy.empty(size, dtype=dtype)
+    for column, typecode in CALL_COLUMNS:
+        if typecode:
+            values = numpy.frombuffer(columns[column], dtype='i8')
+            if column == 'datetime':
+                values = values.astype('datetime64[s]')
+            frame[column] = values
+        else:
+            frame[column] = columns[column]
+    return frame
+
+
+def _arrow_columns(columns, pyarrow):
+    arrays = []
+    for column, typecode in CALL_COLUMNS:
+        if column == 'datetime':
+            arrays.append(pyarrow.array(columns[column], type=pyarrow.int64())
+                          .cast(pyarrow.timestamp('s')))
+        elif typecode:
+            arrays.append(pyarrow.array(columns[column], type=pyarrow.int64()))
+        else:
+            arrays.append(pyarrow.array(columns[column], type=pyarrow.string()))
+    return pyarrow.Table.from_arrays(
+        arrays, names=[column for column, typecode in CALL_COLUMNS])
+
+
+_MODULES = {'numpy': 'numpy', 'arrow': 'pyarrow'}
+
+
+def _available_backend():
+    for backend in ('numpy', 'arrow'):
+        try:
+            __import__(_MODULES[backend])
+            return backend
+        except ImportError:
+            pass
+    return 'array'
+
+
+def call_columns(records, backend=None):
+    """
+    Call records as a numpy structured array, a pyarrow Table or a dict
+    of array columns. backend None picks the first one importable.
+    """
+    if backend is None:
+        backend = _available_backend()
+    if backend not in BACKENDS:
+        raise ValueError('unknown backend %r, not in %s' % (backend, BACKENDS))
+    if backend == 'array':
+        return array_columns(records)
+    # fail before reading the records if the backend is missing
+    module = __import__(_MODULES[backend])
+    if backend == 'numpy':
+        return _numpy_columns(array_columns(records), module)
+    return _arrow_columns(array_columns(records), module)
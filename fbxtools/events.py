@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import socket
+import threading
+import traceback
+
+from fbxtools.exceptions import FbxRequestError, FbxSessionToken
+from fbxtools.fbxo import LanHost
+from fbxtools.websocket import WebSocket
+
+LANHOST_EVENTS = ('lan_host_l3addr_reachable', 'lan_host_l3addr_unreachable')
+
+
+class LanHostEvents(object):
+    """
+    LAN host table kept current by the Freebox OS event websocket
+    (url + '/ws/event', Freebox OS API v8 and later).
+
+        events = app.lanhost_events()
+
+        @events.on('lan_host_l3addr_unreachable')
+        def gone(event, host, previous):
+            print(host.primary_name, 'left')
+
+        events.start()          # background thread, or events.run()
+        ...
+        events.stop()
+
+    connected is set once the run loop is registered and loaded.
+    hosts holds the LanHost objects by id: loaded from the LAN browser of
+    each interface on (re)connection, then updated by the notifications.
+    Handlers get (event name, new LanHost, previous LanHost or None);
+    '*' handlers get every event.
+    """
+
+    def __init__(self, fbx, events=LANHOST_EVENTS, interfaces=None,
+                 reconnect_delay=5, timeout=8):
+        self.fbx = fbx
+        self.events = tuple(events)
+        self.interfaces = interfaces
+        self.reconnect_delay = reconnect_delay
+        self.timeout = timeout
+        self.hosts = {}
+        self.connected = threading.Event()
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._ws = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return self.fbx.url + '/ws/event'
+
+    def on(self, event, handler=None):
+        """
+        Call handler(event, host, previous) on event, usable as a
+        decorator.
+        """
+        if handler is None:
+            return lambda handler: self.on(event, handler)
+        self._handlers.setdefault(event, []).append(handler)
+        return handler
+
+    def load(self):
+        """
+        (Re)load the host table from the LAN browser of every interface.
+        """
+        hosts = dict((host.id, host) for host in
+                     self.fbx.get_all_lanhosts(interfaces=self.interfaces).values())
+        with self._lock:
+            self.hosts = hosts
+        return hosts
+
+    def connect(self):
+        """
+        Open the websocket (logging in again once if the session
+        expired) and register to the events.
+        """
+        token = self.fbx.transport.headers.get('X-Fbx-App-Auth')
+        try:
+            ws = self._open()
+        except FbxRequestError as e:
+            if e.err_code != 'auth_required':
+                raise
+            self.fbx._renew_session(token)
+            ws = self._open()
+        ws.send_json({'action': 'register', 'events': list(self.events)})
+        while True:
+            answer = ws.recv_json(timeout=self.timeout)
+            if answer is None:
+                raise FbxRequestError('websocket', 'closed while registering')
+            if answer.get('action') == 'register':
+                break
+        if not answer.get('success'):
+            ws.close()
+            raise FbxRequestError(answer.get('error_code', 'websocket'),
+                                  answer.get('msg', answer))
+        self._ws = ws
+        return ws
+
+    def _open(self):
+        return WebSocket(self.url, headers=dict(self.fbx.transport.headers),
+                         timeout=self.timeout,
+                         verify_cert=self.fbx.transport.verify_cert)
+
+    def poll(self, timeout=None):
+        """
+        Wait for one message and apply it, return it (None once the
+        websocket is closed, socket.timeout if nothing came in time).
+        """
+        message = self._ws.recv_json(timeout=timeout)
+        if message is None:
+            self.connected.clear()
+            return None
+        if message.get('action') == 'notification':
+            self._notification(message)
+        return message
+
+    def _notification(self, message):
+        name = '%s_%s' % (message.get('source'), message.get('event'))
+        result = message.get('result')
+        if message.get('source') != 'lan_host' or not isinstance(result, dict):
+            self._call(name, None, None)
+            return
+        with self._lock:
+            previous = self.hosts.get(result.get('id'))
+            interface = result.get('interface') or getattr(
+                previous, '_interface_name', None) or 'pub'
+            host = LanHost(data=result, args={'interface': interface})
+            self.hosts[host.id] = host
+        self._call(name, host, previous)
+
+    def _call(self, name, host, previous):
+        for handler in self._handlers.get(name, []) + self._handlers.get('*', []):
+            try:
+                handler(name, host, previous)
+            except Exception:
+                traceback.print_exc()
+
+    def run(self):
+        """
+        Follow the events until stop(): reconnect after reconnect_delay
+        seconds when the websocket drops, reloading the host table since
+        events may have been missed meanwhile.
+        """
+        while not self._stopped.is_set():
+            try:
+                self.connect()
+                self.load()
+                self.connected.set()
+                while not self._stopped.is_set():
+                    try:
+                        if self.poll(timeout=1) is None:
+                            break
+                    except socket.timeout:
+                        continue
+            # box rebooting: connection closed during the handshake, login
+            # refused... reconnect later
+            except (FbxRequestError, FbxSessionToken, socket.error,
+                    EOFError, ValueError) as e:
+                if not self.fbx.mute:
+                    print(u'lanhost events: %s' % e)
+            finally:
+                self._close()
+            self._stopped.wait(self.reconnect_delay)
+        self._stopped.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _close(self):
+        self.connected.clear()
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -8,3 +8,9 @@ class FbxSessionToken(Exception):
 class FbxAppToken(Exception):
 	def __init__(self, err_code, err_msg):
 		Exception.__init__(self, '[%s] %s' % (err_code, err_msg))
+
+
+class FbxRequestError(Exception):
+	def __init__(self, err_code, err_msg):
+		Exception.__init__(self, '[%s] %s' % (err_code, err_msg))
+		self.err_code = err_code
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from __future__ import absolute_import
+
+import re
+import sys
+from datetime import datetime
+
+# same columns as the calls table of examples/calls2db.py
+COLUMNS = ('id', 'type', 'datetime', 'number', 'name', 'duration', 'new',
+           'contact_id')
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+_CREATE = {
+    'sqlite': 'CREATE TABLE IF NOT EXISTS %s ('
+              'id INTEGER PRIMARY KEY, type TEXT NOT NULL, '
+              'datetime TEXT NOT NULL, number TEXT NOT NULL, '
+              'name TEXT NOT NULL, duration INTEGER NOT NULL, '
+              'new INTEGER NOT NULL, contact_id INTEGER NOT NULL)',
+    'mysql': 'CREATE TABLE IF NOT EXISTS `%s` ('
+             '`id` int(11) NOT NULL, `type` varchar(16) NOT NULL, '
+             '`datetime` datetime NOT NULL, `number` varchar(40) NOT NULL, '
+             '`name` varchar(80) NOT NULL, `duration` int(11) NOT NULL, '
+             '`new` tinyint(1) NOT NULL, `contact_id` int(11) NOT NULL, '
+             'PRIMARY KEY (`id`)'
+             ') DEFAULT CHARSET=utf8',
+}
+
+_PLACEHOLDERS = {
+    'qmark': '?',
+    'format': '%s',
+    'pyformat': '%s',
+}
+
+
+def call_row(call):
+    """
+    Column values of a Call object or of a raw /call/log/ dict.
+    """
+    if isinstance(call, dict):
+        values = call
+        when = datetime.fromtimestamp(call['datetime'])
+    else:
+        values = dict((column, getattr(call, column, None))
+                      for column in COLUMNS)
+        when = call.datetime
+        if not isinstance(when, datetime):
+            when = datetime.fromtimestamp(when)
+    return (
+        values['id'],
+        values.get('type') or '',
+        when.strftime('%Y-%m-%d %H:%M:%S'),
+        values.get('number') or '',
+        values.get('name') or '',
+        int(values.get('duration') or 0),
+        int(bool(values.get('new'))),
+        values.get('contact_id') or 0,
+    )
+
+
+class CallSink(object):
+    """
+    Write calls to a SQLite or MySQL compatible DB-API connection:
+    upsert on id with executemany batches, committed in chunks.
+
+        sink = CallSink(sqlite3.connect('calls.db'))
+        sink.create_table()
+        written, high_water = sink.sync(app)
+    """
+
+    def __init__(self, connection, table='calls', dialect=None,
+                 paramstyle=None, batch_size=500, commit_every=5000):
+        if not _IDENTIFIER.match(table):
+            raise ValueError('invalid table name %r' % table)
+        module = sys.modules.get(type(connection).__module__.split('.')[0])
+        if dialect is None:
+            dialect = 'sqlite' if 'sqlite' in type(connection).__module__ \
+                else 'mysql'
+        if paramstyle is None:
+            paramstyle = getattr(module, 'paramstyle', 'format')
+        if dialect not in _CREATE:
+            raise ValueError('unknown dialect %r' % dialect)
+
+        self.connection = connection
+        self.table = table
+        self.dialect = dialect
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+
+        placeholders = ', '.join(
+            [_PLACEHOLDERS.get(paramstyle, '%s')] * len(COLUMNS))
+        if dialect == 'sqlite':
+            self._upsert = 'INSERT OR REPLACE INTO %s (%s) VALUES (%s)' % (
+                table, ', '.join(COLUMNS), placeholders)
+        else:
+            self._upsert = 'INSERT INTO `%s` (%s) VALUES (%s) ' \
+                'ON DUPLICATE KEY UPDATE %s' % (
+                    table, ', '.join('`%s`' % c for c in COLUMNS), placeholders,
+                    ', '.join('`%s`=VALUES(`%s`)' % (c, c) for c in COLUMNS[1:]))
+
+    def create_table(self):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(_CREATE[self.dialect] % self.table)
+        finally:
+            cursor.close()
+        self.connection.commit()
+
+    def last_id(self):
+        """
+        Highest call id stored, None for an empty table.
+        """
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute('SELECT MAX(id) FROM %s' % self.table)
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        return row[0] if row else None
+
+    def write(self, calls):
+        """
+        Upsert calls (Call objects or raw dicts), return how many rows
+        were written.
+        """
+        return self.write_rows(call_row(call) for call in calls)
+
+    def write_rows(self, rows):
+        """
+        Upsert rows built by call_row with executemany batches of
+        batch_size, committing every commit_every rows and at the end.
+        """
+        cursor = self.connection.cursor()
+        written = 0
+        uncommitted = 0
+        batch = []
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) < self.batch_size:
+                    continue
+                cursor.executemany(self._upsert, batch)
+                written += len(batch)
+                uncommitted += len(batch)
+                batch = []
+                if uncommitted >= self.commit_every:
+                    self.connection.commit()
+                    uncommitted = 0
+            if batch:
+                cursor.executemany(self._upsert, batch)
+                written += len(batch)
+            self.connection.commit()
+        finally:
+            cursor.close()
+        return written
+
+    def sync(self, fbx, last_id=None):
+        """
+        Store the calls of fbx newer than last_id (the highest stored id
+        by default). Return (rows written, high water id).
+        The new calls are written oldest first, so an interrupted sync
+        never leaves a gap below the highest stored id.
+        """
+        if last_id is None:
+            last_id = self.last_id()
+        calllog = fbx.iter_calls_since(last_id)
+        rows = [call_row(call) for call in calllog]
+        rows.reverse()
+        return self.write_rows(rows), calllog.high_water
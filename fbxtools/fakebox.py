@@ -0,0 +1,1031 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+"""
+Local stand-in for a Freebox OS server, for offline tests and benchmarks.
+
+    with FakeFreebox(dataset=FakeDataset(calls=10000), latency=0.005) as box:
+        box.write_app_files('/tmp/fbx')
+        app = Fbx(box.url, app_infos='/tmp/fbx/app_infos.json',
+                  app_auth='/tmp/fbx/app_auth.json')
+        app.get_session_token()
+        app.get_calls()
+
+or from a shell: python -m fbxtools.fakebox --port 8080 --calls 10000
+"""
+
+import argparse
+import copy
+import hmac
+import json
+import os
+import random
+import re
+import string
+import sys
+import threading
+import time
+from hashlib import sha1
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qsl
+
+from fbxtools.websocket import (accept_key, encode_frame, read_frame,
+                                OP_TEXT, OP_CLOSE, OP_PING, OP_PONG)
+
+API_VERSION = '3.0'
+
+_ALL_PERMISSIONS = {
+    'pvr': True, 'explorer': True, 'calls': True, 'contacts': True,
+    'tv': True, 'parental': True, 'settings': True, 'downloader': True,
+}
+
+_FIRST_NAMES = ('Jean', 'Marie', 'Pierre', 'Sophie', 'Luc', 'Julie',
+                'Paul', 'Claire', 'Louis', 'Emma')
+_LAST_NAMES = ('Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert',
+               'Richard', 'Petit', 'Durand', 'Leroy', 'Moreau')
+_VENDORS = ('Apple, Inc.', 'Samsung Electronics', 'Intel Corporate',
+            'Raspberry Pi Foundation', 'Sonos, Inc.', '')
+_HOST_TYPES = ('smartphone', 'workstation', 'laptop', 'tablet',
+               'multimedia_device', 'printer', 'other')
+_CALL_TYPES = ('missed', 'accepted', 'outgoing')
+
+
+def _mac(index):
+    return '00:24:d4:%02x:%02x:%02x' % ((index >> 16) & 0xff,
+                                        (index >> 8) & 0xff, index & 0xff)
+
+
+def _ipv4(index):
+    return '192.168.%d.%d' % (index // 250, 10 + index % 250)
+
+
+def _phone(rand):
+    return '0%d%s' % (rand.randint(1, 9),
+                      ''.join(rand.choice(string.digits) for _ in range(8)))
+
+
+class FakeDataset(object):
+    """
+    Deterministic content of a FakeFreebox, sized by its arguments.
+    LAN hosts, leases and port forwards share the same MAC/IP plan.
+    """
+
+    def __init__(self, calls=100, contacts=50, numbers_per_contact=2,
+                 addresses_per_contact=1, emails_per_contact=1,
+                 urls_per_contact=0, groups=3, lanhosts=20,
+                 interfaces=('pub', 'wifiguest'), static_leases=10,
+                 dynamic_leases=20, fwredirs=5, seed=0, now=1500000000):
+        rand = random.Random(seed)
+        self.now = now
+        self.interfaces = list(interfaces)
+
+        self.groups = [{'id': i + 1, 'name': 'Group %d' % (i + 1),
+                        'nb_contact': 0} for i in range(groups)]
+
+        self.contacts = []
+        self.numbers = []
+        self.addresses = []
+        self.emails = []
+        self.urls = []
+        self.contact_groups = []
+        for i in range(contacts):
+            first = rand.choice(_FIRST_NAMES)
+            last = rand.choice(_LAST_NAMES)
+            contact_id = i + 1
+            self.contacts.append({
+                'id': contact_id, 'first_name': first, 'last_name': last,
+                'display_name': '%s, %s' % (last.upper(), first),
+                'company': rand.choice(('', 'Free', 'Iliad', 'ACME')),
+                'notes': '', 'birthday': '', 'photo_url': '',
+                'last_update': now - rand.randint(0, 10 ** 7),
+            })
+            for j in range(numbers_per_contact):
+                self.numbers.append({
+                    'id': len(self.numbers) + 1, 'contact_id': contact_id,
+                    'number': _phone(rand),
+                    'type': rand.choice(('fixed', 'mobile', 'work')),
+                    'is_default': j == 0, 'is_own': False,
+                })
+            for j in range(addresses_per_contact):
+                self.addresses.append({
+                    'id': len(self.addresses) + 1, 'contact_id': contact_id,
+                    'number': str(rand.randint(1, 200)),
+                    'street': 'rue %s' % rand.choice(_LAST_NAMES),
+                    'street2': '', 'city': 'Paris', 'zipcode': '75008',
+                    'country': 'fr', 'type': 'home',
+                })
+            for j in range(emails_per_contact):
+                self.emails.append({
+                    'id': len(self.emails) + 1, 'contact_id': contact_id,
+                    'email': '%s.%s%d@example.com' % (first.lower(),
+                                                       last.lower(), i),
+                    'type': 'home',
+                })
+            for j in range(urls_per_contact):
+                self.urls.append({
+                    'id': len(self.urls) + 1, 'contact_id': contact_id,
+                    'url': 'http://example.com/%d' % contact_id,
+                    'type': 'site',
+                })
+            if self.groups and rand.random() < 0.3:
+                group = rand.choice(self.groups)
+                group['nb_contact'] += 1
+                self.contact_groups.append((group['id'], contact_id))
+
+        all_numbers = [number['number'] for number in self.numbers]
+        owners = dict((number['number'], number['contact_id'])
+                      for number in self.numbers)
+        self.calls = []
+        for i in range(calls):
+            known = all_numbers and rand.random() < 0.5
+            number = rand.choice(all_numbers) if known else _phone(rand)
+            contact_id = 0
+            name = number
+            if known:
+                contact_id = owners[number]
+                name = self.contacts[contact_id - 1]['display_name']
+            call_type = rand.choice(_CALL_TYPES)
+            self.calls.append({
+                'id': i + 1, 'type': call_type, 'number': number,
+                'name': name, 'contact_id': contact_id, 'line_id': 0,
+                'datetime': now - (calls - i) * 600,
+                'duration': 0 if call_type == 'missed' else rand.randint(1, 900),
+                'new': i >= calls - 5,
+            })
+
+        self.lanhosts = []
+        for i in range(lanhosts):
+            mac = _mac(i)
+            last_activity = now - rand.randint(0, 86400)
+            reachable = rand.random() < 0.7
+            name = '%s-%d' % (rand.choice(_HOST_TYPES), i)
+            self.lanhosts.append({
+                'id': 'ether-%s' % mac, 'primary_name': name,
+                'host_type': rand.choice(_HOST_TYPES),
+                'primary_name_manual': False,
+                'l2ident': {'id': mac, 'type': 'mac_address'},
+                'vendor_name': rand.choice(_VENDORS),
+                'persistent': True, 'reachable': reachable,
+                'last_time_reachable': last_activity,
+                'active': reachable, 'last_activity': last_activity,
+                'interface': self.interfaces[i % len(self.interfaces)]
+                if self.interfaces else 'pub',
+                'names': [{'name': name, 'source': 'dhcp'}],
+                'l3connectivities': [
+                    {'addr': _ipv4(i), 'af': 'ipv4', 'active': reachable,
+                     'reachable': reachable, 'last_activity': last_activity,
+                     'last_time_reachable': last_activity},
+                    {'addr': 'fe80::224:d4ff:fe%02x:%02x%02x' % (
+                        (i >> 16) & 0xff, (i >> 8) & 0xff, i & 0xff),
+                     'af': 'ipv6', 'active': reachable,
+                     'reachable': reachable, 'last_activity': last_activity,
+                     'last_time_reachable': last_activity},
+                ],
+            })
+
+        self.static_leases = []
+        for i in range(static_leases):
+            self.static_leases.append({
+                'id': _mac(i), 'mac': _mac(i), 'ip': _ipv4(i),
+                'comment': 'static %d' % i,
+                'hostname': self._hostname(i),
+            })
+
+        self.dynamic_leases = []
+        for i in range(dynamic_leases):
+            index = static_leases + i
+            self.dynamic_leases.append({
+                'mac': _mac(index), 'ip': _ipv4(index),
+                'hostname': self._hostname(index),
+                'assign_time': now - 3600, 'refresh_time': now - 600,
+                'lease_remaining': 36000, 'is_static': False,
+            })
+
+        self.fwredirs = []
+        for i in range(fwredirs):
+            self.fwredirs.append({
+                'id': i + 1, 'enabled': True, 'comment': 'redir %d' % i,
+                'ip_proto': 'tcp' if i % 2 == 0 else 'udp',
+                'wan_port_start': 10000 + i, 'wan_port_end': 10000 + i,
+                'lan_port': 22 + i, 'lan_ip': _ipv4(i), 'src_ip': '0.0.0.0',
+                'hostname': self._hostname(i),
+            })
+
+        self.system = {
+            'uptime': '3 jours 2 heures 1 minute 5 secondes',
+            'uptime_val': 266465, 'disk_status': 'active',
+            'fan_rpm': 2100, 'temp_cpub': 60, 'temp_cpum': 55,
+            'temp_sw': 50, 'board_name': 'fbxgw-r2/full',
+            'mac': 'F4:CA:E5:00:00:01', 'serial': '123456F000000001',
+            'firmware_version': '4.0.7', 'box_authenticated': True,
+        }
+
+    def _hostname(self, index):
+        if index < len(self.lanhosts):
+            return self.lanhosts[index]['primary_name']
+        return 'host-%d' % index
+
+    def records(self):
+        """
+        The list 'result' of each endpoint as the server answers it:
+        contacts with their sub-resources, leases with their host.
+        """
+        subs = {}
+        for field_name, rows in (('numbers', self.numbers),
+                                 ('addresses', self.addresses),
+                                 ('emails', self.emails),
+                                 ('urls', self.urls)):
+            for row in rows:
+                subs.setdefault((row['contact_id'], field_name), []).append(row)
+        contacts = []
+        for contact in self.contacts:
+            contact = dict(contact)
+            for field_name in ('numbers', 'addresses', 'emails', 'urls'):
+                contact[field_name] = subs.get((contact['id'], field_name), [])
+            contacts.append(contact)
+
+        hosts = dict((host['l2ident']['id'], host) for host in self.lanhosts)
+
+        def with_host(lease):
+            lease = dict(lease)
+            if lease['mac'] in hosts:
+                lease['host'] = hosts[lease['mac']]
+            return lease
+
+        return {
+            'calls': sorted(self.calls, key=lambda call: call['id'],
+                            reverse=True),
+            'contacts': contacts,
+            'groups': self.groups,
+            'lanhosts': self.lanhosts,
+            'static_leases': [with_host(lease) for lease in self.static_leases],
+            'dynamic_leases': [with_host(lease) for lease in self.dynamic_leases],
+            'fwredirs': self.fwredirs,
+            'system': self.system,
+        }
+
+
+class _Table(object):
+    """
+    Objects of one resource by id.
+    """
+
+    def __init__(self, rows, key='id'):
+        self.key = key
+        self.rows = {}
+        self.next_id = 1
+        for row in rows:
+            self.insert(dict(row))
+
+    def insert(self, row):
+        if row.get(self.key) in (None, ''):
+            row[self.key] = self.next_id
+        if isinstance(row[self.key], int):
+            self.next_id = max(self.next_id, row[self.key] + 1)
+        self.rows[row[self.key]] = row
+        return row
+
+    def get(self, id):
+        return self.rows.get(self._key(id))
+
+    def delete(self, id):
+        return self.rows.pop(self._key(id), None)
+
+    def _key(self, id):
+        if id in self.rows:
+            return id
+        try:
+            return int(id)
+        except (TypeError, ValueError):
+            return id
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    # headers and body are sent separately, don't let Nagle delay the body
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.fakebox.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def do_GET(self):
+        if self.headers.get('Upgrade', '').lower() == 'websocket':
+            return self.server.fakebox._websocket(self)
+        self.server.fakebox._dispatch(self, 'GET')
+
+    def do_POST(self):
+        self.server.fakebox._dispatch(self, 'POST')
+
+    def do_PUT(self):
+        self.server.fakebox._dispatch(self, 'PUT')
+
+    def do_DELETE(self):
+        self.server.fakebox._dispatch(self, 'DELETE')
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class _WebSocketClient(object):
+    """
+    Server side of one event websocket, frames are sent unmasked.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.events = set()
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def send(self, opcode, payload):
+        with self._lock:
+            if self.closed:
+                return False
+            try:
+                self.handler.wfile.write(encode_frame(opcode, payload,
+                                                      mask=False))
+                self.handler.wfile.flush()
+                return True
+            except OSError:
+                self.closed = True
+                return False
+
+    def send_json(self, message):
+        return self.send(OP_TEXT, json.dumps(message))
+
+    def close(self):
+        self.send(OP_CLOSE, b'')
+        with self._lock:
+            self.closed = True
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def handle_error(self, request, client_address):
+        # clients closing a streamed response early are expected
+        if isinstance(sys.exc_info()[1],
+                      (ConnectionResetError, BrokenPipeError)):
+            return
+        HTTPServer.handle_error(self, request, client_address)
+
+
+class FakeFreebox(object):
+    """
+    Threaded HTTP server answering the Freebox OS API used by fbxtools.
+
+    latency (+ a random jitter) seconds are slept before each answer,
+    apps are granted as soon as they are registered.
+    """
+
+    def __init__(self, dataset=None, host='127.0.0.1', port=0,
+                 api_base='/api/v3', latency=0.0, jitter=0.0,
+                 permissions=None, verbose=False):
+        self.dataset = dataset if dataset is not None else FakeDataset()
+        self.host = host
+        self.port = port
+        self.api_base = api_base
+        self.latency = latency
+        self.jitter = jitter
+        self.permissions = dict(permissions or _ALL_PERMISSIONS)
+        self.verbose = verbose
+        self.request_count = 0
+
+        self._lock = threading.Lock()
+        self._apps = {}
+        self._challenges = []
+        self._sessions = set()
+        self._ws_clients = []
+        self._ws_drops = 0
+        self._failures = []
+        self._server = None
+        self._thread = None
+        self.reset()
+        self._routes = self._build_routes()
+
+    #
+    # server life cycle
+    #
+
+    @property
+    def url(self):
+        return 'http://%s:%d%s' % (self.host, self.port, self.api_base)
+
+    def start(self):
+        self._server = _Server((self.host, self.port), _Handler)
+        self._server.fakebox = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._lock:
+            clients, self._ws_clients = self._ws_clients, []
+        for client in clients:
+            client.close()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def serve_forever(self):
+        self._server = _Server((self.host, self.port), _Handler)
+        self._server.fakebox = self
+        self.port = self._server.server_address[1]
+        self._server.serve_forever()
+
+    #
+    # state
+    #
+
+    def reset(self):
+        """
+        Reload the tables from the dataset.
+        """
+        dataset = copy.deepcopy(self.dataset)
+        with self._lock:
+            self.tables = {
+                'call': _Table(dataset.calls),
+                'contact': _Table(dataset.contacts),
+                'number': _Table(dataset.numbers),
+                'address': _Table(dataset.addresses),
+                'email': _Table(dataset.emails),
+                'url': _Table(dataset.urls),
+                'group': _Table(dataset.groups),
+                'fwredir': _Table(dataset.fwredirs),
+                'static_lease': _Table(dataset.static_leases),
+                'dynamic_lease': _Table(dataset.dynamic_leases, key='mac'),
+                'lanhost': _Table(dataset.lanhosts),
+            }
+            self.contact_groups = set(dataset.contact_groups)
+            self.system = dict(dataset.system)
+            self.started = time.time()
+
+    def register_app(self, app_id, app_token=None):
+        """
+        Register an app as if granted on the box, return (app_token,
+        track_id).
+        """
+        with self._lock:
+            track_id = len(self._apps) + 1
+            if app_token is None:
+                app_token = ''.join(random.choice(string.ascii_letters)
+                                    for _ in range(48))
+            self._apps[track_id] = {'app_id': app_id, 'app_token': app_token,
+                                    'status': 'granted'}
+        return app_token, track_id
+
+    def write_app_files(self, directory, app_id='fr.freebox.fbxtools',
+                        prefix='app'):
+        """
+        Write <prefix>_infos.json and a granted <prefix>_auth.json in
+        directory, return their paths.
+        """
+        app_token, track_id = self.register_app(app_id)
+        app_infos = os.path.join(directory, prefix + '_infos.json')
+        app_auth = os.path.join(directory, prefix + '_auth.json')
+        with open(app_infos, 'w') as f:
+            json.dump({'app_id': app_id, 'app_name': 'fbxtools',
+                       'app_version': '1.2', 'device_name': 'fakebox'}, f)
+        with open(app_auth, 'w') as f:
+            json.dump({'app_token': app_token, 'track_id': track_id}, f)
+        return app_infos, app_auth
+
+    def expire_sessions(self):
+        """
+        Forget every session token, next requests get auth_required.
+        """
+        with self._lock:
+            self._sessions.clear()
+
+    def fail_next(self, count=1, error_code='ratelimited', status=429):
+        """
+        Answer the next count API requests with error_code/status, as a
+        throttling or busy box would.
+        """
+        with self._lock:
+            self._failures.extend([(error_code, status)] * count)
+
+    #
+    # events
+    #
+
+    def push_event(self, source, event, result):
+        """
+        Send a notification to the websocket clients registered for
+        '<source>_<event>', return how many got it.
+        """
+        name = '%s_%s' % (source, event)
+        message = {'action': 'notification', 'success': True,
+                   'source': source, 'event': event, 'result': result}
+        with self._lock:
+            clients = [client for client in self._ws_clients
+                       if name in client.events]
+        sent = 0
+        for client in clients:
+            if client.send_json(message):
+                sent += 1
+        return sent
+
+    def set_host_reachable(self, host_id, reachable=True):
+        """
+        Change a LAN host reachability and push the matching
+        lan_host_l3addr_(un)reachable event, return the clients notified.
+        """
+        with self._lock:
+            host = self.tables['lanhost'].get(host_id)
+            if host is None:
+                raise KeyError(host_id)
+            now = int(time.time())
+            host['reachable'] = host['active'] = reachable
+            host['last_activity'] = now
+            if reachable:
+                host['last_time_reachable'] = now
+            for l3 in host.get('l3connectivities', []):
+                l3['reachable'] = l3['active'] = reachable
+                l3['last_activity'] = now
+                if reachable:
+                    l3['last_time_reachable'] = now
+            host = copy.deepcopy(host)
+        return self.push_event('lan_host', 'l3addr_reachable' if reachable
+                               else 'l3addr_unreachable', host)
+
+    def ws_client_count(self):
+        with self._lock:
+            return len([client for client in self._ws_clients
+                        if client.events])
+
+    def ping_websockets(self, payload=b''):
+        """
+        Send a ping frame to the open websocket connections, return how
+        many got it.
+        """
+        with self._lock:
+            clients = list(self._ws_clients)
+        return len([client for client in clients
+                    if client.send(OP_PING, payload)])
+
+    def close_websockets(self):
+        """
+        Close the open websocket connections, as a box dropping them.
+        """
+        with self._lock:
+            clients, self._ws_clients = self._ws_clients, []
+        for client in clients:
+            client.close()
+
+    def drop_websockets(self, count=1):
+        """
+        Close the next count websocket connections before the handshake
+        answer, as a rebooting box does.
+        """
+        with self._lock:
+            self._ws_drops += count
+
+    def _websocket(self, handler):
+        handler.close_connection = True
+        with self._lock:
+            drop = self._ws_drops > 0
+            if drop:
+                self._ws_drops -= 1
+        if drop:
+            return
+        if urlsplit(handler.path).path != self.api_base + '/ws/event':
+            return handler.send_json(404, self._error('invalid_request',
+                                                      'no websocket there'))
+        if not self._logged(handler):
+            return handler.send_json(403, self._error(
+                'auth_required', 'Invalid session token, or not session token sent'))
+        handler.send_response(101)
+        handler.send_header('Upgrade', 'websocket')
+        handler.send_header('Connection', 'Upgrade')
+        handler.send_header('Sec-WebSocket-Accept',
+                            accept_key(handler.headers['Sec-WebSocket-Key']))
+        handler.end_headers()
+        handler.wfile.flush()
+
+        client = _WebSocketClient(handler)
+        with self._lock:
+            self._ws_clients.append(client)
+        try:
+            while True:
+                try:
+                    fin, opcode, payload = read_frame(handler.rfile.read)
+                except (EOFError, OSError):
+                    break
+                if opcode == OP_CLOSE:
+                    client.close()
+                    break
+                if opcode == OP_PING:
+                    client.send(OP_PONG, payload)
+                    continue
+                if opcode != OP_TEXT:
+                    continue
+                try:
+                    message = json.loads(payload.decode('utf-8'))
+                except ValueError:
+                    client.send_json(self._error('invalid_request', 'invalid json'))
+                    continue
+                if message.get('action') == 'register':
+                    client.events = set(message.get('events') or [])
+                    client.send_json({'action': 'register', 'success': True})
+                else:
+                    client.send_json(self._error('invalid_request',
+                                                 'unknown action'))
+        finally:
+            with self._lock:
+                if client in self._ws_clients:
+                    self._ws_clients.remove(client)
+
+    #
+    # request handling
+    #
+
+    def _build_routes(self):
+        routes = [
+            ('GET', r'/login/', self._login),
+            ('POST', r'/login/authorize/', self._authorize),
+            ('GET', r'/login/authorize/(?P<id>\d+)', self._authorize_status),
+            ('POST', r'/login/session/', self._session),
+            ('POST', r'/login/logout/', self._logout),
+            ('GET', r'/system/', self._get_system),
+            ('POST', r'/system/reboot/', self._reboot),
+            ('GET', r'/lan/browser/interfaces/', self._interfaces),
+            ('GET', r'/lan/browser/(?P<interface>[\w-]+)/', self._lanhosts),
+            ('GET', r'/lan/browser/(?P<interface>[\w-]+)/(?P<id>[\w:.-]+)',
+             self._lanhost),
+            ('GET', r'/contact/', self._contacts),
+            ('GET', r'/contact/(?P<id>\d+)', self._contact),
+            ('POST', r'/contact/addtogroup/', self._add_to_group),
+            ('GET', r'/group/(?P<id>\d+)/contact/', self._group_contacts),
+            ('GET', r'/dhcp/static_lease/', self._static_leases),
+            ('GET', r'/dhcp/static_lease/(?P<id>[\w:]+)', self._static_lease),
+            ('GET', r'/dhcp/dynamic_lease/', self._dynamic_leases),
+        ]
+        for prefix, table in (('call/log', 'call'), ('contact', 'contact'),
+                              ('number', 'number'), ('address', 'address'),
+                              ('email', 'email'), ('url', 'url'),
+                              ('group', 'group'), ('fw/redir', 'fwredir'),
+                              ('dhcp/static_lease', 'static_lease')):
+            routes.extend([
+                ('GET', r'/%s/' % prefix, self._list(table)),
+                ('POST', r'/%s/' % prefix, self._create(table)),
+                ('GET', r'/%s/(?P<id>[\w:]+)' % prefix, self._read(table)),
+                ('PUT', r'/%s/(?P<id>[\w:]+)' % prefix, self._update(table)),
+                ('DELETE', r'/%s/(?P<id>[\w:]+)' % prefix, self._delete(table)),
+            ])
+        # the first matching route wins
+        return [(method, re.compile(pattern + '$'), handler)
+                for method, pattern, handler in routes]
+
+    def _dispatch(self, handler, method):
+        with self._lock:
+            self.request_count += 1
+            failure = self._failures.pop(0) if self._failures else None
+        delay = self.latency + (random.uniform(0, self.jitter)
+                                if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        url = urlsplit(handler.path)
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+        try:
+            data = json.loads(body.decode('utf-8')) if body else {}
+        except ValueError:
+            data = dict(parse_qsl(body.decode('utf-8')))
+        params = dict(parse_qsl(url.query))
+        if failure is not None:
+            error_code, status = failure
+            return handler.send_json(status, self._error(error_code,
+                                                         'injected failure'))
+
+        if url.path == '/api_version':
+            return handler.send_json(200, self._api_version())
+        if not url.path.startswith(self.api_base):
+            return handler.send_json(404, self._error('invalid_request',
+                                                      'unknown api'))
+        path = url.path[len(self.api_base):]
+        if not path.endswith('/') and path.count('/') == 1:
+            path += '/'
+
+        for route_method, pattern, route in self._routes:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if not path.startswith('/login/') and not self._logged(handler):
+                return handler.send_json(403, self._error(
+                    'auth_required', 'Invalid session token, or not session token sent'))
+            try:
+                status, answer = route(handler=handler, data=data,
+                                       params=params, **match.groupdict())
+            except Exception as e:
+                status, answer = 500, self._error('internal_error', str(e))
+            return handler.send_json(status, answer)
+
+        return handler.send_json(404, self._error('invalid_request',
+                                                  'no route %s %s' % (method, path)))
+
+    def _logged(self, handler):
+        return handler.headers.get('X-Fbx-App-Auth') in self._sessions
+
+    def _ok(self, result=None):
+        answer = {'success': True}
+        if result is not None:
+            answer['result'] = result
+        return 200, answer
+
+    def _error(self, error_code, msg):
+        return {'success': False, 'error_code': error_code, 'msg': msg}
+
+    def _not_found(self, id):
+        return 404, self._error('noent', 'no such object %s' % (id,))
+
+    def _api_version(self):
+        return {'uid': 'fakebox', 'device_name': 'Freebox Server',
+                'api_version': API_VERSION, 'api_base_url': '/api/',
+                'device_type': 'FreeboxServer1,2',
+                'api_domain': self.host, 'https_available': False,
+                'https_port': self.port}
+
+    #
+    # login
+    #
+
+    def _new_challenge(self):
+        challenge = ''.join(random.choice(string.ascii_letters + string.digits)
+                            for _ in range(32))
+        with self._lock:
+            self._challenges = self._challenges[-31:] + [challenge]
+        return challenge
+
+    def _login(self, handler, data, params):
+        return self._ok({'logged_in': self._logged(handler),
+                         'challenge': self._new_challenge()})
+
+    def _authorize(self, handler, data, params):
+        if 'app_id' not in data:
+            return 400, self._error('invalid_request', 'missing app_id')
+        app_token, track_id = self.register_app(data['app_id'])
+        return self._ok({'app_token': app_token, 'track_id': track_id})
+
+    def _authorize_status(self, handler, data, params, id):
+        app = self._apps.get(int(id))
+        if app is None:
+            return self._not_found(id)
+        return self._ok({'status': app['status'],
+                         'challenge': self._new_challenge()})
+
+    def _session(self, handler, data, params):
+        app_token = handler.headers.get('X-Fbx-App-Auth')
+        for app in self._apps.values():
+            if app['app_id'] != data.get('app_id') \
+            or (app_token and app['app_token'] != app_token):
+                continue
+            for challenge in self._challenges:
+                password = hmac.new(app['app_token'].encode(),
+                                    challenge.encode(), sha1).hexdigest()
+                if password == data.get('password'):
+                    session_token = ''.join(
+                        random.choice(string.ascii_letters) for _ in range(64))
+                    with self._lock:
+                        self._sessions.add(session_token)
+                    return self._ok({'session_token': session_token,
+                                     'challenge': self._new_challenge(),
+                                     'permissions': self.permissions})
+        return 403, self._error('invalid_token', 'invalid app or password')
+
+    def _logout(self, handler, data, params):
+        with self._lock:
+            self._sessions.discard(handler.headers.get('X-Fbx-App-Auth'))
+        return self._ok()
+
+    #
+    # resources
+    #
+
+    def _get_system(self, handler, data, params):
+        system = dict(self.system)
+        system['uptime_val'] += int(time.time() - self.started)
+        return self._ok(system)
+
+    def _reboot(self, handler, data, params):
+        self.started = time.time()
+        return self._ok()
+
+    def _list(self, table):
+        def route(handler, data, params):
+            rows = list(self.tables[table].rows.values())
+            if table == 'call':
+                rows.sort(key=lambda row: row['id'], reverse=True)
+            return self._ok(rows)
+        return route
+
+    def _read(self, table):
+        def route(handler, data, params, id):
+            row = self.tables[table].get(id)
+            if row is None:
+                return self._not_found(id)
+            return self._ok(row)
+        return route
+
+    def _create(self, table):
+        def route(handler, data, params):
+            row = dict(data)
+            row.pop('id', None)
+            if table == 'static_lease':
+                row['id'] = row.get('mac')
+            with self._lock:
+                row = self.tables[table].insert(row)
+            return self._ok(self._expand(table, row))
+        return route
+
+    def _update(self, table):
+        def route(handler, data, params, id):
+            with self._lock:
+                row = self.tables[table].get(id)
+                if row is None:
+                    return self._not_found(id)
+                for key, value in data.items():
+                    if key != 'id' and value is not None:
+                        row[key] = value
+            return self._ok(self._expand(table, row))
+        return route
+
+    def _delete(self, table):
+        def route(handler, data, params, id):
+            with self._lock:
+                row = self.tables[table].delete(id)
+                if row is not None and table == 'contact':
+                    for sub in ('number', 'address', 'email', 'url'):
+                        rows = self.tables[sub].rows
+                        for key in [key for key, value in rows.items()
+                                    if value.get('contact_id') == row['id']]:
+                            del rows[key]
+            if row is None:
+                return self._not_found(id)
+            return self._ok()
+        return route
+
+    def _expand(self, table, row):
+        if table == 'contact':
+            return self._contact_full(row)
+        return row
+
+    def _subresources(self, contact_id=None):
+        subs = {}
+        for sub, field_name in (('number', 'numbers'),
+                                ('address', 'addresses'),
+                                ('email', 'emails'), ('url', 'urls')):
+            for row in self.tables[sub].rows.values():
+                if contact_id is None or row.get('contact_id') == contact_id:
+                    subs.setdefault((row.get('contact_id'), field_name),
+                                    []).append(row)
+        return subs
+
+    def _contact_full(self, contact, subs=None):
+        if subs is None:
+            subs = self._subresources(contact['id'])
+        contact = dict(contact)
+        for field_name in ('numbers', 'addresses', 'emails', 'urls'):
+            contact[field_name] = subs.get((contact['id'], field_name), [])
+        return contact
+
+    def _contacts(self, handler, data, params):
+        contacts = sorted(self.tables['contact'].rows.values(),
+                          key=lambda row: row['id'])
+        group_id = params.get('group_id')
+        if group_id:
+            members = set(contact_id for gid, contact_id in self.contact_groups
+                          if gid == int(group_id))
+            contacts = [c for c in contacts if c['id'] in members]
+        start = int(params.get('start', 0) or 0)
+        limit = int(params.get('limit', -1) or -1)
+        contacts = contacts[start:] if limit < 0 else contacts[start:start + limit]
+        subs = self._subresources()
+        return self._ok([self._contact_full(c, subs) for c in contacts])
+
+    def _contact(self, handler, data, params, id):
+        contact = self.tables['contact'].get(id)
+        if contact is None:
+            return self._not_found(id)
+        return self._ok(self._contact_full(contact))
+
+    def _add_to_group(self, handler, data, params):
+        values = dict(params)
+        values.update(data)
+        try:
+            group_id = int(values['group_id'])
+            contact_id = int(values['contact_id'])
+        except (KeyError, ValueError):
+            return 400, self._error('invalid_request', 'group_id, contact_id')
+        with self._lock:
+            self.contact_groups.add((group_id, contact_id))
+        return self._ok({'group_id': group_id, 'contact_id': contact_id})
+
+    def _group_contacts(self, handler, data, params, id):
+        return self._ok([contact_id for gid, contact_id in self.contact_groups
+                         if gid == int(id)])
+
+    def _host_by_mac(self, mac):
+        host = self.tables['lanhost'].get('ether-%s' % mac)
+        if host is None:
+            return None
+        return dict(host)
+
+    def _static_leases(self, handler, data, params):
+        return self._ok([self._static_lease_full(row)
+                         for row in self.tables['static_lease'].rows.values()])
+
+    def _static_lease(self, handler, data, params, id):
+        row = self.tables['static_lease'].get(id)
+        if row is None:
+            return self._not_found(id)
+        return self._ok(self._static_lease_full(row))
+
+    def _static_lease_full(self, row):
+        row = dict(row)
+        host = self._host_by_mac(row.get('mac'))
+        if host is not None:
+            row['host'] = host
+        return row
+
+    def _dynamic_leases(self, handler, data, params):
+        return self._ok([self._static_lease_full(row)
+                         for row in self.tables['dynamic_lease'].rows.values()])
+
+    def _interfaces(self, handler, data, params):
+        counts = dict((name, 0) for name in self.dataset.interfaces)
+        for host in self.tables['lanhost'].rows.values():
+            counts[host['interface']] = counts.get(host['interface'], 0) + 1
+        return self._ok([{'name': name, 'host_count': count}
+                         for name, count in counts.items()])
+
+    def _lanhosts(self, handler, data, params, interface):
+        if interface not in self.dataset.interfaces:
+            return 404, self._error('nodev', 'Invalid interface')
+        return self._ok([host for host in self.tables['lanhost'].rows.values()
+                         if host['interface'] == interface])
+
+    def _lanhost(self, handler, data, params, interface, id):
+        host = self.tables['lanhost'].get(id)
+        if host is None or host['interface'] != interface:
+            return self._not_found(id)
+        return self._ok(host)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Freebox OS server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--calls', type=int, default=100)
+    parser.add_argument('--contacts', type=int, default=50)
+    parser.add_argument('--lanhosts', type=int, default=20)
+    parser.add_argument('--static-leases', type=int, default=10)
+    parser.add_argument('--dynamic-leases', type=int, default=20)
+    parser.add_argument('--fwredirs', type=int, default=5)
+    parser.add_argument('--app-dir', default=None,
+                        help='write app_infos.json and app_auth.json there')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    dataset = FakeDataset(calls=args.calls, contacts=args.contacts,
+                          lanhosts=args.lanhosts,
+                          static_leases=args.static_leases,
+                          dynamic_leases=args.dynamic_leases,
+                          fwredirs=args.fwredirs)
+    box = FakeFreebox(dataset, host=args.host, port=args.port,
+                      latency=args.latency, jitter=args.jitter,
+                      verbose=args.verbose)
+    if args.app_dir:
+        box.write_app_files(args.app_dir)
+    print('Fake Freebox OS on %s' % box.url)
+    try:
+        box.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
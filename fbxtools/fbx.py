@@ -5,30 +5,164 @@ from __future__ import absolute_import
 from __future__ import print_function
 
 import hmac
+import json
+import threading
 from hashlib import sha1
-from apize.apize import Apize
-from fbxtools.exceptions import *
-from fbxtools.utils import *
-from fbxtools.fbxo import *
+from fbxtools.exceptions import FbxSessionToken, FbxAppToken, FbxRequestError
+from fbxtools.utils import (parse_auth_file, parse_infos_file,
+                            session_file_path, parse_session_file,
+                            write_session_file)
+from fbxtools.fbxo import (fbxobj_classes, intern_strings, has_field,
+                           FreeboxObjMeta, FreeboxObj, Boxinfos, Permissions,
+                           Calls, Call, Static_Leases, Dynamic_Leases,
+                           Static_Lease, Dynamic_Lease, Contacts, Groups,
+                           Interfaces, Names, L3connectivities, LanHosts,
+                           Contact, Group, Number, Address, Email, Url,
+                           Interface, LanHost, LanHostL2Ident, LanHostName,
+                           LanHostL3Connectivity, FwRedirs, FwRedir)
+from fbxtools.transport import Transport
+from fbxtools.jsonstream import iter_array
+from fbxtools.stats import RequestStats, clock
+from fbxtools.retry import RetryPolicy, TokenBucket
 
 import time
 from datetime import timedelta, datetime
 
-import urllib3
-urllib3.disable_warnings()
+# 'from fbxtools.fbx import *' gives Fbx, the fbxo model classes and
+# the exceptions
+__all__ = [
+    'Fbx', 'CallLog', 'DEFAULT_CACHE_TTLS', 'FbxSessionToken',
+    'FbxAppToken', 'FbxRequestError',
+    # fbxtools.fbxo.__all__
+    'fbxobj_classes', 'intern_strings', 'has_field', 'FreeboxObjMeta',
+    'FreeboxObj', 'Boxinfos', 'Permissions', 'Calls', 'Call',
+    'Static_Leases', 'Dynamic_Leases', 'Static_Lease', 'Dynamic_Lease',
+    'Contacts', 'Groups', 'Interfaces', 'Names', 'L3connectivities',
+    'LanHosts', 'Contact', 'Group', 'Number', 'Address', 'Email', 'Url',
+    'Interface', 'LanHost', 'LanHostL2Ident', 'LanHostName',
+    'LanHostL3Connectivity', 'FwRedirs', 'FwRedir',
+]
+
+
+_clock = getattr(time, 'monotonic', time.time)
+
+# end of iteration marker
+_END = object()
+
+# seconds each collection property is served from cache, 0 disables it
+DEFAULT_CACHE_TTLS = {
+    'boxinfos': 5,
+    'calls': 30,
+    'contacts': 60,
+    'groups': 60,
+    'interfaces': 30,
+    'fwredirs': 60,
+    'staticleases': 60,
+    'dynamicleases': 30,
+}
+
+# method loading each cached collection
+_CACHE_LOADERS = {
+    'boxinfos': 'get_boxinfos',
+    'calls': 'get_calls',
+    'contacts': 'get_contacts_all',
+    'groups': 'get_groups',
+    'interfaces': 'get_interfaces',
+    'fwredirs': 'get_fwredirs',
+    'staticleases': 'get_stleases',
+    'dynamicleases': 'get_dyleases',
+}
+
+# collections made stale by a successful write under each route
+_CACHE_ROUTES = (
+    ('/contact/', ('contacts', 'groups')),
+    ('/number/', ('contacts',)),
+    ('/address/', ('contacts',)),
+    ('/email/', ('contacts',)),
+    ('/url/', ('contacts',)),
+    ('/group/', ('groups', 'contacts')),
+    ('/call/log/', ('calls',)),
+    ('/fw/redir/', ('fwredirs',)),
+    ('/dhcp/static_lease/', ('staticleases', 'dynamicleases')),
+    ('/dhcp/dynamic_lease/', ('dynamicleases', 'staticleases')),
+    ('/system/', ('boxinfos',)),
+)
+
+
+def _token_digest(app_token):
+    # the session file identifies the app_token without holding it
+    return sha1(app_token.encode('utf8')).hexdigest()
+
+
+def _cached_property(name, doc):
+    return property(lambda self: self._cached(name), None, None, doc)
+
+
+class CallLog(object):
+    """
+    Calls newer than last_id and since, newest first, decoded one at a
+    time while iterating. high_water is the id to persist and give back
+    as last_id on the next run.
+    """
+
+    def __init__(self, fbx, last_id=None, since=None):
+        if isinstance(since, datetime):
+            since = time.mktime(since.timetuple())
+        self.last_id = last_id
+        self.since = since
+        self.high_water = last_id
+        self._calls = self._iter_calls(fbx)
+
+    def _iter_calls(self, fbx):
+        if not fbx.permissions.calls:
+            return
+        # the log is sorted by descending id: stop reading at the first
+        # known call
+        for elem in fbx.iter_result(Calls._url_get):
+            if self.last_id is not None and elem['id'] <= self.last_id:
+                return
+            if self.since is not None and elem['datetime'] < self.since:
+                return
+            if self.high_water is None or elem['id'] > self.high_water:
+                self.high_water = elem['id']
+            call = Call()
+            call.load_data(elem)
+            yield fbx._build_callinfos(call)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._calls)
+
+    next = __next__
+
 
 class Fbx():
 
     def __init__(self, url, app_infos='app_infos.json', 
-        app_auth='app_auth.json', verify_cert=False, mute=False):
+        app_auth='app_auth.json', verify_cert=False, mute=False,
+        timeout=8, pool_maxsize=16, app_session=None, session_ttl=None,
+        cache_ttls=None, on_request=None, stats_window=1024,
+        rate_limit=None, burst=None, retry=None):
 
         self.version = u'1.2'
         self.url = url
-        self.api = Apize(self.url)
-        self.api.verify_cert = verify_cert
+        # every fbxtools request goes through this pooled transport,
+        # app.api stays available for user defined endpoints
+        self.transport = Transport(self.url, headers={},
+                                   verify_cert=verify_cert, timeout=timeout,
+                                   pool_maxsize=pool_maxsize)
+        self._api = None
         self.app_auth = app_auth
         self.app_infos = app_infos
         self.mute = mute
+        # session token cache, reused across runs until the box rejects it
+        if app_session is None:
+            app_session = session_file_path(app_auth)
+        self.app_session = app_session
+        self.session_ttl = session_ttl
+        self._login_lock = threading.Lock()
 
         self._permissions = Permissions()
         for field_name in ["pvr","explorer","calls","contacts",
@@ -39,6 +173,9 @@ class Fbx():
         self._boxinfos.boxinfos_loaded = False
         self._calls = {}
         self._contacts = {}
+        # Contact by id fetched by expand_contacts, None if deleted
+        self._contact_memo = {}
+        self._contact_memo_lock = threading.Lock()
         self._groups = {}
         self._fwredirs = {}
         self._static_leases = {}
@@ -46,47 +183,272 @@ class Fbx():
 
         self._boxinfos_loaded = False
 
-    def init_app(self, infos):
-        @self.api.call('/login/authorize/', method='POST')
-        def wrapper(infos):
-            return {'data': infos, 'is_json': True}
+        self.cache_ttls = dict(DEFAULT_CACHE_TTLS)
+        if cache_ttls:
+            self.cache_ttls.update(cache_ttls)
+        self._cache = {}
+
+        # per endpoint metrics, on_request(record) is called for each request
+        self._stats = RequestStats(window=stats_window, callback=on_request)
+
+        # at most rate_limit requests per second (burst at once), failed
+        # requests replayed according to the retry RetryPolicy
+        self.limiter = TokenBucket(rate_limit, burst) if rate_limit else None
+        if retry is None:
+            retry = RetryPolicy()
+        elif isinstance(retry, int):
+            retry = RetryPolicy(retries=retry)
+        self.retry = retry
+
+    @property
+    def api(self):
+        """
+        apize client sharing the session headers, imported on first use.
+        """
+        if self._api is None:
+            from apize.apize import Apize
+            self._api = Apize(self.url, headers=self.transport.headers,
+                              verify_cert=self.transport.verify_cert)
+        return self._api
 
-        return wrapper(infos)
+    def stats(self):
+        """
+        Request metrics by endpoint ('GET /contact/:id'): latency, size,
+        JSON decode and fbxo build times as rolling histograms, and the
+        error_code counts.
+        """
+        return self._stats.snapshot()
 
+    def reset_stats(self):
+        self._stats.reset()
 
-    def connect_app(self, app_token, app_id, challenge):
-        @self.api.call('/login/session/', method='POST')
-        def wrapper(app_token, app_id, challenge):
-            h = hmac.new(app_token.encode(), challenge, sha1)
-            password = h.hexdigest()
+    def _get_on_request(self):
+        return self._stats.callback
 
-            data = {'app_id': app_id, 'password': password}
-            headers = {'X-Fbx-App-Auth': app_token}
+    def _set_on_request(self, callback):
+        self._stats.callback = callback
 
-            return {
-                'data': data,
-                'headers': headers,
-                'is_json': True
-            }
+    on_request = property(_get_on_request, _set_on_request, None,
+                          "callback receiving each request record")
 
-        return wrapper(app_token, app_id, challenge)
+    def _record(self, path, method, response):
+        data = response['data']
+        error_code = None
+        if response['timeout']:
+            error_code = 'timeout'
+        elif isinstance(data, dict) and not data.get('success', True):
+            error_code = data.get('error_code', 'unknown')
+        self._stats.record(path, method, response['status'],
+                           response['elapsed'], response['size'],
+                           response['decode_time'], error_code)
 
+    def request(self, path, method='GET', args=None, params=None, data=None,
+                headers=None, is_json=False, timeout=None):
+        """
+        Send one request to the Freebox OS API, path is a route template
+        like '/contact/:id' filled from args.
+        An expired session is renewed once and the request replayed,
+        throttled or failed requests are retried per self.retry.
+        """
+        token = self.transport.headers.get('X-Fbx-App-Auth')
+        response = self._send(path, method, args, params, data, headers,
+                              is_json, timeout)
+        if token is not None and self._auth_required(response['data']):
+            self._renew_session(token)
+            response = self._send(path, method, args, params, data, headers,
+                                  is_json, timeout)
+        # invalidate even with nothing cached: expand_contacts memoizes too
+        if method.upper() != 'GET' \
+        and isinstance(response['data'], dict) \
+        and response['data'].get('success', False):
+            self._invalidate_route(path)
+        return response
+
+    def _send(self, path, method, args, params, data, headers, is_json,
+              timeout):
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                self.limiter.acquire()
+            try:
+                response = self.transport.request(path, method=method,
+                                                  args=args, params=params,
+                                                  data=data, headers=headers,
+                                                  is_json=is_json,
+                                                  timeout=timeout)
+            except IOError:
+                # connection refused/reset: nothing to record
+                if attempt >= self.retry.retries \
+                or not self.retry.retryable(method, 'connection_error'):
+                    raise
+            else:
+                self._record(path, method, response)
+                error_code = self.retry.error_code(response)
+                if attempt >= self.retry.retries \
+                or not self.retry.retryable(method, error_code,
+                                            response['status']):
+                    return response
+            time.sleep(self.retry.delay(attempt))
+            attempt += 1
+
+    def request_result(self, path, method='GET', args=None, params=None,
+                       data=None, is_json=True):
+        """
+        Send one request and return its 'result', raise FbxRequestError
+        when the box reports a failure.
+        """
+        response = self.request(path, method=method, args=args, params=params,
+                                data=data, is_json=is_json)
+        return self._result(path, response)
+
+    def _result(self, path, response):
+        data = response['data']
+        if response['timeout']:
+            raise FbxRequestError('timeout', path)
+        if not isinstance(data, dict):
+            raise FbxRequestError(response['status'], data)
+        if not data.get('success', False):
+            raise FbxRequestError(data.get('error_code', response['status']),
+                                  data.get('msg', data))
+        return data.get('result')
+
+    def iter_result(self, path, args=None, params=None, chunk_size=65536):
+        """
+        Yield the elements of a list 'result' one by one while the
+        response is still being read.
+        """
+        attempt = 0
+        renewed = False
+        while True:
+            token = self.transport.headers.get('X-Fbx-App-Auth')
+            meta = {}
+            if self.limiter is not None:
+                self.limiter.acquire()
+            start = clock()
+            try:
+                r = self.transport.stream(path, args=args, params=params)
+            except FbxRequestError as e:
+                # timeout, or an answer that is not JSON
+                status = e.err_code if isinstance(e.err_code, int) else None
+                if not self._retry_stream(attempt, e.err_code, status):
+                    raise
+                attempt += 1
+                continue
+            except IOError:
+                if not self._retry_stream(attempt, 'connection_error'):
+                    raise
+                attempt += 1
+                continue
+            latency = clock() - start
+            # split the time spent in iter_array between reading the
+            # body and parsing it
+            counters = {'size': 0, 'read': 0.0}
+
+            def chunks():
+                content = r.iter_content(chunk_size)
+                while True:
+                    read_start = clock()
+                    chunk = next(content, None)
+                    counters['read'] += clock() - read_start
+                    if chunk is None:
+                        return
+                    counters['size'] += len(chunk)
+                    yield chunk
+
+            parse = 0.0
+            completed = False
+            yielded = False
+            items = iter_array(chunks(), 'result', meta)
+            try:
+                while True:
+                    parse_start = clock()
+                    elem = next(items, _END)
+                    parse += clock() - parse_start
+                    if elem is _END:
+                        completed = True
+                        break
+                    yielded = True
+                    yield elem
+            finally:
+                r.close()
+                error_code = None
+                if completed and not meta.get('success', False):
+                    error_code = meta.get('error_code', 'unknown')
+                self._stats.record(path, 'GET', r.status_code,
+                                   latency + counters['read'],
+                                   counters['size'],
+                                   parse - counters['read'], error_code)
+            if meta.get('success', False):
+                return
+            if not renewed and token is not None \
+            and self._auth_required(meta):
+                renewed = True
+                self._renew_session(token)
+                continue
+            # an error answer has no result: nothing was yielded twice
+            if not yielded and self._retry_stream(
+                    attempt, meta.get('error_code'), r.status_code):
+                attempt += 1
+                continue
+            raise FbxRequestError(meta.get('error_code', r.status_code),
+                                  meta.get('msg', meta))
+
+    def _retry_stream(self, attempt, error_code, status=None):
+        # sleep before the next attempt of a stream, False when out of tries
+        if attempt >= self.retry.retries \
+        or not self.retry.retryable('GET', error_code, status):
+            return False
+        time.sleep(self.retry.delay(attempt))
+        return True
 
-    def get_challenge(self, track_id):
-        @self.api.call('/login/authorize/:id')
-        def wrapper(track_id):
-            args = {'id': track_id}
+    def _auth_required(self, data):
+        return isinstance(data, dict) \
+            and not data.get('success', True) \
+            and data.get('error_code') == 'auth_required'
+
+    def _renew_session(self, token):
+        with self._login_lock:
+            # another thread may have logged in again meanwhile
+            if self.transport.headers.get('X-Fbx-App-Auth') == token:
+                self.get_session_token(use_cache=False)
+
+    def close(self):
+        self.transport.close()
+
+    def init_app(self, infos):
+        return self.request('/login/authorize/', method='POST',
+                            data=infos, is_json=True)
+
+
+    def connect_app(self, app_token, app_id, challenge):
+        h = hmac.new(app_token.encode(), challenge, sha1)
+        password = h.hexdigest()
+
+        data = {'app_id': app_id, 'password': password}
+        headers = {'X-Fbx-App-Auth': app_token}
 
-            return {'args': args}
+        return self.request('/login/session/', method='POST', data=data,
+                            headers=headers, is_json=True)
 
-        return wrapper(track_id)
+
+    def get_challenge(self, track_id):
+        return self.request('/login/authorize/:id', args={'id': track_id})
 
 
-    def get_session_token(self):
+    def get_session_token(self, use_cache=True):
         """
         Authenticate your app to allow use API.
+        The session is cached in app_session and reused by the next runs,
+        use_cache=False forces a new login.
         """
         auth = parse_auth_file(self.app_auth)
+        if use_cache:
+            session = self._load_session(auth)
+            if session is not None:
+                self._set_session(session['session_token'],
+                                  session['permissions'])
+                return session['session_token']
+
         response = self.get_challenge(auth['track_id'])
 
         if not response['data']['success']:
@@ -105,39 +467,58 @@ class Fbx():
 
         if not conn['data']['success']:
             raise FbxSessionToken(
-                response['data']['error_code'],
-                response['data']['error_code']
+                conn['data']['error_code'],
+                conn['data'].get('msg', conn['data']['error_code'])
             )
 
         session_token = conn['data']['result']['session_token']
         permissions = conn['data']['result']['permissions']
-        for permission in permissions:
-            if permission == 'pvr':
-                self._permissions.pvr = permissions[permission]
-            elif permission == 'explorer':
-                self._permissions.explorer = permissions[permission]
-            elif permission == 'calls':
-                self._permissions.calls = permissions[permission]
-            elif permission == 'contacts':
-                self._permissions.contacts = permissions[permission]
-            elif permission == 'tv':
-                self._permissions.tv = permissions[permission]
-            elif permission == 'parental':
-                self._permissions.parental = permissions[permission]
-            elif permission == 'settings':
-                self._permissions.settings = permissions[permission]
-            elif permission == 'downloader':
-                self._permissions.downloader = permissions[permission]
-        self.api.headers['X-Fbx-App-Auth'] = session_token 
+        self._set_session(session_token, permissions)
+        self._save_session(auth, session_token, permissions)
 
         return session_token
 
+    def _set_session(self, session_token, permissions):
+        for permission in permissions:
+            if permission in ('pvr', 'explorer', 'calls', 'contacts', 'tv',
+                              'parental', 'settings', 'downloader'):
+                setattr(self._permissions, permission, permissions[permission])
+        self.transport.headers['X-Fbx-App-Auth'] = session_token 
+
+    def _load_session(self, auth):
+        session = parse_session_file(self.app_session)
+        try:
+            # a session is only sent back to the box and app that opened it
+            if session['track_id'] != auth['track_id'] \
+            or session['url'] != self.url \
+            or session['app_token_sha1'] != _token_digest(auth['app_token']) \
+            or 'session_token' not in session \
+            or 'permissions' not in session:
+                return None
+            if self.session_ttl is not None \
+            and time.time() - session['acquired_at'] > self.session_ttl:
+                return None
+        except (KeyError, TypeError):
+            return None
+        return session
+
+    def _save_session(self, auth, session_token, permissions):
+        session = {
+            'track_id': auth['track_id'],
+            'url': self.url,
+            'app_token_sha1': _token_digest(auth['app_token']),
+            'session_token': session_token,
+            'permissions': permissions,
+            'acquired_at': time.time()
+        }
+        try:
+            write_session_file(self.app_session, session)
+        except (IOError, OSError) as e:
+            if not self.mute:
+                print('%s file not written: %s' % (self.app_session, e))
+
     def get_status(self, track_id):
-        @self.api.call('/login/authorize/:id')
-        def wrapper(track_id):
-            args = {'id': track_id}
-            return {'args': args}
-        return wrapper(track_id)
+        return self.request('/login/authorize/:id', args={'id': track_id})
 
     def get_app_token(self):
         """
@@ -183,18 +564,10 @@ class Fbx():
         )
 
     def get_system(self):
-        @self.api.call('/system/')
-        def wrapper():
-            return {}
-
-        return wrapper()
+        return self.request('/system/')
 
     def _system_reboot(self):
-        @self.api.call('/system/reboot/',method='POST')
-        def wrapper():
-            return {}
-
-        return wrapper()
+        return self.request('/system/reboot/', method='POST')
 
     def system_reboot(self,reboot=False):
         if reboot:
@@ -244,60 +617,73 @@ class Fbx():
         return call
 
     def _build_stlhostinfos(self,stl):
-        host = LanHost()
-        
-        try:
-            host.primary_name = stl.host[u'primary_name']
-        except:
-            host.primary_name = u''
-        try:
-            host.active = stl.host[u'active']
-        except:
-            pass
-        try:
-            host.reachable = stl.host[u'reachable']
-        except:
-            pass
-        try:
-            host.host_type = stl.host[u'host_type']
-        except:
-            pass
-        try:
-            host.persistent = stl.host[u'persistent']
-        except:
-            pass
-        try:
-            host.primary_name_manual = stl.host[u'primary_name_manual']
-        except:
-            pass
-        try:
-            host.last_activity = datetime.fromtimestamp(stl.host[u'last_activity'])
-        except:
-            pass
-        try:
-            host.last_time_reachable = datetime.fromtimestamp(stl.host[u'last_time_reachable'])
-        except:
-            pass
-        try:
-            host.vendor_name = stl.host[u'vendor_name']
-        except:
-            pass
-        try:
-            host.interface = stl.host[u'interface']
-        except:
-            pass
-        try:
-            host.id = stl.host[u'id']
-        except:
-            pass
-        #print(host)
-        stl.host = host
+        # a lease host dict is decoded into a LanHost when first read
+        if not has_field(stl, 'host'):
+            stl.host = LanHost()
+            stl.host.primary_name = u''
         return stl
 
+    def host_index(self,lanhosts=None):
+        """
+        HostIndex of the LAN hosts, static and dynamic leases and port
+        forwards, see fbxtools.hostindex.
+        """
+        from fbxtools.hostindex import HostIndex
+        return HostIndex.from_fbx(self, lanhosts=lanhosts)
+
+    def number_index(self,country_code='33',min_prefix=4):
+        """
+        NumberIndex of the contact numbers, resolving call numbers to
+        contacts, see fbxtools.numberindex.
+        """
+        from fbxtools.numberindex import NumberIndex
+        return NumberIndex.from_fbx(self, country_code=country_code,
+                                    min_prefix=min_prefix)
+
 
     #def get_permissions(self):
     #    return self._permissions
 
+    #
+    # collection properties cache
+    #
+
+    def _cached(self, name):
+        entry = self._cache.get(name)
+        if entry is not None and entry[0] > _clock():
+            return entry[1]
+        return self.refresh(name)
+
+    def refresh(self, name):
+        """
+        Load the collection name ('calls', 'contacts'...) again and
+        cache it for cache_ttls[name] seconds.
+        """
+        value = getattr(self, _CACHE_LOADERS[name])()
+        ttl = self.cache_ttls.get(name, 0)
+        if ttl:
+            self._cache[name] = (_clock() + ttl, value)
+        else:
+            self._cache.pop(name, None)
+        return value
+
+    def invalidate(self, *names):
+        """
+        Drop the cached collections names, all of them if none is given.
+        """
+        if not names:
+            self._cache.clear()
+        for name in names:
+            self._cache.pop(name, None)
+        if not names or 'contacts' in names:
+            with self._contact_memo_lock:
+                self._contact_memo.clear()
+
+    def _invalidate_route(self, path):
+        for prefix, names in _CACHE_ROUTES:
+            if path.startswith(prefix):
+                self.invalidate(*names)
+
     #
     # get fbx list object
     #
@@ -322,7 +708,7 @@ class Fbx():
         self._groups = groups.get_by_id()
         return self._groups.groups
 
-    def get_calls(self):
+    def get_calls(self,expand_contacts=False,max_workers=8):
         if not self.permissions.contacts :
             self._calls = []
             return self._calls.calls
@@ -330,8 +716,97 @@ class Fbx():
         self._calls = calls.get_by_id()
         for call in self._calls.calls:
             self._build_callinfos(call)
+        if expand_contacts:
+            self.expand_contacts(self._calls.calls, max_workers=max_workers)
         return self._calls.calls
 
+    def expand_contacts(self,calls,max_workers=8):
+        """
+        Attach its Contact to each call (call.contact, None for unknown
+        numbers). Each distinct contact_id is fetched once, max_workers
+        at a time, and memoized until the contacts are invalidated.
+        """
+        contact_ids = set(call.contact_id for call in calls
+                          if getattr(call, 'contact_id', None))
+        with self._contact_memo_lock:
+            missing = [contact_id for contact_id in contact_ids
+                       if contact_id not in self._contact_memo]
+        if missing and self.permissions.contacts:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+                fetched = list(executor.map(self._fetch_contact, missing))
+            with self._contact_memo_lock:
+                for contact_id, found, contact in fetched:
+                    if found:
+                        self._contact_memo[contact_id] = contact
+
+        memo = self._contact_memo
+        for call in calls:
+            call.contact = memo.get(getattr(call, 'contact_id', None))
+        return calls
+
+    def _fetch_contact(self, contact_id):
+        # (contact_id, memoize, Contact): a deleted contact is memoized
+        # as None, a failed request is tried again on the next call
+        try:
+            result = self.request_result(Contact._url_get + ':id',
+                                         args={'id': contact_id})
+        except FbxRequestError as e:
+            return (contact_id, e.err_code == 'noent', None)
+        except IOError:
+            return (contact_id, False, None)
+        # Contact(data=result) would GET the contact again
+        contact = Contact()
+        contact.load_data(result)
+        contact._fbx = self
+        return (contact_id, True, contact)
+
+    #
+    # iterate over fbx list object, decoded while the response is read
+    #
+
+    def iter_calls(self):
+        if not self.permissions.calls :
+            return iter([])
+        return (self._build_callinfos(call)
+                for call in Calls(fbx=self).iter_by_id())
+
+    def iter_contacts(self,start=0,limit=-1,page=1,group_id=None):
+        if not self.permissions.contacts :
+            return iter([])
+        params = {'start':start,'limit':limit,'page':page,'group_id':group_id}
+        return Contacts(fbx=self).iter_by_id(params=params)
+
+    def iter_lanhosts(self,args=None):
+        if not self.permissions.explorer :
+            return iter([])
+        return LanHosts(fbx=self).iter_by_id(args=args)
+
+    def iter_stleases(self):
+        return (self._build_stlhostinfos(stl)
+                for stl in Static_Leases(fbx=self).iter_by_id())
+
+    def iter_dyleases(self):
+        return (self._build_stlhostinfos(dyl)
+                for dyl in Dynamic_Leases(fbx=self).iter_by_id())
+
+    def calls_frame(self,backend=None):
+        """
+        The call log as numpy structured array, pyarrow Table or dict of
+        array columns, built from the streamed JSON.
+        """
+        from fbxtools.columns import call_columns
+        if not self.permissions.calls :
+            return call_columns([], backend=backend)
+        return call_columns(self.iter_result(Calls._url_get), backend=backend)
+
+    def iter_calls_since(self, last_id=None, since=None):
+        """
+        Iterate over the calls newer than last_id and/or since (datetime
+        or timestamp) without decoding the older ones.
+        """
+        return CallLog(self, last_id=last_id, since=since)
+
     def get_interfaces(self):
         if not self.permissions.explorer :
             self._interfaces = []
@@ -348,6 +823,72 @@ class Fbx():
         self._lanhosts = lanhosts.get_by_id(args=args)
         return self._lanhosts.lanhosts  
 
+    def get_all_lanhosts(self,interfaces=None,max_workers=None,errors=None):
+        """
+        LAN hosts of every interface (or of the interfaces names given),
+        fetched concurrently and merged by MAC address (l2ident.id).
+        A host seen on several interfaces is kept from the one where it
+        is reachable, or else was active last. Each LanHost keeps its
+        interface name in _interface_name.
+        An interface that fails raises FbxRequestError, or when errors
+        is a dict, is stored there by name and the others are returned.
+        """
+        if not self.permissions.explorer :
+            return {}
+        if interfaces is None:
+            interfaces = [interface.name for interface in self.interfaces]
+        if not interfaces:
+            return {}
+        from concurrent.futures import ThreadPoolExecutor
+
+        def fetch(name):
+            try:
+                lanhosts = LanHosts(fbx=self).get_by_id(args={'interface': name})
+            except (FbxRequestError, IOError) as e:
+                return name, None, e
+            return name, getattr(lanhosts, 'lanhosts', None) or [], None
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(interfaces)) as executor:
+            results = list(executor.map(fetch, interfaces))
+
+        failed = [(name, e) for name, lanhosts, e in results if e is not None]
+        if failed and errors is None:
+            raise FbxRequestError(
+                getattr(failed[0][1], 'err_code', 'connection_error'),
+                'interfaces %s failed: %s' % (
+                    ', '.join(name for name, e in failed),
+                    '; '.join(str(e) for name, e in failed)))
+        if errors is not None:
+            errors.update(failed)
+
+        merged = {}
+        for name, lanhosts, e in results:
+            if e is not None:
+                continue
+            for host in lanhosts:
+                host._interface_name = name
+                l2ident = getattr(host, 'l2ident', None)
+                mac = getattr(l2ident, 'id', None) or host.id
+                other = merged.get(mac)
+                if other is None or self._lanhost_rank(host) > self._lanhost_rank(other):
+                    merged[mac] = host
+        return merged
+
+    def _lanhost_rank(self, host):
+        last_activity = getattr(host, 'last_activity', None)
+        return (bool(getattr(host, 'reachable', False)),
+                last_activity.timestamp() if isinstance(last_activity, datetime) else 0)
+
+    def lanhost_events(self,events=None,interfaces=None,reconnect_delay=5):
+        """
+        LAN host table kept current by the event websocket, see
+        fbxtools.events.LanHostEvents.
+        """
+        from fbxtools.events import LanHostEvents, LANHOST_EVENTS
+        return LanHostEvents(self, events=events or LANHOST_EVENTS,
+                             interfaces=interfaces,
+                             reconnect_delay=reconnect_delay)
+
     def get_fwredir_all(self):
             return self.get_fwredirs()
 
@@ -440,7 +981,7 @@ class Fbx():
                                 permission=self.permissions.calls)
 
     def get_dynamiclease(self,dl_id):
-        return self._get_fbobj(Dynamimic_Lease,id=dl_id,\
+        return self._get_fbobj(Dynamic_Lease,id=dl_id,\
                                 permission=self.permissions.calls)
         
     def get_fwredir(self,fwredir_id):
@@ -486,6 +1027,16 @@ class Fbx():
     def set_fwredir(self,fwredir_id,fwredirinfos):
         return self._set_fbobj(FwRedir,fwredir_id,fwredirinfos)
 
+    def apply_fwredirs(self,desired,prune=True,dry_run=False,max_workers=4):
+        """
+        Reconcile the port forwards with desired (dicts or FwRedir) in
+        the fewest POST/PUT/DELETE, see fbxtools.fwsync. Return the
+        FwRedirPlan, only computed if dry_run.
+        """
+        from fbxtools.fwsync import apply_fwredirs
+        return apply_fwredirs(self, desired, prune=prune, dry_run=dry_run,
+                              max_workers=max_workers)
+
     def set_static_lease(self,stlinfos):
         return self._set_fbobj(Static_Lease,stlinfos)
 
@@ -502,6 +1053,15 @@ class Fbx():
     def new_contact(self,contactinfos):
         return self._new_fbobj(Contact,contactinfos,self.permissions.contacts)
 
+    def bulk_new_contacts(self,contacts,max_workers=8):
+        """
+        Create many contacts with their numbers, addresses, emails and
+        urls, max_workers requests at a time. Return one
+        fbxtools.bulk.BulkResult per contact.
+        """
+        from fbxtools.bulk import bulk_new_contacts
+        return bulk_new_contacts(self, contacts, max_workers=max_workers)
+
     def new_number(self,numberinfos):
         return self._new_fbobj(Number,numberinfos,self.permissions.contacts)
 
@@ -567,14 +1127,14 @@ class Fbx():
 
 
     permissions = property(get_permissions, None, None, "freebox app permissions Permissions")
-    calls       = property(get_calls, None, None, "freebox calls list")
-    contacts    = property(get_contacts_all, None, None, "freebox contacts list")
-    groups      = property(get_groups, None, None, "freebox groups list")
-    boxinfos    = property(get_boxinfos, None, None, "freebox infos Boxinfos")
-    interfaces  = property(get_interfaces, None, None, "freebox interfaces list")
-    fwredirs    = property(get_fwredirs, None, None, "freebox fwredir list")
-    staticleases    = property(get_stleases, None, None, "freebox static_lease list")
-    dynamicleases   = property(get_dyleases, None, None, "freebox dynamic_lease list")
+    calls       = _cached_property('calls', "freebox calls list")
+    contacts    = _cached_property('contacts', "freebox contacts list")
+    groups      = _cached_property('groups', "freebox groups list")
+    boxinfos    = _cached_property('boxinfos', "freebox infos Boxinfos")
+    interfaces  = _cached_property('interfaces', "freebox interfaces list")
+    fwredirs    = _cached_property('fwredirs', "freebox fwredir list")
+    staticleases    = _cached_property('staticleases', "freebox static_lease list")
+    dynamicleases   = _cached_property('dynamicleases', "freebox dynamic_lease list")
 
     def __str__(self):
         fbstr = u"uptime: %s, disk_status: %s\r\nfirmware_version: %s, box_authenticated: %s\r\n"\
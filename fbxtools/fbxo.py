@@ -5,17 +5,226 @@ from __future__ import absolute_import
 from __future__ import print_function
 
 from datetime import timedelta, datetime
-from fbxtools.fbx import *
+from fbxtools.stats import clock
 
-class FreeboxObj(object):
+__all__ = [
+    'fbxobj_classes', 'intern_strings', 'has_field', 'FreeboxObjMeta',
+    'FreeboxObj', 'Boxinfos', 'Permissions', 'Calls', 'Call',
+    'Static_Leases', 'Dynamic_Leases', 'Static_Lease', 'Dynamic_Lease',
+    'Contacts', 'Groups', 'Interfaces', 'Names', 'L3connectivities',
+    'LanHosts', 'Contact', 'Group', 'Number', 'Address', 'Email', 'Url',
+    'Interface', 'LanHost', 'LanHostL2Ident', 'LanHostName',
+    'LanHostL3Connectivity', 'FwRedirs', 'FwRedir',
+]
+
+# FreeboxObj classes by name, as used in 'type_info'
+fbxobj_classes = {}
+
+# compiled _Decoder by FreeboxObj class, or by (class, id(attribs)) for
+# the instances given their own attribs schema
+_decoders = {}
+
+# shared table of interned strings, see intern_strings()
+_interned = None
+
+
+def intern_strings(enabled=True):
+    """
+    Share one copy of each decoded str value (call types, interface
+    names, vendor names...) between all the objects decoded afterwards.
+    """
+    global _interned
+    _interned = {} if enabled else None
+    _decoders.clear()
+
+
+def _build(fbxobj_class, data):
+    fbxobj = fbxobj_class()
+    fbxobj.load_data(data)
+    return fbxobj
+
+
+def _keep(value):
+    return value
+
+
+def _intern(value):
+    if isinstance(value, (str, type(u''))):
+        return _interned.setdefault(value, value)
+    return value
+
+
+def _timestamp(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    return value
+
+
+def _nested_decoder(type_info, decode_dict):
+    def decode(value):
+        fbxobj_class = fbxobj_classes[type_info]
+        if isinstance(value, list):
+            return [_build(fbxobj_class, elem) for elem in value]
+        if decode_dict and isinstance(value, dict):
+            return _build(fbxobj_class, value)
+        return value
+    return decode
+
+
+def _nested_is_raw(decode_dict):
+    def is_raw(value):
+        if isinstance(value, list):
+            return bool(value) and isinstance(value[0], dict)
+        return decode_dict and isinstance(value, dict)
+    return is_raw
+
+
+def _timestamp_is_raw(value):
+    return isinstance(value, (int, float))
+
+
+def _lazy_field(infos):
+    """
+    (is_raw, decode) of a field decoded on first access: timestamps and
+    nested objects. None for the fields stored as they come.
+    """
+    type_info = infos.get('type_info')
+    if type_info == datetime:
+        return _timestamp_is_raw, _timestamp
+    if isinstance(type_info, str) and type_info[:1].isupper():
+        # nested objects are decoded from a list, or from a dict for the
+        # fields flagged 'dict' (other 'host' dicts stay raw)
+        decode_dict = infos.get('dict', False)
+        return _nested_is_raw(decode_dict), _nested_decoder(type_info, decode_dict)
+    return None
+
+
+class _LazyField(object):
+    """
+    Attribute keeping the raw JSON value in its slot until first read,
+    then decoding it and storing the result in place.
+    """
+
+    __slots__ = ('slot', 'is_raw', 'decode')
+
+    def __init__(self, is_raw, decode):
+        self.slot = None
+        self.is_raw = is_raw
+        self.decode = decode
+
+    def __get__(self, fbxobj, owner):
+        if fbxobj is None:
+            return self
+        value = self.slot.__get__(fbxobj, owner)
+        if self.is_raw(value):
+            value = self.decode(value)
+            self.slot.__set__(fbxobj, value)
+        return value
+
+    def __set__(self, fbxobj, value):
+        self.slot.__set__(fbxobj, value)
+
+    def __delete__(self, fbxobj):
+        self.slot.__delete__(fbxobj)
+
+
+def has_field(fbxobj, field_name):
+    """
+    True if field_name is set on fbxobj, without decoding it.
+    """
+    lazy = getattr(type(fbxobj), field_name, None)
+    if isinstance(lazy, _LazyField):
+        try:
+            lazy.slot.__get__(fbxobj, type(fbxobj))
+            return True
+        except AttributeError:
+            return False
+    return hasattr(fbxobj, field_name)
+
+
+class _Decoder(object):
+    """
+    Decoding plan of an attribs schema: one function per field name and
+    the field receiving a bare list result. Timestamps and nested
+    objects are stored raw, their _LazyField decodes them when read.
+    """
+
+    def __init__(self, attribs, fbxobj_class=None):
+        self.fields = {}
+        for field_name, infos in attribs.items():
+            self.fields[field_name] = self._field_decoder(
+                infos, getattr(fbxobj_class, field_name, None))
+
+        self.list_field = ('contacts', fbxobj_classes['Contact'])
+        if len(attribs) == 1:
+            field_name, infos = list(attribs.items())[0]
+            if infos.get('list') and infos.get('type_info') in fbxobj_classes:
+                self.list_field = (field_name, fbxobj_classes[infos['type_info']])
+
+    def _field_decoder(self, infos, attribute=None):
+        lazy = _lazy_field(infos)
+        if lazy is not None:
+            # without a _LazyField (instance attribs) decode right away
+            if isinstance(attribute, _LazyField):
+                return _keep
+            return lazy[1]
+        if infos.get('type_info') == str and _interned is not None:
+            return _intern
+        return _keep
+
+
+class FreeboxObjMeta(type):
+    """
+    Gives each FreeboxObj class one slot per field of its '_attribs'
+    schema and registers it in fbxobj_classes. Timestamp and nested
+    object fields get a _LazyField in front of a '_lazy_<name>' slot.
+    Other attributes go to the instance __dict__, created on first use.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        inherited = set()
+        for base in bases:
+            for klass in base.__mro__:
+                inherited.update(getattr(klass, '__slots__', ()))
+        slots = tuple(slot for slot in namespace.get('__slots__', ())
+                      if slot not in inherited)
+        lazy_fields = {}
+        for field_name, infos in namespace.get('_attribs', {}).items():
+            if field_name in inherited or field_name in slots:
+                continue
+            lazy = _lazy_field(infos)
+            if lazy is not None and '_lazy_' + field_name not in inherited:
+                lazy_fields[field_name] = _LazyField(*lazy)
+                slots += ('_lazy_' + field_name,)
+            elif lazy is None:
+                slots += (field_name,)
+        namespace['__slots__'] = slots
+        namespace.update(lazy_fields)
+        fbxobj_class = type.__new__(mcs, name, bases, namespace)
+        for field_name, lazy in lazy_fields.items():
+            lazy.slot = fbxobj_class.__dict__['_lazy_' + field_name]
+        if not name.startswith('_'):
+            fbxobj_classes[name] = fbxobj_class
+        return fbxobj_class
+
+
+# py2/py3 compatible way of applying FreeboxObjMeta
+_FreeboxObjBase = FreeboxObjMeta('_FreeboxObjBase', (object,), {})
+
+
+class FreeboxObj(_FreeboxObjBase):
+
+    # __dict__ keeps attributes outside of _attribs working
+    __slots__ = ('_fbx', '__dict__')
 
     _url_get = ''
 
-    def __init__(self, fbx=None, data={}, attribs={'id': {}},args={}):
-        self._attribs = attribs
-        self._fbx = None
-        if fbx != None:
-            self._fbx = fbx
+    _attribs = {'id': {}}
+
+    def __init__(self, fbx=None, data=None, attribs=None, args=None):
+        self._fbx = fbx
+        if attribs is not None and attribs is not type(self)._attribs:
+            self._attribs = attribs
         if (data != None) and (data != {}):
             self.load_data(data)
             #print(u'Freeboxobj data:',data)
@@ -36,65 +245,33 @@ class FreeboxObj(object):
                     pass
                     #self = self.new_fbxobj(data)
 
+    @classmethod
+    def _decoder(cls):
+        try:
+            return _decoders[cls]
+        except KeyError:
+            decoder = _decoders[cls] = _Decoder(cls._attribs, cls)
+            return decoder
+
+    def _instance_decoder(self):
+        cls = type(self)
+        attribs = self._attribs
+        if attribs is cls._attribs:
+            return cls._decoder()
+        key = (cls, id(attribs))
+        entry = _decoders.get(key)
+        if entry is None or entry[0] is not attribs:
+            # keep a reference on attribs so its id is never reused
+            entry = _decoders[key] = (attribs, _Decoder(attribs, cls))
+        return entry[1]
+
     def load_data(self, data):
         if isinstance(data, dict):
-            for field_name in self._attribs:
-                if field_name in data:
-                    if isinstance(data[field_name],list):
-                        obj_list = []
-                        for elem in data[field_name]:
-                            infos = None
-                            if self._attribs[field_name]['type_info'] == "Address":
-                                infos = Address(data=elem)
-                            elif self._attribs[field_name]['type_info'] == "Number":
-                                infos = Number(data=elem)
-                            elif self._attribs[field_name]['type_info'] == "Email":
-                                infos = Email(data=elem)
-                            elif self._attribs[field_name]['type_info'] == "Url":
-                                infos = Url(data=elem)  
-                            elif self._attribs[field_name]['type_info'] == "Contact":
-                                infos = Contact(data=elem)  
-                            elif self._attribs[field_name]['type_info'] == "Call":
-                                infos = Contact(data=elem)  
-                            elif self._attribs[field_name]['type_info'] == "Group":
-                                infos = Group(data=elem)    
-                            elif self._attribs[field_name]['type_info'] == "Contacts":
-                                infos = Contacts(data=elem)     
-                            elif self._attribs[field_name]['type_info'] == "Interface":
-                                infos = Interface(data=elem)
-                            elif self._attribs[field_name]['type_info'] == "LanHostName":
-                                infos = LanHostName(data=elem)
-                            elif self._attribs[field_name]['type_info'] == "LanHostL3Connectivity":
-                                infos = LanHostL3Connectivity(data=elem)
-                            elif self._attribs[field_name]['type_info'] == "LanHost":
-                                infos = LanHost(data=elem)
-                            elif self._attribs[field_name]['type_info'] == "LanHosts":
-                                infos = LanHosts(data=elem)
-                            elif self._attribs[field_name]['type_info'] == "FwRedir":
-                                infos = FwRedir(wdata=elem)
-                            elif self._attribs[field_name]['type_info'] == "FwRedirs":
-                                infos = FwRedirs(data=elem)
-                            elif self._attribs[field_name]['type_info'] == "Static_Lease":
-                                infos = Static_Lease(wdata=elem)
-                            elif self._attribs[field_name]['type_info'] == "Static_Leases":
-                                infos = Static_Leases(data=elem)
-                            elif self._attribs[field_name]['type_info'] == "Dynamic_Lease":
-                                infos = Static_Lease(wdata=elem)
-                            elif self._attribs[field_name]['type_info'] == "Dynamic_Leases":
-                                infos = Dynamic_Lease(wdata=elem)
-                                #print(u'infos:',infos)
-                            if infos != None:
-                                obj_list.append(infos)
-                        setattr(self, field_name, obj_list)
-                    else:
-                        if self._attribs[field_name]['type_info'] == datetime:
-                            setattr(self, field_name, datetime.fromtimestamp(data[field_name]))
-                            #setattr(self, field_name, data[field_name])
-                        elif field_name == 'l2ident':
-                            infos = LanHostL2Ident(data=data[field_name])
-                            setattr(self, field_name, infos)
-                        else:
-                            setattr(self, field_name, data[field_name])
+            fields = self._instance_decoder().fields
+            for field_name in data:
+                decode = fields.get(field_name)
+                if decode is not None:
+                    setattr(self, field_name, decode(data[field_name]))
         elif isinstance(data, FreeboxObj):
             for field_name in self._attribs:
                 try:
@@ -102,84 +279,9 @@ class FreeboxObj(object):
                 except AttributeError:
                     pass
         elif isinstance(data, list):
-            # Quel est le type de data ?
-            fbxobj_type = "Contacts"
-            for field_name in self._attribs:
-                #print(field_name)
-                if self._attribs[field_name]['type_info'] == "Contact":
-                    fbxobj_type = "Contacts"
-                    break
-                elif self._attribs[field_name]['type_info'] == "Call":
-                    fbxobj_type = "Calls"
-                    break
-                elif self._attribs[field_name]['type_info'] == "Group":
-                    fbxobj_type = "Groups"
-                    break
-                elif self._attribs[field_name]['type_info'] == "Interface":
-                    fbxobj_type = "Interfaces"
-                    break
-                elif self._attribs[field_name]['type_info'] == "LanHostName":
-                    fbxobj_type = "Names"
-                    break
-                elif self._attribs[field_name]['type_info'] == "LanHostL3Connectivity":
-                    fbxobj_type = "LanHostL3Connectivity"
-                    break
-                elif self._attribs[field_name]['type_info'] == "LanHost":
-                    fbxobj_type = "LanHosts"
-                    break
-                elif self._attribs[field_name]['type_info'] == "FwRedir":
-                    fbxobj_type = "FwRedirs"
-                    break
-                elif self._attribs[field_name]['type_info'] == "Static_Lease":
-                    fbxobj_type = "Static_Leases"
-                    break
-                elif self._attribs[field_name]['type_info'] == "Dynamic_Lease":
-                    fbxobj_type = "Dynamic_Leases"
-                    break
-            obj_list = []
-            for elem in data:
-                if fbxobj_type == "Contacts":
-                    infos = Contact()
-                elif fbxobj_type == "Calls":
-                    infos = Call()
-                elif fbxobj_type == "Groups":
-                    infos = Group()
-                elif fbxobj_type == "Interfaces":
-                    infos = Interface()
-                elif fbxobj_type == "L3connectivities":
-                    infos = LanHostL3Connectivity()
-                elif fbxobj_type == "Names":
-                    infos = LanHostName()
-                elif fbxobj_type == "LanHosts":
-                    infos = LanHost()
-                elif fbxobj_type == "FwRedirs":
-                    infos = FwRedir()
-                elif fbxobj_type == "Static_Leases":
-                    infos = Static_Lease()
-                elif fbxobj_type == "Dynamic_Leases":
-                    infos = Dynamic_Lease()
-                infos.load_data(elem)
-                obj_list.append(infos)
-            if fbxobj_type == "Contacts":
-                setattr(self, 'contacts', obj_list)
-            elif fbxobj_type == "Calls":
-                setattr(self, 'calls', obj_list)
-            elif fbxobj_type == "Groups":
-                setattr(self, 'groups', obj_list)
-            elif fbxobj_type == "Interfaces":
-                setattr(self, 'interfaces', obj_list)
-            elif fbxobj_type == "Names":
-                setattr(self, 'names', obj_list)
-            elif fbxobj_type == "L3connectivities":
-                setattr(self, 'l3connectivities', obj_list)
-            elif fbxobj_type == "LanHosts":
-                setattr(self, 'lanhosts', obj_list)
-            elif fbxobj_type == "Static_Leases":
-                setattr(self, 'static_leases', obj_list)
-            elif fbxobj_type == "Dynamic_Leases":
-                setattr(self, 'dynamic_leases', obj_list)
-            elif fbxobj_type == "FwRedirs":
-                setattr(self, 'fwredirs', obj_list)
+            field_name, fbxobj_class = self._instance_decoder().list_field
+            setattr(self, field_name,
+                    [_build(fbxobj_class, elem) for elem in data])
 
     def dump_request(self,url='',response='',args={},params={},data={}):
         print("url: %s" % url)
@@ -191,26 +293,20 @@ class FreeboxObj(object):
         return
 
     def _get_by_id(self,url,**kwargs):
-        @self._fbx.api.call(url)
-        def wrapper():
-            id = kwargs.get('id',None)
-            contact_id = kwargs.get('contact_id',None)
-            data = kwargs.get('data',{})
-            args = kwargs.get('args',{})
-            params = kwargs.get('params',{})
-
-            if id != None:
-                args['id'] = id
+        id = kwargs.get('id',None)
+        contact_id = kwargs.get('contact_id',None)
+        args = dict(kwargs.get('args',None) or {})
+        params = kwargs.get('params',{})
 
-            if contact_id != None:
-                args['contact_id'] = contact_id
+        if id != None:
+            args['id'] = id
 
-            #print({'args': args, 'params': params, 'is_json': True})
-            return {'args': args, 'params': params, 'is_json': True}
+        if contact_id != None:
+            args['contact_id'] = contact_id
 
-        return wrapper()
+        return self._fbx.request(url, args=args, params=params, is_json=True)
 
-    def get_by_id(self,id=None,data={},params={},args={}):
+    def get_by_id(self,id=None,data={},params={},args=None):
         url = self._url_get
         #print("id: %s" % id)
         if self._fbx == None :
@@ -218,31 +314,40 @@ class FreeboxObj(object):
         if id != None:
             url += ':id'
         #self.dump_request(url=url,args=args,params=params,data=data)
-        datar = self._get_by_id(url,id=id,params=params,data=data,args=args)['data']
-        try:
-            if not datar['success']:
-                self.dump_request(url=url,response=datar,args=args,params=params,data=data)
-                return self
-        except KeyError:
-            self.dump_request(url=url,response=datar,args=args,params=params,data=data)
-            return self
-
-        result = datar['result']
-        self.load_data(result)
+        response = self._get_by_id(url,id=id,params=params,data=data,args=args)
+        # a failure left after the retries raises, no half loaded object
+        result = self._fbx._result(url, response)
+        self._load_timed(url, 'GET', result)
         return self
 
-    def _set_by_id(self,url,id,data):
-        @self._fbx.api.call(url, method='PUT')
-        def wrapper():
-            if id != None:
-                args = {'id': id}
-                #print(args)
-                #print(data)
-                return {'args': args, 'data': data, 'is_json': True}
-            else:
-                return {}
+    def _load_timed(self, url, method, data):
+        start = clock()
+        self.load_data(data)
+        self._fbx._stats.record_build(url, method, clock() - start)
+
+    def iter_by_id(self,params={},args=None):
+        """
+        Stream a list endpoint: yield each element decoded as soon as it
+        has been read, without holding the whole list.
+        """
+        field_name, fbxobj_class = self._instance_decoder().list_field
+        build = 0.0
+        try:
+            for elem in self._fbx.iter_result(self._url_get, args=args,
+                                              params=params):
+                start = clock()
+                fbxobj = _build(fbxobj_class, elem)
+                build += clock() - start
+                yield fbxobj
+        finally:
+            self._fbx._stats.record_build(self._url_get, 'GET', build)
 
-        return wrapper()
+    def _set_by_id(self,url,id,data):
+        if id != None:
+            return self._fbx.request(url, method='PUT', args={'id': id},
+                                     data=data, is_json=True)
+        else:
+            return self._fbx.request(url, method='PUT')
 
     def set_by_id(self,id,data):
         if isinstance(data, FreeboxObj):
@@ -250,24 +355,14 @@ class FreeboxObj(object):
         else:
             datadict = data
         datadict['id'] = None
-        respons = self._set_by_id(self._url_get+':id',id,datadict)
-        #print("set_by_id %s -> data: %s, %s" % (id, str(datadict),respons))
-        datar = respons['data']
-        try:
-            if not datar['success']:
-                return self
-        except KeyError:
-            return self
-        result = datar['result']
-        infos = self.load_data(result)
-        return infos
+        url = self._url_get+':id'
+        response = self._set_by_id(url,id,datadict)
+        result = self._fbx._result(url, response)
+        self._load_timed(url, 'PUT', result)
+        return self
 
     def _new_fbxobj(self,url,data):
-        @self._fbx.api.call(url, method='POST')
-        def wrapper():
-            return {'data': data, 'is_json': True}
-
-        return wrapper()
+        return self._fbx.request(url, method='POST', data=data, is_json=True)
 
     def new_fbxobj(self,data):
         if isinstance(data, FreeboxObj):
@@ -275,52 +370,27 @@ class FreeboxObj(object):
         else:
             datadict = data
         #print(datadict)
-        respons = self._new_fbxobj(self._url_get,datadict)
-        #print("new_fbxobj -> data: %s, response: %s" % (datadict,str(respons)))
-        datar = respons['data']
-        try:
-            if not datar['success']:
-                return self
-        except KeyError:
-            return self
-        result = datar['result']
-        self.load_data(result)
+        response = self._new_fbxobj(self._url_get,datadict)
+        result = self._fbx._result(self._url_get, response)
+        self._load_timed(self._url_get, 'POST', result)
         return self
 
     def _delete_by_id(self,url,id):
-        @self._fbx.api.call(url, method='DELETE')
-        def wrapper():
-            args = {'id': id}
-            return {'args': args}
-
-        return wrapper()
+        return self._fbx.request(url, method='DELETE', args={'id': id})
 
     def delete_by_id(self,id):
-        respons = self._delete_by_id(self._url_get+':id',id)
-        try:
-            crdu = respons['data']['success']
-        except KeyError:
-            crdu = False
-        if not crdu:
-            print("delete_by_id %s - %s : %s ->\r\n %s" % (self.__class__,self._url_get+':id',id,str(respons)))
-        return crdu
+        url = self._url_get+':id'
+        self._fbx._result(url, self._delete_by_id(url,id))
+        return True
 
     def generique_api(self,url,params={},args={},data={},method='GET',is_json=False):
-        @self._fbx.api.call(url,method=method)
-        def wrapper():
-            if data == {}:
-                if args == {}:
-                    print(params)
-                    return {'params': params, 'is_json': is_json}
-                else:
-                    return {'args':args, 'is_json': is_json}
+        if data == {}:
+            if args == {}:
+                print(params)
             else:
-                if args == {}:
-                    return {'data': data, 'params': params, 'is_json': is_json}
-                else:
-                    return {'args':args, 'params': params,'data': data, 'is_json': is_json}
-
-        return wrapper()
+                params = {}
+        return self._fbx.request(url, method=method, args=args,
+                                 params=params, data=data, is_json=is_json)
 
 
     def __str__(self):
@@ -346,179 +416,195 @@ class FreeboxObj(object):
         return u"\r\n".join(result)
 
     def fbobj2dict(self):
+        """
+        The fields set, by name: the schema fields live in slots, so
+        __dict__ only holds the extra attributes.
+        """
         result = {}
         for field_name in self._attribs:
             if field_name != "__dict__":
-                try:
-                    if getattr(self,field_name) != None:
-                        result[field_name] = getattr(self,field_name)
-                except:
-                    pass
+                value = getattr(self,field_name,None)
+                if value != None:
+                    result[field_name] = value
         return result
 
 class Boxinfos(FreeboxObj):
 
-        def __init__(self, fbx=None, data={}, attribs={\
-            'uptime':       {'list': False,'type_info': str},\
-            'disk_status':  {'list': False,'type_info': bool},\
-            'fan_rpm':      {'list': False,'type_info': int},\
-            'temp_cpub':    {'list': False,'type_info': int},\
-            'uptime_val':   {'list': False,'type_info': timedelta},\
-            'board_name':        {'list': False,'type_info': str},\
-            'mac':               {'list': False,'type_info': str},\
-            'temp_cpum':         {'list': False,'type_info': int},\
-            'temp_sw':           {'list': False,'type_info': int},\
-            'box_authenticated': {'list': False,'type_info': bool},\
-            'serial':            {'list': False,'type_info': str},\
-            'firmware_version':  {'list': False,'type_info': str},\
-            'boxinfos_loaded':   {'list': False,'type_info': bool}\
-        }):
-            FreeboxObj.__init__(self, fbx, data, attribs)
+    # /system/ returns more fields than the schema, kept in __dict__
+
+    _attribs = {
+        'uptime':       {'list': False,'type_info': str},
+        'disk_status':  {'list': False,'type_info': bool},
+        'fan_rpm':      {'list': False,'type_info': int},
+        'temp_cpub':    {'list': False,'type_info': int},
+        'uptime_val':   {'list': False,'type_info': timedelta},
+        'board_name':        {'list': False,'type_info': str},
+        'mac':               {'list': False,'type_info': str},
+        'temp_cpum':         {'list': False,'type_info': int},
+        'temp_sw':           {'list': False,'type_info': int},
+        'box_authenticated': {'list': False,'type_info': bool},
+        'serial':            {'list': False,'type_info': str},
+        'firmware_version':  {'list': False,'type_info': str},
+        'boxinfos_loaded':   {'list': False,'type_info': bool}
+    }
 
 class Permissions(FreeboxObj):
 
-        def __init__(self, fbx=None, data={}, attribs={\
-            'pvr':      {'list': False,'type_info': bool},\
-            'explorer': {'list': False,'type_info': bool},\
-            'calls':    {'list': False,'type_info': bool},\
-            'contacts': {'list': False,'type_info': bool},\
-            'tv':       {'list': False,'type_info': bool},\
-            'parental': {'list': False,'type_info': bool},\
-            'settings': {'list': False,'type_info': bool},\
-            'downloader': {'list': False,'type_info': bool}\
-        }):
-            FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'pvr':      {'list': False,'type_info': bool},
+        'explorer': {'list': False,'type_info': bool},
+        'calls':    {'list': False,'type_info': bool},
+        'contacts': {'list': False,'type_info': bool},
+        'tv':       {'list': False,'type_info': bool},
+        'parental': {'list': False,'type_info': bool},
+        'settings': {'list': False,'type_info': bool},
+        'downloader': {'list': False,'type_info': bool}
+    }
 
 class Calls(FreeboxObj):
 
     _url_get = '/call/log/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'calls':   {'list': True,'type_info': "Call"}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'calls':   {'list': True,'type_info': "Call"}
+    }
+
+    def to_columns(self, backend=None):
+        """
+        The call log as columns (id, type, datetime, duration, number,
+        contact_id, line_id), see fbxtools.columns.call_columns. Loaded
+        calls are used if any, else the JSON is read with no Call object
+        built.
+        """
+        from fbxtools.columns import call_columns
+        if has_field(self, 'calls'):
+            return call_columns(self.calls, backend=backend)
+        if self._fbx is None:
+            return call_columns([], backend=backend)
+        return call_columns(self._fbx.iter_result(self._url_get),
+                            backend=backend)
 
 class Call(FreeboxObj):
 
     _url_get = '/call/log/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'number':     {'list': False,'type_info': str},\
-        'type':       {'list': False,'type_info': str},\
-        'id':         {'list': False,'type_info': int},\
-        'duration':   {'list': False,'type_info': timedelta},\
-        'datetime':   {'list': False,'type_info': datetime},\
-        'contact_id': {'list': False,'type_info': int},\
-        'line_id':    {'list': False,'type_info': int},\
-        'name':       {'list': False,'type_info': str},\
-        'new':        {'list': False,'type_info': bool},\
-        'missed':     {'list': False,'type_info': bool},\
-        'accepted':   {'list': False,'type_info': bool},\
-        'outgoing':   {'list': False,'type_info': bool}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    # Contact of contact_id, attached by Fbx.expand_contacts
+    __slots__ = ('_contact',)
+
+    _attribs = {
+        'number':     {'list': False,'type_info': str},
+        'type':       {'list': False,'type_info': str},
+        'id':         {'list': False,'type_info': int},
+        'duration':   {'list': False,'type_info': timedelta},
+        'datetime':   {'list': False,'type_info': datetime},
+        'contact_id': {'list': False,'type_info': int},
+        'line_id':    {'list': False,'type_info': int},
+        'name':       {'list': False,'type_info': str},
+        'new':        {'list': False,'type_info': bool},
+        'missed':     {'list': False,'type_info': bool},
+        'accepted':   {'list': False,'type_info': bool},
+        'outgoing':   {'list': False,'type_info': bool}
+    }
+
+    @property
+    def contact(self):
+        return getattr(self, '_contact', None)
+
+    @contact.setter
+    def contact(self, contact):
+        self._contact = contact
 
 class Static_Leases(FreeboxObj):
 
     _url_get = '/dhcp/static_lease/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'static_leases':   {'list': True,'type_info': "Static_Lease"}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'static_leases':   {'list': True,'type_info': "Static_Lease"}
+    }
 
 class Dynamic_Leases(FreeboxObj):
 
     _url_get = '/dhcp/dynamic_lease/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'dynamic_leases':   {'list': True,'type_info': "Dynamic_Lease"}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'dynamic_leases':   {'list': True,'type_info': "Dynamic_Lease"}
+    }
 
 class Static_Lease(FreeboxObj):
 
     _url_get = '/dhcp/static_lease/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'mac':        {'list': False,'type_info': str},\
-        'comment':    {'list': False,'type_info': str},\
-        'hostname':   {'list': False,'type_info': str},\
-        'id':         {'list': False,'type_info': int},\
-        'host'    :   {'list': False,'type_info': "LanHost"},\
-        'ip':         {'list': False,'type_info': int}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'mac':        {'list': False,'type_info': str},
+        'comment':    {'list': False,'type_info': str},
+        'hostname':   {'list': False,'type_info': str},
+        'id':         {'list': False,'type_info': int},
+        'host'    :   {'list': False,'type_info': "LanHost",'dict': True},
+        'ip':         {'list': False,'type_info': int}
+    }
 
 class Dynamic_Lease(FreeboxObj):
 
     _url_get = '/dhcp/dynamic_lease/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'mac':          {'list': False,'type_info': str},\
-        'host':         {'list': False,'type_info': "LanHost"},\
-        'refresh_time': {'list': False,'type_info': datetime},\
-        'hostname':     {'list': False,'type_info': str},\
-        'assign_time':  {'list': False,'type_info': datetime},\
-        'lease_remaining': {'list': False,'type_info': int},\
-        'is_static':    {'list': False,'type_info': bool},\
-        'ip':           {'list': False,'type_info': int}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'mac':          {'list': False,'type_info': str},
+        'host':         {'list': False,'type_info': "LanHost",'dict': True},
+        'refresh_time': {'list': False,'type_info': datetime},
+        'hostname':     {'list': False,'type_info': str},
+        'assign_time':  {'list': False,'type_info': datetime},
+        'lease_remaining': {'list': False,'type_info': int},
+        'is_static':    {'list': False,'type_info': bool},
+        'ip':           {'list': False,'type_info': int}
+    }
 
 class Contacts(FreeboxObj):
 
     _url_get = '/contact/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'contacts':   {'list': True,'type_info': "Contact"}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'contacts':   {'list': True,'type_info': "Contact"}
+    }
 
 class Groups(FreeboxObj):
 
     _url_get = '/group/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'groups':   {'list': True,'type_info': "Group"}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'groups':   {'list': True,'type_info': "Group"}
+    }
 
 class Interfaces(FreeboxObj):
 
     _url_get = '/lan/browser/interfaces/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'interfaces':   {'list': True,'type_info': "Interface"}\
-    }):
-        FreeboxObj.__init__(self, fbx=fbx, data=data, attribs=attribs)
+    _attribs = {
+        'interfaces':   {'list': True,'type_info': "Interface"}
+    }
 
 class Names(FreeboxObj):
 
     _url_get = ''
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'names':   {'list': True,'type_info': "LanHostName"}\
-    }):
-        FreeboxObj.__init__(self, fbx=fbx, data=data, attribs=attribs)
+    _attribs = {
+        'names':   {'list': True,'type_info': "LanHostName"}
+    }
 
 class L3connectivities(FreeboxObj):
 
     _url_get = ''
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'l3connectivities':   {'list': True,'type_info': "LanHostL3Connectivity"}\
-    }):
-        FreeboxObj.__init__(self, fbx=fbx, data=data, attribs=attribs)
+    _attribs = {
+        'l3connectivities':   {'list': True,'type_info': "LanHostL3Connectivity"}
+    }
 
 class LanHosts(FreeboxObj):
 
     _url_get = '/lan/browser/:interface/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'lanhosts':   {'list': True,'type_info': "LanHost"}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'lanhosts':   {'list': True,'type_info': "LanHost"}
+    }
 
 
 
@@ -526,22 +612,21 @@ class Contact(FreeboxObj):
 
     _url_get = '/contact/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'first_name':   {'list': False,'type_info': str},\
-        'last_name':    {'list': False,'type_info': str},\
-        'display_name': {'list': False,'type_info': str},\
-        'addresses':    {'list': True,'type_info': "Address"},\
-        'notes':        {'list': False,'type_info': str},\
-        'company':      {'list': False,'type_info': str},\
-        'emails':       {'list': False,'type_info': "Email"},\
-        'last_update':  {'list': False,'type_info': datetime},\
-        'birthday':     {'list': False,'type_info': str},\
-        'numbers':      {'list': True,'type_info': "Number"},\
-        'urls':         {'list': True,'type_info': "Url"},\
-        'id':           {'list': False,'type_info': int},\
-        'photo_url':    {'list': False,'type_info': str}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'first_name':   {'list': False,'type_info': str},
+        'last_name':    {'list': False,'type_info': str},
+        'display_name': {'list': False,'type_info': str},
+        'addresses':    {'list': True,'type_info': "Address"},
+        'notes':        {'list': False,'type_info': str},
+        'company':      {'list': False,'type_info': str},
+        'emails':       {'list': False,'type_info': "Email"},
+        'last_update':  {'list': False,'type_info': datetime},
+        'birthday':     {'list': False,'type_info': str},
+        'numbers':      {'list': True,'type_info': "Number"},
+        'urls':         {'list': True,'type_info': "Url"},
+        'id':           {'list': False,'type_info': int},
+        'photo_url':    {'list': False,'type_info': str}
+    }
 
     def add_number(self,number):
         number.contact_id = self.id
@@ -592,25 +677,26 @@ class Group(FreeboxObj):
 
     _url_get = '/group/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'nb_contact': {'list': False,'type_info': int},\
-        'id':         {'list': False,'type_info': int},\
-        'name':       {'list': False,'type_info': str}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'nb_contact': {'list': False,'type_info': int},
+        'id':         {'list': False,'type_info': int},
+        'name':       {'list': False,'type_info': str}
+    }
 
 class Number(FreeboxObj):
 
     _url_get = '/number/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'number':     {'list': False,'type_info': int},\
-        'contact_id': {'list': False,'type_info': int},\
-        'is_default': {'list': False,'type_info': bool},\
-        'is_own':     {'list': False,'type_info': bool},\
-        'type':       {'list': False,'type_info': str},\
-        'id':         {'list': False,'type_info': int}\
-    }):
+    _attribs = {
+        'number':     {'list': False,'type_info': int},
+        'contact_id': {'list': False,'type_info': int},
+        'is_default': {'list': False,'type_info': bool},
+        'is_own':     {'list': False,'type_info': bool},
+        'type':       {'list': False,'type_info': str},
+        'id':         {'list': False,'type_info': int}
+    }
+
+    def __init__(self, fbx=None, data=None, attribs=None):
         FreeboxObj.__init__(self, fbx, data, attribs)
         try:
             if (self._fbx) \
@@ -625,51 +711,50 @@ class Address(FreeboxObj):
 
     _url_get = '/address/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'city':       {'list': False,'type_info': str},\
-        'country':    {'list': False,'type_info': str},\
-        'street2':    {'list': False,'type_info': str},\
-        'zipcode':    {'list': False,'type_info': str},\
-        'contact_id': {'list': False,'type_info': int},\
-        'number':     {'list': False,'type_info': int},\
-        'street':     {'list': False,'type_info': str},\
-        'type':       {'list': False,'type_info': str},\
-        'id':         {'list': False,'type_info': int}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'city':       {'list': False,'type_info': str},
+        'country':    {'list': False,'type_info': str},
+        'street2':    {'list': False,'type_info': str},
+        'zipcode':    {'list': False,'type_info': str},
+        'contact_id': {'list': False,'type_info': int},
+        'number':     {'list': False,'type_info': int},
+        'street':     {'list': False,'type_info': str},
+        'type':       {'list': False,'type_info': str},
+        'id':         {'list': False,'type_info': int}
+    }
 
 class Email(FreeboxObj):
 
     _url_get = '/email/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'email':      {'list': False,'type_info': str},\
-        'contact_id': {'list': False,'type_info': int},\
-        'type':       {'list': False,'type_info': str},\
-        'id':         {'list': False,'type_info': int}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'email':      {'list': False,'type_info': str},
+        'contact_id': {'list': False,'type_info': int},
+        'type':       {'list': False,'type_info': str},
+        'id':         {'list': False,'type_info': int}
+    }
 
 class Url(FreeboxObj):
 
     _url_get = '/url/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'url':        {'list': False,'type_info': str},\
-        'contact_id': {'list': False,'type_info': int},\
-        'type':       {'list': False,'type_info': str},\
-        'id':         {'list': False,'type_info': int}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'url':        {'list': False,'type_info': str},
+        'contact_id': {'list': False,'type_info': int},
+        'type':       {'list': False,'type_info': str},
+        'id':         {'list': False,'type_info': int}
+    }
 
 class Interface(FreeboxObj):
 
     _url_get = '/lan/browser/interfaces/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'name':       {'list': False,'type_info': str},\
-        'host_count': {'list': False,'type_info': int}\
-    }):
+    _attribs = {
+        'name':       {'list': False,'type_info': str},
+        'host_count': {'list': False,'type_info': int}
+    }
+
+    def __init__(self, fbx=None, data=None, attribs=None):
         FreeboxObj.__init__(self, fbx=None, data=data, attribs=attribs)
 
 
@@ -677,78 +762,81 @@ class LanHost(FreeboxObj):
 
     _url_get = '/lan/browser/:interface/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'id':           {'list': False,'type_info': int},\
-        'primary_name': {'list': False,'type_info': str},\
-        'host_type':    {'list': False,'type_info': str},\
-        'primary_name_manual': {'list': False,'type_info': bool},\
-        'l2ident':      {'list': False,'type_info': "LanHostL2Ident"},\
-        'vendor_name':  {'list': False,'type_info': str},\
-        'persistent':   {'list': False,'type_info': bool},\
-        'reachable':    {'list': False,'type_info': bool},\
-        'last_time_reachable': {'list': False,'type_info': datetime},\
-        'active':       {'list': False,'type_info': bool},\
-        'last_activity':{'list': False,'type_info': datetime},\
-        'names':        {'list': True,'type_info': "LanHostName"},\
-        'l3connectivities':    {'list': True,'type_info': "LanHostL3Connectivity"}\
-    },id=None,args={'interface': 'pub'}):
+    __slots__ = ('_interface_name',)
+
+    _attribs = {
+        'id':           {'list': False,'type_info': int},
+        'primary_name': {'list': False,'type_info': str},
+        'host_type':    {'list': False,'type_info': str},
+        'primary_name_manual': {'list': False,'type_info': bool},
+        'l2ident':      {'list': False,'type_info': "LanHostL2Ident",'dict': True},
+        'vendor_name':  {'list': False,'type_info': str},
+        'persistent':   {'list': False,'type_info': bool},
+        'reachable':    {'list': False,'type_info': bool},
+        'last_time_reachable': {'list': False,'type_info': datetime},
+        'active':       {'list': False,'type_info': bool},
+        'last_activity':{'list': False,'type_info': datetime},
+        'interface':    {'list': False,'type_info': str},
+        'names':        {'list': True,'type_info': "LanHostName"},
+        'l3connectivities':    {'list': True,'type_info': "LanHostL3Connectivity"}
+    }
+
+    def __init__(self, fbx=None, data=None, attribs=None, id=None, args=None):
+        if args is None:
+            args = {'interface': 'pub'}
         self._interface_name = args['interface']
         if id !=None:
+            data = dict(data or {})
             data['id'] = id
-        FreeboxObj.__init__(self, fbx=fbx, data=data, args=args, attribs=attribs)
+        FreeboxObj.__init__(self, fbx=fbx, data=data, attribs=attribs, args=args)
 
 class LanHostL2Ident(FreeboxObj):
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'id':           {'list': False,'type_info': int},\
-        'type':         {'list': False,'type_info': str},\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'id':           {'list': False,'type_info': int},
+        'type':         {'list': False,'type_info': str},
+    }
 
 class LanHostName(FreeboxObj):
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'name':           {'list': False,'type_info': str},\
-        'source':         {'list': False,'type_info': str},\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'name':           {'list': False,'type_info': str},
+        'source':         {'list': False,'type_info': str},
+    }
 
 class LanHostL3Connectivity(FreeboxObj):
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'addr':           {'list': False,'type_info': str},\
-        'af':         {'list': False,'type_info': str},\
-        'active':       {'list': False,'type_info': bool},\
-        'reachable':    {'list': False,'type_info': bool},\
-        'last_activity':{'list': False,'type_info': datetime},\
-        'last_time_reachable':  {'list': False,'type_info': datetime},\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'addr':           {'list': False,'type_info': str},
+        'af':         {'list': False,'type_info': str},
+        'active':       {'list': False,'type_info': bool},
+        'reachable':    {'list': False,'type_info': bool},
+        'last_activity':{'list': False,'type_info': datetime},
+        'last_time_reachable':  {'list': False,'type_info': datetime},
+    }
 
 class FwRedirs(FreeboxObj):
 
     _url_get = '/fw/redir/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'fwredirs':   {'list': True,'type_info': "FwRedir"}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'fwredirs':   {'list': True,'type_info': "FwRedir"}
+    }
 
 class FwRedir(FreeboxObj):
 
     _url_get = '/fw/redir/'
 
-    def __init__(self, fbx=None, data={}, attribs={\
-        'enabled':    {'list': False,'type_info': bool},\
-        'comment':    {'list': False,'type_info': str},\
-        'id':         {'list': False,'type_info': int},\
-        'host'    :   {'list': False,'type_info': "LanHost"},\
-        'hostname':   {'list': False,'type_info': str},\
-        'lan_port':   {'list': False,'type_info': int},\
-        'wan_port_start': {'list': False,'type_info': int},\
-        'wan_port_end':   {'list': False,'type_info': int},\
-        'lan_ip':     {'list': False,'type_info': str},\
-        'ip_proto':   {'list': False,'type_info': str},\
-        'src_ip':     {'list': False,'type_info': str}\
-    }):
-        FreeboxObj.__init__(self, fbx, data, attribs)
+    _attribs = {
+        'enabled':    {'list': False,'type_info': bool},
+        'comment':    {'list': False,'type_info': str},
+        'id':         {'list': False,'type_info': int},
+        'host'    :   {'list': False,'type_info': "LanHost"},
+        'hostname':   {'list': False,'type_info': str},
+        'lan_port':   {'list': False,'type_info': int},
+        'wan_port_start': {'list': False,'type_info': int},
+        'wan_port_end':   {'list': False,'type_info': int},
+        'lan_ip':     {'list': False,'type_info': str},
+        'ip_proto':   {'list': False,'type_info': str},
+        'src_ip':     {'list': False,'type_info': str}
+    }
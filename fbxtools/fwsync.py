@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from __future__ import absolute_import
+
+from concurrent.futures import ThreadPoolExecutor
+
+from fbxtools.exceptions import FbxRequestError
+from fbxtools.fbxo import FreeboxObj, FwRedir
+
+# a port forward is identified by its WAN side
+KEY_FIELDS = ('ip_proto', 'wan_port_start', 'wan_port_end')
+
+# fields compared and written
+RULE_FIELDS = KEY_FIELDS + ('lan_ip', 'lan_port', 'src_ip', 'enabled',
+                            'comment')
+
+_INT_FIELDS = ('wan_port_start', 'wan_port_end', 'lan_port')
+
+
+def normalize_rule(rule, defaults=True):
+    """
+    RULE_FIELDS of a port forward (dict or FwRedir). The WAN side
+    defaults (tcp, single port range) are always filled in, the other
+    box defaults (same LAN port, any source, enabled, no comment) only
+    if defaults.
+    """
+    if isinstance(rule, FreeboxObj):
+        rule = rule.fbobj2dict()
+    rule = dict((field_name, rule[field_name]) for field_name in RULE_FIELDS
+                if rule.get(field_name) is not None)
+    for field_name in _INT_FIELDS:
+        if field_name in rule:
+            rule[field_name] = int(rule[field_name])
+    rule.setdefault('ip_proto', 'tcp')
+    rule.setdefault('wan_port_end', rule['wan_port_start'])
+    if defaults:
+        rule.setdefault('lan_port', rule['wan_port_start'])
+        rule.setdefault('src_ip', '0.0.0.0')
+        rule.setdefault('enabled', True)
+        rule.setdefault('comment', '')
+    return rule
+
+
+def rule_key(rule):
+    return tuple(rule[field_name] for field_name in KEY_FIELDS)
+
+
+class FwRedirPlan(object):
+    """
+    Writes bringing the live port forwards to the desired ones:
+    creates (rule dicts), updates ((id, changed fields, live rule)) and
+    deletes ((id, live rule)). errors gets (action, item, exception)
+    once applied.
+    """
+
+    def __init__(self):
+        self.creates = []
+        self.updates = []
+        self.deletes = []
+        self.unchanged = 0
+        self.errors = []
+        self.applied = False
+
+    def __len__(self):
+        return len(self.creates) + len(self.updates) + len(self.deletes)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def __repr__(self):
+        return '<FwRedirPlan create=%d update=%d delete=%d unchanged=%d ' \
+            'applied=%s errors=%d>' % (len(self.creates), len(self.updates),
+                                       len(self.deletes), self.unchanged,
+                                       self.applied, len(self.errors))
+
+
+def plan_fwredirs(live, desired, prune=True):
+    """
+    Compare live port forwards to desired rules (dicts or FwRedir
+    objects), matched on KEY_FIELDS. Only the fields a desired rule
+    sets are compared and the changed ones updated, the box defaults
+    are filled in for creates. Live rules not desired are deleted if
+    prune.
+    """
+    plan = FwRedirPlan()
+    live_rules = {}
+    for fwredir in live:
+        if isinstance(fwredir, FreeboxObj):
+            id = fwredir.id
+        else:
+            id = fwredir['id']
+        rule = normalize_rule(fwredir)
+        key = rule_key(rule)
+        if key in live_rules:
+            # duplicate of a rule already matched, keep only one
+            plan.deletes.append((id, rule))
+            continue
+        live_rules[key] = (id, rule)
+
+    seen = set()
+    for desired_rule in desired:
+        # a field left out keeps its live value
+        rule = normalize_rule(desired_rule, defaults=False)
+        key = rule_key(rule)
+        if key in seen:
+            raise ValueError('port forward %s/%d-%d desired twice' % key)
+        seen.add(key)
+        if key not in live_rules:
+            plan.creates.append(normalize_rule(desired_rule))
+            continue
+        id, live_rule = live_rules[key]
+        changes = dict((field_name, value) for field_name, value in rule.items()
+                       if live_rule.get(field_name) != value)
+        if changes:
+            plan.updates.append((id, changes, live_rule))
+        else:
+            plan.unchanged += 1
+
+    if prune:
+        plan.deletes.extend(live_rules[key] for key in live_rules
+                            if key not in seen)
+    return plan
+
+
+def _run(fbx, plan, action, item, method, path, args=None, data=None):
+    try:
+        fbx.request_result(path, method=method, args=args, data=data)
+    except (FbxRequestError, IOError) as e:
+        plan.errors.append((action, item, e))
+
+
+def apply_fwredirs(fbx, desired, prune=True, dry_run=False, max_workers=4):
+    """
+    Bring the port forwards of fbx to desired with the fewest writes,
+    at most max_workers at a time: deletes first (freeing WAN ports),
+    then updates, then creates. Return the FwRedirPlan, not applied if
+    dry_run.
+    """
+    # read the live rules directly: a failed read must not look empty
+    live = fbx.request_result(FwRedir._url_get) or []
+    plan = plan_fwredirs(live, desired, prune=prune)
+    if dry_run or not len(plan):
+        return plan
+
+    path = FwRedir._url_get
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for phase in (
+                [('delete', item, 'DELETE', path + ':id', {'id': item[0]}, None)
+                 for item in plan.deletes],
+                [('update', item, 'PUT', path + ':id', {'id': item[0]}, item[1])
+                 for item in plan.updates],
+                [('create', rule, 'POST', path, None, rule)
+                 for rule in plan.creates]):
+            futures = [executor.submit(_run, fbx, plan, *task) for task in phase]
+            for future in futures:
+                future.result()
+    plan.applied = True
+    return plan
+
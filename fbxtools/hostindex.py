@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from __future__ import absolute_import
+
+
+def _mac_key(mac):
+    return mac.lower() if mac else None
+
+
+def _name_key(name):
+    return name.lower() if name else None
+
+
+class IndexedHost(object):
+    """
+    What the box knows about one MAC address: its LanHost, leases, IPv4/
+    IPv6 addresses, hostnames and the port forwards aiming at it.
+    """
+
+    __slots__ = ('mac', 'lanhost', 'static_lease', 'dynamic_lease',
+                 'addresses', 'hostnames', 'fwredirs')
+
+    def __init__(self, mac):
+        self.mac = mac
+        self.lanhost = None
+        self.static_lease = None
+        self.dynamic_lease = None
+        self.addresses = []
+        self.hostnames = []
+        self.fwredirs = []
+
+    @property
+    def name(self):
+        if self.lanhost is not None and getattr(self.lanhost, 'primary_name', None):
+            return self.lanhost.primary_name
+        return self.hostnames[0] if self.hostnames else None
+
+    @property
+    def has_static_lease(self):
+        return self.static_lease is not None
+
+    def __repr__(self):
+        return '<IndexedHost %s %s %s>' % (self.mac, self.name, self.addresses)
+
+
+class HostIndex(object):
+    """
+    LAN hosts, DHCP leases and port forwards joined by MAC address, with
+    O(1) lookups by MAC, IPv4/IPv6 address and hostname.
+
+        index = app.host_index()
+        host = index.lookup('192.168.1.20')
+        host.has_static_lease, host.fwredirs
+    """
+
+    def __init__(self, lanhosts=(), static_leases=(), dynamic_leases=(),
+                 fwredirs=()):
+        self.hosts = {}
+        self._by_address = {}
+        self._by_name = {}
+        self._fwredirs_by_ip = {}
+
+        for lanhost in lanhosts:
+            l2ident = getattr(lanhost, 'l2ident', None)
+            entry = self._entry(getattr(l2ident, 'id', None))
+            if entry is None:
+                continue
+            entry.lanhost = lanhost
+            for l3 in getattr(lanhost, 'l3connectivities', None) or []:
+                self._add_address(entry, getattr(l3, 'addr', None))
+            self._add_name(entry, getattr(lanhost, 'primary_name', None))
+            for name in getattr(lanhost, 'names', None) or []:
+                self._add_name(entry, getattr(name, 'name', None))
+
+        for field_name, leases in (('static_lease', static_leases),
+                                   ('dynamic_lease', dynamic_leases)):
+            for lease in leases:
+                entry = self._entry(getattr(lease, 'mac', None))
+                if entry is None:
+                    continue
+                setattr(entry, field_name, lease)
+                self._add_address(entry, getattr(lease, 'ip', None))
+                self._add_name(entry, getattr(lease, 'hostname', None))
+
+        for fwredir in fwredirs:
+            lan_ip = getattr(fwredir, 'lan_ip', None)
+            if not lan_ip:
+                continue
+            self._fwredirs_by_ip.setdefault(lan_ip, []).append(fwredir)
+            entry = self.by_address(lan_ip)
+            if entry is not None:
+                entry.fwredirs.append(fwredir)
+
+    @classmethod
+    def from_fbx(cls, fbx, lanhosts=None):
+        """
+        Index of fbx: the cached leases and port forwards, and the LAN
+        hosts of every interface unless given.
+        """
+        if lanhosts is None:
+            lanhosts = fbx.get_all_lanhosts().values()
+        return cls(lanhosts=lanhosts,
+                   static_leases=fbx.staticleases or [],
+                   dynamic_leases=fbx.dynamicleases or [],
+                   fwredirs=fbx.fwredirs or [])
+
+    def _entry(self, mac):
+        key = _mac_key(mac)
+        if key is None:
+            return None
+        entry = self.hosts.get(key)
+        if entry is None:
+            entry = self.hosts[key] = IndexedHost(mac)
+        return entry
+
+    def _add_address(self, entry, address):
+        if not address or address in entry.addresses:
+            return
+        entry.addresses.append(address)
+        self._by_address.setdefault(address.lower(), entry)
+
+    def _add_name(self, entry, name):
+        if not name or name in entry.hostnames:
+            return
+        entry.hostnames.append(name)
+        self._by_name.setdefault(_name_key(name), entry)
+
+    def __len__(self):
+        return len(self.hosts)
+
+    def __iter__(self):
+        return iter(self.hosts.values())
+
+    def by_mac(self, mac):
+        return self.hosts.get(_mac_key(mac))
+
+    def by_address(self, address):
+        return self._by_address.get(address.lower()) if address else None
+
+    def by_hostname(self, name):
+        return self._by_name.get(_name_key(name))
+
+    def lookup(self, key):
+        """
+        IndexedHost with this MAC, address or hostname, None if unknown.
+        """
+        return self.by_mac(key) or self.by_address(key) or self.by_hostname(key)
+
+    def fwredirs_for(self, key):
+        """
+        Port forwards aiming at a host (MAC, address, hostname) or at an
+        IP no host is known for.
+        """
+        entry = self.lookup(key)
+        if entry is not None:
+            return list(entry.fwredirs)
+        return list(self._fwredirs_by_ip.get(key, []))
+
+    def has_static_lease(self, key):
+        entry = self.lookup(key)
+        return entry is not None and entry.has_static_lease
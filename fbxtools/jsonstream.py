@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from __future__ import absolute_import
+
+import codecs
+import json
+
+_WHITESPACE = ' \t\n\r'
+
+# chars that may follow a complete value
+_DELIMITERS = frozenset(_WHITESPACE + ',:]}')
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader(object):
+    """
+    Text buffer over an iterable of bytes (or str) chunks.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buf = u''
+        self.pos = 0
+        self.eof = False
+
+    def more(self):
+        """
+        Read the next chunk, return False at the end of the stream.
+        """
+        if self.eof:
+            return False
+        # drop what has already been parsed
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._utf8.decode(chunk)
+            if chunk:
+                self.buf += chunk
+                return True
+        self.buf += self._utf8.decode(b'', True)
+        self.eof = True
+        return False
+
+    def peek(self):
+        """
+        Skip whitespaces and return the next char, '' at the end.
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return u''
+
+    def expect(self, chars):
+        char = self.peek()
+        if char not in chars or not char:
+            raise ValueError('expected %r at %d, got %r' % (chars, self.pos, char))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """
+        Decode the next complete JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if not self.more():
+                    raise
+                continue
+            # a number cut by a chunk boundary ('893' of '893.87') decodes
+            # too: complete only when followed by a delimiter or the end
+            if (end == len(self.buf) or self.buf[end] not in _DELIMITERS) \
+            and self.more():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array(chunks, key='result', meta=None):
+    """
+    Yield the elements of the 'key' array of the JSON object read from
+    chunks, each one as soon as it is complete. The other members of the
+    object are stored in meta, which is complete once the generator is
+    exhausted.
+    """
+    if meta is None:
+        meta = {}
+    reader = _Reader(chunks)
+    reader.expect(u'{')
+    if reader.peek() == u'}':
+        return
+    while True:
+        name = reader.value()
+        reader.expect(u':')
+        if name == key and reader.peek() == u'[':
+            reader.pos += 1
+            if reader.peek() == u']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.expect(u',]') == u']':
+                        break
+        else:
+            meta[name] = reader.value()
+        if reader.expect(u',}') == u'}':
+            return
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from __future__ import absolute_import
+
+# country of the national numbers (0XXXXXXXXX) seen by a Freebox
+DEFAULT_COUNTRY_CODE = '33'
+
+
+def normalize_number(number, country_code=DEFAULT_COUNTRY_CODE):
+    """
+    Canonical form of a phone number: '+' and the digits with the
+    country code ('01 23-45.67 89', '0033123456789' and '+33123456789'
+    give '+33123456789'). Short numbers keep their digits only, None if
+    there is no digit.
+    """
+    if number is None:
+        return None
+    number = str(number).strip()
+    international = number.startswith('+')
+    digits = ''.join(c for c in number if c.isdigit())
+    if not digits:
+        return None
+    if international:
+        return '+' + digits
+    if digits.startswith('00'):
+        return '+' + digits[2:]
+    if country_code and len(digits) == 10 and digits.startswith('0'):
+        return '+' + country_code + digits[1:]
+    return digits
+
+
+class NumberIndex(object):
+    """
+    Contact numbers by canonical form, for caller identification
+    without get_contact round trips: exact match in one dict access,
+    longest prefix match (switchboard numbers covering extensions) in
+    at most one access per digit.
+
+        index = app.number_index()
+        contact = index.resolve(call)
+    """
+
+    def __init__(self, contacts=(), country_code=DEFAULT_COUNTRY_CODE,
+                 min_prefix=4):
+        self.country_code = country_code
+        self.min_prefix = min_prefix
+        self._numbers = {}
+        for contact in contacts:
+            self.add(contact)
+
+    @classmethod
+    def from_fbx(cls, fbx, **options):
+        """
+        Index of the cached contacts of fbx.
+        """
+        return cls(fbx.contacts or [], **options)
+
+    def normalize(self, number):
+        return normalize_number(number, self.country_code)
+
+    def add(self, contact):
+        """
+        Index the numbers of a contact, a number already known keeps its
+        first contact.
+        """
+        for number in getattr(contact, 'numbers', None) or []:
+            key = self.normalize(getattr(number, 'number', None))
+            if key is not None:
+                self._numbers.setdefault(key, (contact, number))
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def __contains__(self, number):
+        return self.normalize(number) in self._numbers
+
+    def exact(self, number):
+        """
+        (Contact, Number) with exactly this number, None if unknown.
+        """
+        return self._numbers.get(self.normalize(number))
+
+    def longest_prefix(self, number):
+        """
+        (Contact, Number) whose number is the longest prefix of number
+        (itself included), at least min_prefix characters long.
+        """
+        key = self.normalize(number)
+        if key is None:
+            return None
+        numbers = self._numbers
+        for size in range(len(key), self.min_prefix - 1, -1):
+            match = numbers.get(key[:size])
+            if match is not None:
+                return match
+        return None
+
+    def lookup(self, number):
+        """
+        Contact of a number, exact match first, None if unknown.
+        """
+        # longest_prefix skips the numbers shorter than min_prefix
+        match = self.exact(number) or self.longest_prefix(number)
+        return match[0] if match is not None else None
+
+    def resolve(self, call):
+        """
+        Contact of the number of a Call, None for unknown or hidden
+        numbers.
+        """
+        return self.lookup(getattr(call, 'number', None))
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from __future__ import absolute_import
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from fbxtools.exceptions import FbxRequestError
+from fbxtools.fbx import Fbx
+
+_clock = getattr(time, 'monotonic', time.time)
+
+# longest wait between two per box timeout checks
+_POLL_INTERVAL = 0.5
+
+
+class PoolResult(object):
+    """
+    Outcome of a query run across a pool: results and errors (exception)
+    by box name, and the seconds each box took.
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.errors = {}
+        self.durations = {}
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def __len__(self):
+        return len(self.results)
+
+    def items(self):
+        return sorted(self.results.items())
+
+    def flatten(self):
+        """
+        (box name, item) for each item of list results, in box order.
+        """
+        return [(name, item) for name, result in self.items()
+                for item in (result or [])]
+
+    def __repr__(self):
+        return '<PoolResult ok=%d errors=%s>' % (
+            len(self.results), sorted(self.errors))
+
+
+class FbxPool(object):
+    """
+    Many boxes, one Fbx (and session) each, queried concurrently: at most
+    max_workers boxes at a time, a box taking more than timeout seconds
+    is reported in the errors instead of delaying the others.
+
+        pool = FbxPool.from_file('boxes.json', mute=True)
+        result = pool.run('boxinfos')
+        result.results['home'].uptime, result.errors
+    """
+
+    def __init__(self, boxes=None, max_workers=8, timeout=30, **options):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.options = options
+        self.boxes = {}
+        self._login_locks = {}
+        for name, box in sorted((boxes or {}).items()):
+            if isinstance(box, Fbx):
+                self.add(name, fbx=box)
+            else:
+                self.add(name, **box)
+
+    @classmethod
+    def from_file(cls, path, **options):
+        """
+        Pool of the boxes of a JSON file: {name: Fbx arguments}, e.g.
+        {"home": {"url": "...", "app_auth": "home/app_auth.json"}}.
+        options are given to FbxPool and to every Fbx.
+        """
+        with open(path, 'r') as f:
+            boxes = json.load(f)
+        return cls(boxes, **options)
+
+    def add(self, name, fbx=None, **kwargs):
+        """
+        Add a box: an Fbx, or the arguments of a new one, completed by
+        the pool options.
+        """
+        if name in self.boxes:
+            raise ValueError('box %r already in the pool' % (name,))
+        if fbx is None:
+            fbx_kwargs = dict(self.options)
+            fbx_kwargs.update(kwargs)
+            fbx = Fbx(**fbx_kwargs)
+        self.boxes[name] = fbx
+        self._login_locks[name] = threading.Lock()
+        return fbx
+
+    def remove(self, name):
+        fbx = self.boxes.pop(name)
+        self._login_locks.pop(name, None)
+        fbx.close()
+        return fbx
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __contains__(self, name):
+        return name in self.boxes
+
+    def __getitem__(self, name):
+        return self.boxes[name]
+
+    def close(self):
+        for fbx in self.boxes.values():
+            fbx.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _login(self, name):
+        fbx = self.boxes[name]
+        # one login per box, even when queries run concurrently
+        with self._login_locks[name]:
+            if not fbx.transport.headers.get('X-Fbx-App-Auth'):
+                fbx.get_session_token()
+        return fbx
+
+    def _query(self, name, query, kwargs, started):
+        started[name] = _clock()
+        fbx = self._login(name)
+        if callable(query):
+            return query(fbx, **kwargs)
+        value = getattr(fbx, query)
+        if callable(value):
+            return value(**kwargs)
+        return value
+
+    @staticmethod
+    def _next_check(pending, started, timeout):
+        if timeout is None:
+            return _POLL_INTERVAL
+        now = _clock()
+        deadlines = [started[name] + timeout - now
+                     for name in pending.values() if name in started]
+        return max(0.01, min(deadlines + [_POLL_INTERVAL]))
+
+    def login(self, names=None, timeout=None):
+        """
+        Open (or reuse the cached) session of every box concurrently.
+        """
+        return self.run(lambda fbx: fbx.transport.headers['X-Fbx-App-Auth'],
+                        names=names, timeout=timeout)
+
+    def run(self, query, names=None, timeout=None, **kwargs):
+        """
+        Run query on the boxes names (all of them by default), logged in
+        first if needed. query is a property ('calls', 'boxinfos'), a
+        method name called with kwargs ('get_lanhosts') or a callable
+        query(fbx, **kwargs). Return a PoolResult.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if names is None:
+            names = sorted(self.boxes)
+        result = PoolResult()
+        if not names:
+            return result
+
+        started = {}
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers,
+                                                      len(names)))
+        try:
+            pending = dict((executor.submit(self._query, name, query, kwargs,
+                                            started), name)
+                           for name in names)
+            while pending:
+                done, _ = wait(list(pending),
+                               timeout=self._next_check(pending, started,
+                                                        timeout),
+                               return_when=FIRST_COMPLETED)
+                now = _clock()
+                for future in done:
+                    name = pending.pop(future)
+                    result.durations[name] = now - started.get(name, now)
+                    try:
+                        result.results[name] = future.result()
+                    # query may be any callable, report whatever it raised
+                    except Exception as e:
+                        result.errors[name] = e
+                if timeout is None:
+                    continue
+                # the request still runs in its worker but is not waited for
+                for future, name in list(pending.items()):
+                    start = started.get(name)
+                    if start is not None and now - start > timeout:
+                        del pending[future]
+                        result.durations[name] = now - start
+                        result.errors[name] = FbxRequestError(
+                            'timeout', '%s did not answer in %ss' % (name, timeout))
+        finally:
+            executor.shutdown(wait=False)
+        return result
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from __future__ import absolute_import
+
+import random
+import threading
+import time
+
+_clock = getattr(time, 'monotonic', time.time)
+
+# error_code values worth another try: the box was busy or throttling
+RETRYABLE_ERRORS = frozenset([
+    'timeout',
+    'ratelimited',
+    'busy',
+    'internal_error',
+    'connection_error',
+])
+
+# HTTP statuses worth another try when the body has no error_code
+RETRYABLE_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# errors proving the request was not processed, so that POST can be
+# replayed without creating twice
+REJECTED_ERRORS = frozenset(['ratelimited', 'busy'])
+REJECTED_STATUSES = frozenset([429, 503])
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'])
+
+
+class TokenBucket(object):
+    """
+    Allow rate requests per second on average, burst at once.
+    acquire() sleeps until a token is free; callers are served in turn.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.burst
+        self._stamp = _clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        Take tokens, return the seconds waited for them.
+        """
+        with self._lock:
+            now = _clock()
+            self._tokens = min(self.burst,
+                               self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            # going below zero books the next tokens for this caller
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RetryPolicy(object):
+    """
+    Which failed requests are replayed and after how long: up to retries
+    more attempts, sleeping a random delay up to
+    min(max_backoff, backoff * 2 ** attempt) (full jitter).
+    Non idempotent methods (POST) are only replayed when the box
+    rejected the request (REJECTED_ERRORS/STATUSES).
+    """
+
+    def __init__(self, retries=2, backoff=0.25, max_backoff=8.0,
+                 retry_errors=RETRYABLE_ERRORS,
+                 retry_statuses=RETRYABLE_STATUSES):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_errors = frozenset(retry_errors)
+        self.retry_statuses = frozenset(retry_statuses)
+
+    @staticmethod
+    def error_code(response):
+        """
+        error_code of a transport response, None if it succeeded.
+        """
+        if response['timeout']:
+            return 'timeout'
+        data = response['data']
+        if isinstance(data, dict):
+            if data.get('success', True):
+                return None
+            return data.get('error_code', 'unknown')
+        if response['status'] >= 400:
+            return response['status']
+        return None
+
+    def retryable(self, method, error_code, status=None):
+        if error_code is None:
+            return False
+        if error_code not in self.retry_errors \
+        and status not in self.retry_statuses:
+            return False
+        if method.upper() in IDEMPOTENT_METHODS:
+            return True
+        return error_code in REJECTED_ERRORS or status in REJECTED_STATUSES
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_backoff,
+                                     self.backoff * (2 ** attempt)))
+
+
+NO_RETRY = RetryPolicy(retries=0)
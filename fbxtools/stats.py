@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from __future__ import absolute_import
+
+import threading
+import time
+from collections import deque
+
+clock = getattr(time, 'perf_counter', time.time)
+
+# histogram bucket upper bounds
+TIME_BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+               1.0, 2.5, 5.0, 10.0)
+SIZE_BOUNDS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram(object):
+    """
+    Rolling histogram over the last 'window' values.
+    """
+
+    def __init__(self, bounds, window=1024):
+        self.bounds = bounds
+        self.count = 0
+        self.values = deque(maxlen=window)
+
+    def add(self, value):
+        self.count += 1
+        self.values.append(value)
+
+    def summary(self):
+        values = sorted(self.values)
+        if not values:
+            return {'count': self.count}
+        last = len(values) - 1
+        buckets = []
+        index = 0
+        for bound in self.bounds + (None,):
+            start = index
+            while index <= last and (bound is None or values[index] <= bound):
+                index += 1
+            buckets.append([bound, index - start])
+        return {
+            'count': self.count,
+            'window': len(values),
+            'mean': sum(values) / len(values),
+            'min': values[0],
+            'p50': values[last // 2],
+            'p90': values[int(last * 0.9)],
+            'p99': values[int(last * 0.99)],
+            'max': values[-1],
+            'buckets': buckets,
+        }
+
+
+class _EndpointStats(object):
+
+    def __init__(self, window):
+        self.errors = {}
+        self.latency = Histogram(TIME_BOUNDS, window)
+        self.size = Histogram(SIZE_BOUNDS, window)
+        self.decode = Histogram(TIME_BOUNDS, window)
+        self.build = Histogram(TIME_BOUNDS, window)
+
+    def summary(self):
+        return {
+            'requests': self.latency.count,
+            'errors': dict(self.errors),
+            'latency': self.latency.summary(),
+            'size': self.size.summary(),
+            'decode': self.decode.summary(),
+            'build': self.build.summary(),
+        }
+
+
+class RequestStats(object):
+    """
+    Per endpoint ('GET /contact/:id') request metrics: latency, response
+    size, JSON decode time, fbxo object building time and error codes.
+    Each request record is also given to callback, if set.
+    """
+
+    def __init__(self, window=1024, callback=None):
+        self.window = window
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def _endpoint(self, method, route):
+        key = '%s %s' % (method.upper(), route)
+        try:
+            return self._endpoints[key]
+        except KeyError:
+            return self._endpoints.setdefault(key, _EndpointStats(self.window))
+
+    def record(self, route, method, status, latency, size, decode,
+               error_code=None):
+        with self._lock:
+            endpoint = self._endpoint(method, route)
+            endpoint.latency.add(latency)
+            if size is not None:
+                endpoint.size.add(size)
+            if decode is not None:
+                endpoint.decode.add(decode)
+            if error_code is not None:
+                endpoint.errors[error_code] = endpoint.errors.get(error_code, 0) + 1
+        if self.callback is not None:
+            self.callback({
+                'route': route,
+                'method': method.upper(),
+                'status': status,
+                'latency': latency,
+                'size': size,
+                'decode': decode,
+                'error_code': error_code,
+            })
+
+    def record_build(self, route, method, seconds):
+        with self._lock:
+            self._endpoint(method, route).build.add(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return dict((key, endpoint.summary())
+                        for key, endpoint in self._endpoints.items())
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
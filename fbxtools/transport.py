@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from __future__ import absolute_import
+
+import json
+import re
+import threading
+import warnings
+
+from fbxtools.exceptions import FbxRequestError
+from fbxtools.stats import clock
+
+_ROUTE_ARG = re.compile(r':(\w+)')
+
+
+def _empty_cookies():
+    try:
+        from http.cookiejar import CookieJar
+    except ImportError:
+        from cookielib import CookieJar
+    return CookieJar()
+
+
+class Route(object):
+    """
+    Url template such as '/contact/:id', split once into its static
+    parts and argument names.
+    """
+
+    __slots__ = ('template', '_parts', '_names')
+
+    def __init__(self, template):
+        self.template = template
+        parts = _ROUTE_ARG.split(template)
+        self._parts = parts[0::2]
+        self._names = parts[1::2]
+
+    def format(self, args=None):
+        if not self._names:
+            return self.template
+        if args is None:
+            args = {}
+        result = [self._parts[0]]
+        for name, part in zip(self._names, self._parts[1:]):
+            if name in args:
+                result.append(u'%s' % (args[name],))
+            else:
+                result.append(u':' + name)
+            result.append(part)
+        return u''.join(result)
+
+    def __repr__(self):
+        return 'Route(%r)' % self.template
+
+
+class Transport(object):
+    """
+    Keep-alive HTTP transport shared by every request of a Fbx instance.
+
+    Responses use the same dict layout as apize.send_request, so code
+    written against app.api.call keeps working, plus the request
+    'elapsed' time, the response 'size' and its JSON 'decode_time'.
+    requests is imported, and the session opened, by the first request.
+    """
+
+    def __init__(self, url, headers=None, verify_cert=True, timeout=8,
+                 pool_connections=4, pool_maxsize=16):
+        self.url = url
+        self.headers = headers if headers is not None else {}
+        self.verify_cert = verify_cert
+        self.timeout = timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._routes = {}
+        self._session = None
+        self._timeout_error = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._new_session()
+        return self._session
+
+    def _new_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        if self.verify_cert is False:
+            # certificate checks were turned off on purpose, don't warn
+            # about it on every request. warnings filters are process
+            # wide: this silences InsecureRequestWarning for every
+            # urllib3 user, as documented for verify_cert
+            from urllib3.exceptions import InsecureRequestWarning
+            warnings.filterwarnings('ignore', category=InsecureRequestWarning)
+        self._timeout_error = requests.exceptions.Timeout
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def route(self, template):
+        try:
+            return self._routes[template]
+        except KeyError:
+            route = self._routes[template] = Route(template)
+            return route
+
+    def _prepare(self, path, method, args, data, headers, is_json):
+        url = self.url + self.route(path).format(args)
+        fin_headers = self.headers.copy()
+        if headers:
+            fin_headers.update(headers)
+        body = None
+        if data:
+            if is_json:
+                fin_headers['Content-Type'] = 'application/json'
+                body = json.dumps(data)
+            else:
+                body = data
+        return method.upper(), url, body, fin_headers
+
+    def request(self, path, method='GET', args=None, params=None, data=None,
+                headers=None, is_json=False, timeout=None):
+        method, url, body, fin_headers = self._prepare(
+            path, method, args, data, headers, is_json)
+        session = self.session
+        start = clock()
+        try:
+            r = session.request(method, url, data=body, params=params,
+                                headers=fin_headers, verify=self.verify_cert,
+                                timeout=timeout or self.timeout)
+        except self._timeout_error:
+            return {
+                'data': {},
+                'cookies': _empty_cookies(),
+                'content_type': '',
+                'status': 0,
+                'is_json': False,
+                'timeout': True,
+                'elapsed': clock() - start,
+                'size': None,
+                'decode_time': None
+            }
+        elapsed = clock() - start
+
+        start = clock()
+        try:
+            content_type = r.headers.get('Content-Type', 'application/json')
+            response = r.json()
+            isjson = True
+        except ValueError:
+            content_type = r.headers.get('Content-Type', 'text/html')
+            response = r.text
+            isjson = False
+
+        return {
+            'data': response,
+            'cookies': r.cookies,
+            'content_type': content_type,
+            'status': r.status_code,
+            'is_json': isjson,
+            'timeout': False,
+            'elapsed': elapsed,
+            'size': len(r.content),
+            'decode_time': clock() - start
+        }
+
+    def stream(self, path, method='GET', args=None, params=None, data=None,
+               headers=None, is_json=False, timeout=None):
+        """
+        Send a request and return the requests.Response with its body not
+        read yet, the caller iterates over it and closes it.
+        """
+        method, url, body, fin_headers = self._prepare(
+            path, method, args, data, headers, is_json)
+        session = self.session
+        try:
+            r = session.request(method, url, data=body, params=params,
+                                headers=fin_headers, verify=self.verify_cert,
+                                timeout=timeout or self.timeout, stream=True)
+        except self._timeout_error:
+            raise FbxRequestError('timeout', url)
+        if 'json' not in r.headers.get('Content-Type', 'application/json'):
+            r.close()
+            raise FbxRequestError(r.status_code, url)
+        return r
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 
 import json
+import os
+import time
 
 
 def parse_auth_file(app_auth):
@@ -17,32 +19,178 @@ def parse_infos_file(app_infos):
 	return infos
 
 
-def get_url_api():
-	import netifaces
-	from apize.decorators import apize_raw
+def session_file_path(app_auth):
+	# one session file per app_auth file: boxes sharing a directory must
+	# not share a session
+	(stem, ext) = os.path.splitext(app_auth)
+	return stem + '.session.json'
 
-	gateways = netifaces.gateways()
-	fbx_ip = gateways['default'][netifaces.AF_INET][0]
 
-	@apize_raw('http://' + fbx_ip + '/api_version')
-	def get_api_config():
+def parse_session_file(app_session):
+	try:
+		with open(app_session, 'r') as f:
+			session = json.load(f)
+	except (IOError, OSError, ValueError):
+		return None
+
+	return session
+
+
+def write_session_file(app_session, session):
+	# the session token grants API access, keep it private
+	fd = os.open(app_session, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+	with os.fdopen(fd, 'w') as f:
+		json.dump(session, f)
+
+
+# hosts answering /api_version on the local network, after the gateway
+DEFAULT_API_HOSTS = ('mafreebox.freebox.fr',)
+
+# fields of /api_version kept in the discovery cache
+API_CONFIG_FIELDS = ('api_domain', 'https_available', 'https_port',
+	'api_base_url', 'api_version')
+
+
+def api_cache_file_path():
+	cache_home = os.environ.get('XDG_CACHE_HOME') or \
+		os.path.join(os.path.expanduser('~'), '.cache')
+	return os.path.join(cache_home, 'fbxtools', 'api_config.json')
+
+
+def api_cache_key(hosts):
+	# '' for the default discovery, else the hosts probed
+	if hosts is None:
+		return ''
+	return ','.join(sorted(hosts))
+
+
+def parse_api_cache_file(cache_file):
+	"""
+	Cached discoveries by api_cache_key, {} if there is none.
+	"""
+	try:
+		with open(cache_file, 'r') as f:
+			cache = json.load(f)
+	except (IOError, OSError, ValueError):
 		return {}
 
-	config = get_api_config()
-	api_version = 'v' + config['data']['api_version'].split('.')[0]
+	if not isinstance(cache, dict) or not isinstance(cache.get('entries'), dict):
+		return {}
+	return dict((key, entry) for key, entry in cache['entries'].items()
+		if isinstance(entry, dict) and 'config' in entry)
+
+
+def write_api_cache_file(cache_file, cache):
+	directory = os.path.dirname(cache_file)
+	if directory and not os.path.isdir(directory):
+		os.makedirs(directory)
+	# write aside then rename, concurrent scripts never read half a file
+	tmp_file = '%s.%d.tmp' % (cache_file, os.getpid())
+	with open(tmp_file, 'w') as f:
+		json.dump(cache, f)
+	os.rename(tmp_file, cache_file)
+
+
+def api_url_from_config(config):
+	api_version = 'v' + str(config['api_version']).split('.')[0]
 	api_scheme = 'http://'
 	api_port = ''
 
-	if config['data']['https_available']:
-		api_port = ':' + str(config['data']['https_port'])
+	if config['https_available']:
+		api_port = ':' + str(config['https_port'])
 		api_scheme = 'https://'
 
 	api_url = '{}{}{}{}{}'.format(
 		api_scheme,
-		config['data']['api_domain'],
+		config['api_domain'],
 		api_port,
-		config['data']['api_base_url'],
+		config['api_base_url'],
 		api_version,
 	)
 
 	return api_url
+
+
+def _gateway_host():
+	try:
+		import netifaces
+	except ImportError:
+		return None
+
+	try:
+		gateways = netifaces.gateways()
+		return gateways['default'][netifaces.AF_INET][0]
+	except (KeyError, IndexError):
+		return None
+
+
+def _probe_api_host(session, host, timeout):
+	response = session.get('http://' + host + '/api_version', timeout=timeout)
+	response.raise_for_status()
+	config = response.json()
+	return dict((name, config[name]) for name in API_CONFIG_FIELDS)
+
+
+def probe_api_config(hosts, timeout=2):
+	"""
+	Query /api_version on all hosts at once, return (host, config) of the
+	first one answering, or raise the error of the last one.
+	"""
+	from concurrent.futures import ThreadPoolExecutor, as_completed
+	import requests
+
+	session = requests.Session()
+	executor = ThreadPoolExecutor(max_workers=len(hosts))
+	try:
+		futures = dict((executor.submit(_probe_api_host, session, host, timeout),
+			host) for host in hosts)
+		error = None
+		for future in as_completed(futures):
+			try:
+				return (futures[future], future.result())
+			except (requests.RequestException, ValueError, KeyError) as e:
+				error = e
+		raise error
+	finally:
+		# do not wait for the slower hosts
+		executor.shutdown(wait=False)
+
+
+def get_url_api(hosts=None, cache_file=None, ttl=86400, timeout=2,
+	use_cache=True):
+	"""
+	API url of the Freebox of the local network.
+	The /api_version answer is cached in cache_file (default:
+	~/.cache/fbxtools/api_config.json), per list of hosts, for ttl
+	seconds. Past that, the
+	default gateway and DEFAULT_API_HOSTS (or hosts) are probed in
+	parallel, and the stale cache is used if none answers within timeout.
+	"""
+	if cache_file is None:
+		cache_file = api_cache_file_path()
+	# each list of hosts has its own cache entry
+	key = api_cache_key(hosts)
+	cache = parse_api_cache_file(cache_file).get(key) if use_cache else None
+	if cache is not None and time.time() - cache.get('fetched_at', 0) < ttl:
+		return api_url_from_config(cache['config'])
+
+	if hosts is None:
+		hosts = [host for host in (_gateway_host(),) if host]
+		hosts.extend(host for host in DEFAULT_API_HOSTS if host not in hosts)
+
+	try:
+		(host, config) = probe_api_config(list(hosts), timeout=timeout)
+	except (IOError, ValueError, KeyError):
+		if cache is None:
+			raise
+		return api_url_from_config(cache['config'])
+
+	try:
+		entries = parse_api_cache_file(cache_file)
+		entries[key] = {'host': host, 'config': config,
+			'fetched_at': time.time()}
+		write_api_cache_file(cache_file, {'entries': entries})
+	except (IOError, OSError):
+		pass
+
+	return api_url_from_config(config)
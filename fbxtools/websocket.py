@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+"""
+Minimal RFC 6455 websocket client, enough for the Freebox OS event
+socket: text messages, ping/pong and close. The frame helpers are shared
+with the fakebox server side.
+"""
+
+from __future__ import absolute_import
+
+import base64
+import json
+import os
+import select
+import socket
+import ssl
+import struct
+import time
+from hashlib import sha1
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+from fbxtools.exceptions import FbxRequestError
+
+_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xa
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+def accept_key(key):
+    """
+    Sec-WebSocket-Accept value answering a Sec-WebSocket-Key.
+    """
+    if not isinstance(key, bytes):
+        key = key.encode('ascii')
+    return base64.b64encode(sha1(key + _GUID).digest()).decode('ascii')
+
+
+def encode_frame(opcode, payload=b'', mask=True):
+    """
+    One final frame, clients must mask what they send, servers must not.
+    """
+    if not isinstance(payload, bytes):
+        payload = payload.encode('utf-8')
+    length = len(payload)
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 0x10000:
+        header.append(mask_bit | 126)
+        header.extend(struct.pack('!H', length))
+    else:
+        header.append(mask_bit | 127)
+        header.extend(struct.pack('!Q', length))
+    if not mask:
+        return bytes(header) + payload
+    key = bytearray(os.urandom(4))
+    masked = bytearray(payload)
+    for i in range(length):
+        masked[i] ^= key[i % 4]
+    return bytes(header) + bytes(key) + bytes(masked)
+
+
+def _read_exactly(read, size):
+    data = read(size)
+    if data is None or len(data) < size:
+        raise EOFError('websocket closed')
+    return data
+
+
+def read_frame(read):
+    """
+    Read one frame with read(size) (e.g. a buffered file read), return
+    (fin, opcode, payload).
+    """
+    first, second = bytearray(_read_exactly(read, 2))
+    length = second & 0x7f
+    if length == 126:
+        length = struct.unpack('!H', _read_exactly(read, 2))[0]
+    elif length == 127:
+        length = struct.unpack('!Q', _read_exactly(read, 8))[0]
+    key = bytearray(_read_exactly(read, 4)) if second & 0x80 else None
+    payload = _read_exactly(read, length) if length else b''
+    if key is not None:
+        payload = bytearray(payload)
+        for i in range(length):
+            payload[i] ^= key[i % 4]
+        payload = bytes(payload)
+    return bool(first & 0x80), first & 0x0f, payload
+
+
+class WebSocket(object):
+    """
+    Blocking websocket client.
+
+        ws = WebSocket('http://mafreebox.freebox.fr/api/v8/ws/event',
+                       headers={'X-Fbx-App-Auth': session_token})
+        ws.send_json({'action': 'register', 'events': [...]})
+        message = ws.recv_json()
+    """
+
+    def __init__(self, url, headers=None, timeout=8, verify_cert=True):
+        parts = urlsplit(url)
+        secure = parts.scheme in ('https', 'wss')
+        host = parts.hostname
+        port = parts.port or (443 if secure else 80)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        sock = socket.create_connection((host, port), timeout)
+        if secure:
+            context = ssl.create_default_context()
+            if not verify_cert:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            sock = context.wrap_socket(sock, server_hostname=host)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = sock
+        self._buffer = b''
+        # frames of a message not complete when recv timed out
+        self._fragments = []
+        self.closed = False
+        try:
+            self._handshake(host, port, path, headers or {})
+        except Exception:
+            self._close_socket()
+            raise
+        # blocking reads once connected, recv(timeout=...) bounds them
+        self.sock.settimeout(None)
+
+    def _fill(self):
+        data = self.sock.recv(65536)
+        if not data:
+            raise EOFError('websocket closed')
+        self._buffer += data
+
+    def _readline(self):
+        while b'\r\n' not in self._buffer:
+            self._fill()
+        line, _, self._buffer = self._buffer.partition(b'\r\n')
+        return line.decode('latin-1')
+
+    def _read(self, size):
+        while len(self._buffer) < size:
+            self._fill()
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def _readable(self, timeout):
+        if self._buffer or timeout is None:
+            return True
+        if getattr(self.sock, 'pending', None) and self.sock.pending():
+            return True
+        return bool(select.select([self.sock], [], [], timeout)[0])
+
+    def _handshake(self, host, port, path, headers):
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        lines = [
+            'GET %s HTTP/1.1' % path,
+            'Host: %s:%d' % (host, port),
+            'Upgrade: websocket',
+            'Connection: Upgrade',
+            'Sec-WebSocket-Key: %s' % key,
+            'Sec-WebSocket-Version: 13',
+        ]
+        lines.extend('%s: %s' % item for item in headers.items())
+        self.sock.sendall(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+
+        status_line = self._readline()
+        response_headers = {}
+        while True:
+            line = self._readline().strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise FbxRequestError('websocket', 'invalid answer %r' % status_line)
+        if status != 101:
+            body = b''
+            length = int(response_headers.get('content-length') or 0)
+            if length:
+                body = self._read(length)
+            try:
+                error = json.loads(body.decode('utf-8'))
+                raise FbxRequestError(error.get('error_code', status),
+                                      error.get('msg', error))
+            except (ValueError, AttributeError):
+                raise FbxRequestError(status, status_line.strip())
+        if response_headers.get('sec-websocket-accept') != accept_key(key):
+            raise FbxRequestError('websocket', 'invalid Sec-WebSocket-Accept')
+
+    def send(self, text, opcode=OP_TEXT):
+        self.sock.sendall(encode_frame(opcode, text))
+
+    def send_json(self, obj):
+        self.send(json.dumps(obj))
+
+    def recv(self, timeout=None):
+        """
+        Next text message, None once the socket is closed.
+        socket.timeout is raised if nothing came within timeout seconds.
+        """
+        if self.closed:
+            return None
+        deadline = _clock() + timeout if timeout is not None else None
+        while True:
+            # checked before every frame: control frames do not end the wait
+            remaining = None
+            if deadline is not None:
+                remaining = max(0.0, deadline - _clock())
+            if not self._readable(remaining):
+                raise socket.timeout('no websocket message')
+            try:
+                fin, opcode, payload = read_frame(self._read)
+            except (EOFError, socket.error):
+                self._close_socket()
+                return None
+            if opcode == OP_PING:
+                self.send(payload, OP_PONG)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                self.close()
+                return None
+            self._fragments.append(payload)
+            if fin:
+                message = b''.join(self._fragments).decode('utf-8')
+                self._fragments = []
+                return message
+
+    def recv_json(self, timeout=None):
+        message = self.recv(timeout)
+        return json.loads(message) if message is not None else None
+
+    def close(self):
+        if not self.closed:
+            try:
+                self.send(b'', OP_CLOSE)
+            except socket.error:
+                pass
+        self._close_socket()
+
+    def _close_socket(self):
+        self.closed = True
+        try:
+            self.sock.close()
+        except socket.error:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
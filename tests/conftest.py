@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+import itertools
+import os
+import sys
+
+import pytest
+
+# test the working tree, not an installed fbxtools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fbxtools.fakebox import FakeFreebox, FakeDataset
+from fbxtools.fbx import Fbx
+from fbxtools.retry import RetryPolicy
+
+# retries without the production backoff delays
+FAST_RETRY = RetryPolicy(retries=2, backoff=0.001, max_backoff=0.01)
+
+_prefixes = itertools.count()
+
+
+def make_dataset():
+    return FakeDataset(calls=50, contacts=10, lanhosts=8, fwredirs=3)
+
+
+@pytest.fixture
+def box():
+    with FakeFreebox(make_dataset()) as box:
+        yield box
+
+
+@pytest.fixture
+def other_box():
+    with FakeFreebox(FakeDataset(calls=20, contacts=0, lanhosts=4, seed=1)) as box:
+        yield box
+
+
+@pytest.fixture
+def app_files(box, tmp_path):
+    """
+    (app_infos, app_auth) paths of an app granted on box.
+    """
+    return box.write_app_files(str(tmp_path))
+
+
+@pytest.fixture
+def make_app(box, tmp_path):
+    """
+    make_app(target=box, **options): a logged in Fbx on a fake box.
+    """
+    apps = []
+
+    def make(target=None, **options):
+        target = target if target is not None else box
+        app_infos, app_auth = target.write_app_files(
+            str(tmp_path), prefix='app%d' % next(_prefixes))
+        options.setdefault('mute', True)
+        options.setdefault('retry', FAST_RETRY)
+        app = Fbx(target.url, app_infos=app_infos, app_auth=app_auth, **options)
+        app.get_session_token()
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        app.close()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def requests_to():
+    """
+    requests_to(app, route): number of requests app sent to route
+    ('GET /contact/:id').
+    """
+    def count(app, route):
+        return app.stats().get(route, {}).get('requests', 0)
+    return count
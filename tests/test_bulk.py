@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+
+def test_bulk_import_dicts(app, box):
+    contacts = len(box.tables['contact'].rows)
+    results = app.bulk_new_contacts([
+        {'display_name': 'First', 'numbers': [{'number': '0123456789',
+                                               'type': 'fixed'}]},
+        {'display_name': 'Second'},
+    ])
+    assert [result.ok for result in results] == [True, True]
+    assert len(box.tables['contact'].rows) == contacts + 2
+    assert results[0].contact.numbers[0].number == '0123456789'
+
+
+def test_bulk_import_contact_objects(make_app, box, other_box):
+    source = make_app()
+    target = make_app(other_box)
+    contacts = source.get_contacts()
+    results = target.bulk_new_contacts(contacts)
+
+    assert [result.errors for result in results] == [[]] * len(contacts)
+    assert sorted(row['display_name'] for row in
+                  other_box.tables['contact'].rows.values()) \
+        == sorted(contact.display_name for contact in contacts)
+    for contact, result in zip(contacts, results):
+        assert sorted(number.number for number in result.contact.numbers) \
+            == sorted(number.number for number in contact.numbers)
+
+
+def test_bad_items_do_not_abort_the_batch(app):
+    results = app.bulk_new_contacts([
+        {'display_name': 'Good'},
+        {'display_name': 'Bad numbers', 'numbers': 5},
+        42,
+        {'display_name': 'Also good'},
+    ])
+    assert [result.ok for result in results] == [True, False, False, True]
+    assert [result.item for result in results][2] == 42
+    assert results[3].contact.display_name == 'Also good'
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+CALLS = 'GET /call/log/'
+CONTACTS = 'GET /contact/'
+CONTACT = 'GET /contact/:id'
+
+
+def test_property_served_from_cache(app, requests_to):
+    assert app.calls is app.calls
+    assert requests_to(app, CALLS) == 1
+
+
+def test_cache_disabled_by_zero_ttl(make_app, requests_to):
+    app = make_app(cache_ttls={'calls': 0})
+    app.calls
+    app.calls
+    assert requests_to(app, CALLS) == 2
+
+
+def test_invalidate_and_refresh(app, requests_to):
+    app.calls
+    app.invalidate('calls')
+    app.calls
+    assert requests_to(app, CALLS) == 2
+    app.refresh('calls')
+    app.calls
+    assert requests_to(app, CALLS) == 3
+
+
+def test_write_invalidates_its_collections(app, requests_to):
+    before = len(app.contacts)
+    app.new_contact({'display_name': 'New contact'})
+    assert len(app.contacts) == before + 1
+    assert requests_to(app, CONTACTS) == 2
+
+
+def test_set_contact_updates_cached_contacts(app):
+    contact = app.contacts[0]
+    app.set_contact(contact.id, {'display_name': 'Renamed'})
+    assert app.contacts[0].display_name == 'Renamed'
+
+
+def test_expanded_contacts_memoized(app, requests_to):
+    calls = app.get_calls(expand_contacts=True)
+    fetched = requests_to(app, CONTACT)
+    assert 0 < fetched <= 10
+    assert all(call.contact is None or call.contact.id == call.contact_id
+               for call in calls)
+    app.get_calls(expand_contacts=True)
+    assert requests_to(app, CONTACT) == fetched
+
+
+def test_expanded_contacts_invalidated_without_cache(make_app):
+    # no cached collection: a write must still drop the memoized contacts
+    app = make_app(cache_ttls=dict.fromkeys(
+        ('boxinfos', 'calls', 'contacts', 'groups', 'interfaces',
+         'fwredirs', 'staticleases', 'dynamicleases'), 0))
+    call = next(call for call in app.get_calls(expand_contacts=True)
+                if call.contact is not None)
+    app.set_contact(call.contact_id, {'display_name': 'Renamed'})
+    call = next(other for other in app.get_calls(expand_contacts=True)
+                if other.contact_id == call.contact_id)
+    assert call.contact.display_name == 'Renamed'
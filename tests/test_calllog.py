@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from datetime import datetime
+
+from fbxtools.fbxo import Call
+
+
+def test_first_run_reads_every_call(app):
+    log = app.iter_calls_since()
+    calls = list(log)
+    assert [call.id for call in calls] == list(range(50, 0, -1))
+    assert all(type(call) is Call for call in calls)
+    assert log.high_water == 50
+
+
+def test_next_run_reads_new_calls_only(app, box):
+    log = app.iter_calls_since(last_id=45)
+    assert [call.id for call in log] == [50, 49, 48, 47, 46]
+    assert log.high_water == 50
+
+    log = app.iter_calls_since(last_id=log.high_water)
+    assert list(log) == []
+    assert log.high_water == 50
+
+    newest = dict(box.tables['call'].get(50), id=None,
+                  datetime=box.tables['call'].get(50)['datetime'] + 60)
+    box.tables['call'].insert(newest)
+    log = app.iter_calls_since(last_id=50)
+    assert [call.id for call in log] == [51]
+    assert log.high_water == 51
+
+
+def test_since(app, box):
+    since = box.tables['call'].get(41)['datetime']
+    for value in (since, datetime.fromtimestamp(since)):
+        assert [call.id for call in app.iter_calls_since(since=value)] \
+            == list(range(50, 40, -1))
+
+
+def test_calls_match_get_calls(app):
+    full = dict((call.id, call.fbobj2dict()) for call in app.get_calls())
+    for call in app.iter_calls_since(last_id=40):
+        assert call.fbobj2dict() == full[call.id]
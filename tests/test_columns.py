@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+import pytest
+
+from fbxtools.columns import CALL_COLUMNS, call_columns
+from fbxtools.fbxo import Calls
+
+
+def rows(box):
+    return sorted(box.tables['call'].rows.values(), key=lambda row: -row['id'])
+
+
+def test_array_columns_match_the_call_log(app, box):
+    columns = app.calls_frame(backend='array')
+    assert sorted(columns) == sorted(column for column, typecode in CALL_COLUMNS)
+    for column, typecode in CALL_COLUMNS:
+        assert list(columns[column]) == [row[column] for row in rows(box)]
+
+
+def test_loaded_calls_give_the_same_columns(app):
+    calls = Calls(fbx=app)
+    calls.get_by_id()
+    assert calls.to_columns(backend='array') == app.calls_frame(backend='array')
+
+
+def test_call_objects_and_dicts_give_the_same_columns(app, box):
+    assert call_columns(app.get_calls(), backend='array') \
+        == call_columns(rows(box), backend='array')
+
+
+def test_missing_values_and_empty_log():
+    columns = call_columns([{'id': 1}], backend='array')
+    assert (columns['number'], list(columns['duration'])) == ([''], [0])
+    assert list(call_columns([], backend='array')['id']) == []
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        call_columns([], backend='pandas')
+
+
+@pytest.mark.parametrize('backend, module', [('numpy', 'numpy'),
+                                             ('arrow', 'pyarrow')])
+def test_optional_backends(app, backend, module):
+    pytest.importorskip(module)
+    frame = app.calls_frame(backend=backend)
+    assert len(frame) == 50
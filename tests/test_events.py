@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+import socket
+import threading
+import time
+
+import pytest
+
+HOST_ID = 'ether-00:24:d4:00:00:01'
+TIMEOUT = 10
+
+
+@pytest.fixture
+def events(app):
+    events = app.lanhost_events(reconnect_delay=0.05)
+    yield events
+    events.stop(TIMEOUT)
+
+
+def follow(events, box):
+    """
+    Start events, return a function waiting for the next notification
+    of HOST_ID reachability.
+    """
+    received = []
+    notified = threading.Event()
+
+    @events.on('*')
+    def handler(event, host, previous):
+        received.append((event, host, previous))
+        notified.set()
+
+    events.start()
+    assert events.connected.wait(TIMEOUT)
+
+    def change(reachable):
+        notified.clear()
+        assert box.set_host_reachable(HOST_ID, reachable) == 1
+        assert notified.wait(TIMEOUT)
+        return received[-1]
+    return change
+
+
+def reconnected(events, box):
+    # wait for the old connection to drop, then for the new one
+    for _ in range(int(TIMEOUT / 0.01)):
+        if not events.connected.is_set():
+            break
+        threading.Event().wait(0.01)
+    return events.connected.wait(TIMEOUT) and box.ws_client_count() == 1
+
+
+def test_events_update_the_host_table(events, box):
+    change = follow(events, box)
+    assert HOST_ID in events.hosts
+    event, host, previous = change(False)
+    assert event == 'lan_host_l3addr_unreachable'
+    assert host.id == HOST_ID and not host.reachable
+    event, host, previous = change(True)
+    assert event == 'lan_host_l3addr_reachable'
+    assert host.reachable and not previous.reachable
+    assert events.hosts[HOST_ID] is host
+
+
+def test_reconnect_after_connection_lost(events, box):
+    change = follow(events, box)
+    box.drop_websockets(2)
+    box.close_websockets()
+    assert reconnected(events, box)
+    assert change(False)[1].id == HOST_ID
+
+
+def test_reconnect_with_expired_session(events, box):
+    change = follow(events, box)
+    box.expire_sessions()
+    box.close_websockets()
+    assert reconnected(events, box)
+    assert change(False)[1].id == HOST_ID
+
+
+def test_stop(events, box):
+    follow(events, box)
+    events.stop(TIMEOUT)
+    assert not events.connected.is_set()
+    assert events._thread is None
+
+
+def test_ping_does_not_block_poll(events, box):
+    follow(events, box)
+    assert box.ping_websockets() == 1
+    threading.Event().wait(0.1)
+    start = time.time()
+    events.stop(TIMEOUT)
+    # poll(timeout=1) keeps its timeout once the ping is answered
+    assert time.time() - start < 2
+    assert events._thread is None
+
+
+def test_recv_times_out_after_control_frames(app, box):
+    from fbxtools.websocket import WebSocket
+    ws = WebSocket(app.url + '/ws/event', headers=dict(app.transport.headers))
+    try:
+        ws.send_json({'action': 'register', 'events': ['lan_host_l3addr_unreachable']})
+        assert ws.recv_json(timeout=TIMEOUT)['action'] == 'register'
+        assert box.ping_websockets() == 1
+        start = time.time()
+        with pytest.raises(socket.timeout):
+            ws.recv(timeout=0.3)
+        assert time.time() - start < 1
+        box.set_host_reachable(HOST_ID, False)
+        assert ws.recv_json(timeout=TIMEOUT)['event'] == 'l3addr_unreachable'
+    finally:
+        ws.close()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from datetime import datetime
+
+import pytest
+
+from fbxtools.fbxo import (fbxobj_classes, has_field, Call, Calls, Contact,
+                           Dynamic_Lease, Dynamic_Leases, FwRedir, FwRedirs,
+                           L3connectivities, LanHost, LanHostL3Connectivity,
+                           Number, Static_Lease, Static_Leases)
+
+LEASE = {'id': '00:24:d4:00:00:01', 'mac': '00:24:d4:00:00:01',
+         'comment': 'nas', 'hostname': 'nas', 'ip': '192.168.1.2'}
+
+
+def load(fbxobj_class, data):
+    fbxobj = fbxobj_class()
+    fbxobj.load_data(data)
+    return fbxobj
+
+
+def test_fields_live_in_slots():
+    lease = load(Static_Lease, LEASE)
+    assert 'mac' in Static_Lease.__slots__
+    assert lease.__dict__ == {}
+    assert lease.fbobj2dict() == LEASE
+
+
+def test_extra_attributes_go_to_dict():
+    number = load(Number, {'id': 1, 'number': '0123456789'})
+    number.label = 'home'
+    assert number.label == 'home'
+    assert vars(number) == {'label': 'home'}
+    assert 'label' not in number.fbobj2dict()
+
+
+def test_missing_field_raises_attribute_error():
+    with pytest.raises(AttributeError):
+        Call().number
+    assert getattr(Call(), 'number', None) is None
+
+
+def test_attribs_argument_gives_an_object_its_own_schema():
+    attribs = dict(Number._attribs, label={'list': False, 'type_info': str})
+    number = Number(attribs=attribs)
+    number.load_data({'id': 1, 'number': '0123456789', 'label': 'home',
+                      'unknown': 1})
+    assert (number.label, number.number) == ('home', '0123456789')
+    assert number.fbobj2dict()['label'] == 'home'
+    assert not hasattr(number, 'unknown')
+    # the class schema is left alone
+    assert not hasattr(load(Number, {'label': 'home'}), 'label')
+
+
+def test_lanhost_keeps_its_positional_arguments():
+    host = LanHost(None, {'id': 'ether-1', 'primary_name': 'nas'}, None,
+                   None, {'interface': 'pub'})
+    assert host.primary_name == 'nas'
+
+
+@pytest.mark.parametrize('list_class, element_class, key', [
+    (Calls, Call, 'id'),
+    (Static_Leases, Static_Lease, 'id'),
+    (Dynamic_Leases, Dynamic_Lease, 'mac'),
+    (FwRedirs, FwRedir, 'id'),
+    (L3connectivities, LanHostL3Connectivity, 'addr'),
+])
+def test_bare_list_decoded_to_its_element_class(list_class, element_class,
+                                                key):
+    fbxobj = load(list_class, [{key: 1}, {key: 2}])
+    field_name = list(list_class._attribs)[0]
+    elements = getattr(fbxobj, field_name)
+    assert [type(element) for element in elements] == [element_class] * 2
+    assert [getattr(element, key) for element in elements] == [1, 2]
+
+
+def test_registry_holds_the_public_classes():
+    assert fbxobj_classes['Call'] is Call
+    assert fbxobj_classes['Dynamic_Lease'] is Dynamic_Lease
+    assert not [name for name in fbxobj_classes if name.startswith('_')]
+
+
+def test_fields_decoded_by_type():
+    call = load(Call, {'id': 3, 'datetime': 1500000000, 'duration': 61,
+                       'new': True})
+    assert call.datetime == datetime.fromtimestamp(1500000000)
+    assert (call.duration, call.new) == (61, True)
+    contact = load(Contact, {'id': 1, 'numbers': [{'id': 5, 'number': '01'}]})
+    assert type(contact.numbers[0]) is Number
+
+
+def test_fbx_lists_use_the_right_classes(app):
+    assert {type(call) for call in app.get_calls()} == {Call}
+    assert {type(lease) for lease in app.get_stleases()} == {Static_Lease}
+    assert {type(lease) for lease in app.get_dyleases()} == {Dynamic_Lease}
+    assert {type(rule) for rule in app.get_fwredirs()} == {FwRedir}
+    assert {type(host.host) for host in app.get_dyleases()} == {LanHost}
+
+
+def test_nested_fields_decoded_on_first_read():
+    contact = load(Contact, {'id': 1, 'last_update': 1500000000,
+                             'numbers': [{'id': 5, 'number': '01'}]})
+    raw = Contact.__dict__['_lazy_numbers'].__get__(contact, Contact)
+    assert raw == [{'id': 5, 'number': '01'}]
+    assert has_field(contact, 'numbers') and not has_field(contact, 'urls')
+    numbers = contact.numbers
+    assert numbers[0].number == '01'
+    # decoded once, in place
+    assert contact.numbers is numbers
+    assert contact.last_update is contact.last_update
+    assert contact.fbobj2dict()['numbers'] is numbers
+
+
+def test_lazy_fields_can_be_set_and_deleted():
+    call = load(Call, {'id': 1, 'datetime': 1500000000})
+    moment = datetime(2020, 1, 2)
+    call.datetime = moment
+    assert call.datetime is moment
+    del call.datetime
+    assert not has_field(call, 'datetime')
+    with pytest.raises(AttributeError):
+        call.datetime
+
+
+def test_lease_host_decoded_from_its_dict():
+    lease = load(Dynamic_Lease, {'mac': 'aa', 'host': {
+        'id': 'ether-aa', 'primary_name': 'nas',
+        'l3connectivities': [{'addr': '192.168.1.2', 'last_activity': 10}]}})
+    assert type(lease.host) is LanHost
+    l3 = lease.host.l3connectivities[0]
+    assert type(l3) is LanHostL3Connectivity
+    assert l3.last_activity == datetime.fromtimestamp(10)
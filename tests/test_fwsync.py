@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+import pytest
+
+from fbxtools.fbxo import FwRedir
+from fbxtools.fwsync import plan_fwredirs
+
+FIELDS = ('ip_proto', 'wan_port_start', 'lan_ip', 'lan_port')
+
+
+def live_rows(box):
+    return sorted(box.tables['fwredir'].rows.values(), key=lambda row: row['id'])
+
+
+def desired_of(box):
+    # the live rules as a caller writes them: no comment, no enabled
+    return [dict((field_name, row[field_name]) for field_name in FIELDS)
+            for row in live_rows(box)]
+
+
+def test_left_out_fields_keep_their_live_value(app, box):
+    box.tables['fwredir'].get(2)['enabled'] = False
+    plan = app.apply_fwredirs(desired_of(box))
+    assert (len(plan), plan.unchanged, plan.applied) == (0, 3, False)
+    assert box.tables['fwredir'].get(1)['comment'] == 'redir 0'
+    assert box.tables['fwredir'].get(2)['enabled'] is False
+
+
+def test_update_only_changed_fields(app, box):
+    desired = desired_of(box)
+    desired[0]['lan_port'] = 2222
+    desired[1]['enabled'] = False
+    plan = app.apply_fwredirs(desired)
+    assert [(id, changes) for id, changes, live in plan.updates] \
+        == [(1, {'lan_port': 2222}), (2, {'enabled': False})]
+    assert plan.applied and plan.ok and plan.unchanged == 1
+    row = box.tables['fwredir'].get(1)
+    assert (row['lan_port'], row['comment']) == (2222, 'redir 0')
+    assert box.tables['fwredir'].get(2)['enabled'] is False
+
+
+def test_create_fills_in_box_defaults(app, box):
+    desired = desired_of(box) + [{'wan_port_start': 2222,
+                                  'lan_ip': '192.168.1.10'}]
+    plan = app.apply_fwredirs(desired)
+    assert plan.creates == [{'ip_proto': 'tcp', 'wan_port_start': 2222,
+                             'wan_port_end': 2222, 'lan_ip': '192.168.1.10',
+                             'lan_port': 2222, 'src_ip': '0.0.0.0',
+                             'enabled': True, 'comment': ''}]
+    created = [row for row in live_rows(box) if row['wan_port_start'] == 2222]
+    assert len(created) == 1 and created[0]['enabled'] is True
+
+
+def test_prune(app, box):
+    desired = desired_of(box)[:1]
+    plan = app.apply_fwredirs(desired, prune=False, dry_run=True)
+    assert plan.deletes == []
+    plan = app.apply_fwredirs(desired)
+    assert sorted(id for id, live in plan.deletes) == [2, 3]
+    assert [row['id'] for row in live_rows(box)] == [1]
+
+
+def test_live_duplicates_deleted(app, box):
+    duplicate = dict(box.tables['fwredir'].get(1), id=None, comment='copy')
+    duplicate_id = box.tables['fwredir'].insert(duplicate)['id']
+    plan = app.apply_fwredirs(desired_of(box)[:3])
+    assert [id for id, live in plan.deletes] == [duplicate_id]
+    assert len(live_rows(box)) == 3
+
+
+def test_desired_twice_rejected():
+    rule = {'ip_proto': 'udp', 'wan_port_start': 53, 'lan_ip': '192.168.1.2'}
+    with pytest.raises(ValueError):
+        plan_fwredirs([], [rule, dict(rule, lan_port=5353)])
+
+
+def test_dry_run_writes_nothing(app, box):
+    app.reset_stats()
+    plan = app.apply_fwredirs([{'wan_port_start': 2222,
+                                'lan_ip': '192.168.1.10'}], dry_run=True)
+    assert (len(plan.creates), len(plan.deletes), plan.applied) == (1, 3, False)
+    assert len(live_rows(box)) == 3
+    assert list(app.stats()) == ['GET /fw/redir/']
+
+
+def test_plan_with_fwredir_objects(app, box):
+    live = app.get_fwredirs()
+    desired = [FwRedir(data=dict(row, lan_port=row['lan_port'] + 1))
+               for row in live_rows(box)]
+    plan = plan_fwredirs(live, desired)
+    assert sorted((id, changes) for id, changes, rule in plan.updates) \
+        == [(row['id'], {'lan_port': row['lan_port'] + 1})
+            for row in live_rows(box)]
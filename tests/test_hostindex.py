@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+from fbxtools.fbxo import FwRedir, LanHost, Static_Lease
+from fbxtools.hostindex import HostIndex
+
+
+def row(box, table, id):
+    return box.tables[table].get(id)
+
+
+def test_index_joins_hosts_leases_and_port_forwards(app, box):
+    index = app.host_index()
+    lanhost = row(box, 'lanhost', 'ether-00:24:d4:00:00:01')
+    mac = lanhost['l2ident']['id']
+    ipv4 = lanhost['l3connectivities'][0]['addr']
+
+    host = index.by_mac(mac.upper())
+    assert type(host.lanhost) is LanHost
+    assert type(host.static_lease) is Static_Lease
+    assert host.has_static_lease and host.dynamic_lease is None
+    assert [rule.id for rule in host.fwredirs] == [2]
+    assert host.name == lanhost['primary_name']
+    assert index.lookup(ipv4) is host
+    assert index.lookup(lanhost['l3connectivities'][1]['addr'].upper()) is host
+    assert index.lookup(lanhost['primary_name'].upper()) is host
+    assert index.has_static_lease(ipv4)
+
+
+def test_dynamic_lease_without_lan_host(app, box):
+    index = app.host_index()
+    lease = box.tables['dynamic_lease'].rows[sorted(
+        box.tables['dynamic_lease'].rows)[-1]]
+    host = index.lookup(lease['ip'])
+    assert host.lanhost is None and host.dynamic_lease.mac == lease['mac']
+    assert host.name == lease['hostname']
+    assert not index.has_static_lease(lease['mac'])
+    # every MAC of the box is indexed once
+    macs = set(mac.lower() for mac in box.tables['dynamic_lease'].rows)
+    macs.update(lease['mac'] for lease in box.tables['static_lease'].rows.values())
+    macs.update(host['l2ident']['id'] for host in box.tables['lanhost'].rows.values())
+    assert len(index) == len(macs)
+
+
+def test_port_forward_to_an_unknown_address():
+    rule = FwRedir()
+    rule.load_data({'id': 7, 'lan_ip': '192.168.1.250', 'wan_port_start': 80})
+    index = HostIndex(fwredirs=[rule])
+    assert index.lookup('192.168.1.250') is None
+    assert index.fwredirs_for('192.168.1.250') == [rule]
+    assert index.fwredirs_for('192.168.1.251') == []
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+import os
+import subprocess
+import sys
+
+import fbxtools.fbx
+import fbxtools.fbxo
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_fbx_exports_the_model_classes():
+    assert set(fbxtools.fbxo.__all__) <= set(fbxtools.fbx.__all__)
+    namespace = {}
+    exec('from fbxtools.fbx import *', namespace)
+    for name in fbxtools.fbx.__all__:
+        assert namespace[name] is getattr(fbxtools.fbx, name)
+
+
+def test_import_is_side_effect_free():
+    script = (
+        'import sys, warnings\n'
+        'filters = list(warnings.filters)\n'
+        'import fbxtools.fbx\n'
+        'assert warnings.filters == filters\n'
+        'print(sorted(name for name in ("requests", "urllib3", "apize")\n'
+        '             if name in sys.modules))\n')
+    output = subprocess.check_output([sys.executable, '-c', script], cwd=ROOT)
+    assert output.decode().strip() == '[]'
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+import json
+import random
+
+import pytest
+
+from fbxtools.jsonstream import iter_array
+
+
+def split(data, rand, max_size=7):
+    """
+    data cut at random boundaries.
+    """
+    chunks = []
+    pos = 0
+    while pos < len(data):
+        size = rand.randint(1, max_size)
+        chunks.append(data[pos:pos + size])
+        pos += size
+    return chunks
+
+
+def random_value(rand, depth=0):
+    kind = rand.choice(('int', 'float', 'exp', 'str', 'bool', 'null',
+                        'list', 'dict') if depth < 2 else
+                       ('int', 'float', 'exp', 'str', 'bool', 'null'))
+    if kind == 'int':
+        return rand.randint(-10 ** 6, 10 ** 6)
+    if kind == 'float':
+        return round(rand.uniform(-1000, 1000), rand.randint(1, 6))
+    if kind == 'exp':
+        return rand.uniform(1, 10) * 10 ** rand.randint(-30, 30)
+    if kind == 'str':
+        return u''.join(rand.choice(u'ab "\\é€\n') for _ in range(rand.randint(0, 8)))
+    if kind == 'bool':
+        return rand.random() < 0.5
+    if kind == 'null':
+        return None
+    if kind == 'list':
+        return [random_value(rand, depth + 1) for _ in range(rand.randint(0, 4))]
+    return dict(('k%d' % i, random_value(rand, depth + 1))
+                for i in range(rand.randint(0, 4)))
+
+
+def parse(chunks, key='result'):
+    meta = {}
+    items = list(iter_array(chunks, key, meta))
+    return items, meta
+
+
+def test_whole_document():
+    items, meta = parse([b'{"success": true, "result": [1, {"a": 2}, "x"]}'])
+    assert items == [1, {'a': 2}, 'x']
+    assert meta == {'success': True}
+
+
+def test_empty_and_missing_array():
+    assert parse([b'{"success": true, "result": []}']) == ([], {'success': True})
+    assert parse([b'{"success": false, "error_code": "noent"}']) \
+        == ([], {'success': False, 'error_code': 'noent'})
+    assert parse([b'{}']) == ([], {})
+
+
+@pytest.mark.parametrize('document', [
+    '{"result": [893.87, 1e5, -0.5E-3, 12, true, null], "success": true}',
+    '{"x": 893.87, "result": [{"duration": 1.25e+2}]}',
+])
+def test_numbers_cut_at_every_position(document):
+    expected = json.loads(document)
+    for cut in range(1, len(document)):
+        items, meta = parse([document[:cut].encode(), document[cut:].encode()])
+        assert items == expected['result']
+        assert dict(meta, result=items) == expected
+
+
+def test_utf8_cut_inside_a_char():
+    data = u'{"result": ["été €"]}'.encode('utf-8')
+    for cut in range(1, len(data)):
+        assert parse([data[:cut], data[cut:]])[0] == [u'été €']
+
+
+def test_random_documents_random_chunks():
+    rand = random.Random(7)
+    for _ in range(300):
+        document = {'success': True,
+                    'result': [random_value(rand) for _ in range(rand.randint(0, 6))],
+                    'x': random_value(rand)}
+        text = json.dumps(document, indent=rand.choice((None, 1)))
+        data = text.encode('utf-8') if rand.random() < 0.5 else text
+        items, meta = parse(split(data, rand))
+        assert dict(meta, result=items) == document
+
+
+def test_truncated_document_raises():
+    with pytest.raises(ValueError):
+        parse([b'{"result": [1, 2'])
+    with pytest.raises(ValueError):
+        parse([b'{"result": [1.'])
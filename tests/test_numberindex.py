@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+import pytest
+
+from fbxtools.fbxo import Call, Contact
+from fbxtools.numberindex import NumberIndex, normalize_number
+
+
+@pytest.mark.parametrize('number, expected', [
+    ('01 23-45.67 89', '+33123456789'),
+    ('0033123456789', '+33123456789'),
+    ('+33 1 23 45 67 89', '+33123456789'),
+    ('3615', '3615'),
+    ('', None),
+    (None, None),
+    ('anonymous', None),
+])
+def test_normalize_number(number, expected):
+    assert normalize_number(number) == expected
+
+
+def contact(id, *numbers):
+    return Contact(data={'id': id, 'display_name': 'contact %d' % id,
+                         'numbers': [{'number': number} for number in numbers]})
+
+
+def test_exact_and_prefix_lookup():
+    home, office = contact(1, '01 23 45 67 89'), contact(2, '+33 1 40 00 00')
+    index = NumberIndex([home, office])
+    assert len(index) == 2
+    assert index.lookup('+33123456789') is home
+    assert '0123456789' in index
+    assert index.exact('+33140000012') is None
+    # switchboard number covering its extensions
+    assert index.lookup('+33140000012') is office
+    assert index.lookup('0999999999') is None
+
+
+def test_first_contact_keeps_a_shared_number():
+    first, second = contact(1, '0123456789'), contact(2, '0123456789')
+    assert NumberIndex([first, second]).lookup('0123456789') is first
+
+
+def test_min_prefix():
+    index = NumberIndex([contact(1, '3615')], min_prefix=5)
+    assert index.lookup('36150') is None
+    assert index.lookup('3615') is not None
+
+
+def test_resolve_the_fake_box_calls(app, box):
+    index = app.number_index()
+    calls = app.get_calls()
+    for call in calls:
+        found = index.resolve(call)
+        if call.contact_id:
+            assert found.id == call.contact_id
+        else:
+            assert found is None
+    assert index.resolve(Call()) is None
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+import json
+import time
+
+import pytest
+
+from fbxtools.exceptions import FbxRequestError
+from fbxtools.fakebox import FakeFreebox, FakeDataset
+from fbxtools.fbx import Fbx
+from fbxtools.pool import FbxPool
+
+
+def box_options(target, directory, name):
+    app_infos, app_auth = target.write_app_files(directory, prefix=name)
+    return {'url': target.url, 'app_infos': app_infos, 'app_auth': app_auth}
+
+
+@pytest.fixture
+def pool(box, other_box, tmp_path):
+    directory = str(tmp_path)
+    boxes = {'home': box_options(box, directory, 'home'),
+             'office': box_options(other_box, directory, 'office')}
+    with FbxPool(boxes, mute=True, timeout=10) as pool:
+        yield pool
+
+
+def test_run_a_property_on_every_box(pool):
+    result = pool.run('calls')
+    assert result.ok and sorted(result.durations) == ['home', 'office']
+    assert [(name, len(calls)) for name, calls in result.items()] \
+        == [('home', 50), ('office', 20)]
+    assert len(result.flatten()) == 70
+
+
+def test_run_a_method_or_a_callable(pool):
+    result = pool.run('get_lanhosts', args={'interface': 'pub'})
+    assert sorted(result.results) == ['home', 'office']
+    result = pool.run(lambda fbx, prefix: prefix + fbx.url, prefix='>',
+                      names=['office'])
+    assert result.results == {'office': '>' + pool['office'].url}
+
+
+def test_one_login_per_box(pool, requests_to):
+    pool.login()
+    for _ in range(3):
+        assert pool.run('get_calls').ok
+    for name in pool.boxes:
+        assert requests_to(pool[name], 'POST /login/session/') == 1
+
+
+def test_failing_box_reported_in_errors(pool, box):
+    pool.login()
+    box.fail_next(10)
+    result = pool.run('get_calls')
+    assert sorted(result.results) == ['office']
+    assert isinstance(result.errors['home'], FbxRequestError)
+    assert not result.ok
+
+
+def test_slow_box_times_out(pool, tmp_path):
+    with FakeFreebox(FakeDataset(calls=5, contacts=0, lanhosts=0),
+                     latency=1.5) as slow:
+        pool.add('slow', **box_options(slow, str(tmp_path), 'slow'))
+        pool.login(names=['home', 'office'])
+        start = time.time()
+        result = pool.run('get_calls', timeout=0.5)
+        assert time.time() - start < 1.4
+        assert sorted(result.results) == ['home', 'office']
+        assert result.errors['slow'].err_code == 'timeout'
+
+
+def test_from_file_add_and_remove(box, tmp_path):
+    boxes_file = str(tmp_path / 'boxes.json')
+    with open(boxes_file, 'w') as f:
+        json.dump({'home': box_options(box, str(tmp_path), 'home')}, f)
+    with FbxPool.from_file(boxes_file, mute=True) as pool:
+        assert isinstance(pool['home'], Fbx) and pool['home'].mute
+        with pytest.raises(ValueError):
+            pool.add('home', url=box.url)
+        pool.add('again', fbx=pool['home'])
+        assert len(pool) == 2 and 'again' in pool
+        pool.remove('again')
+        assert 'again' not in pool
+        assert pool.run('calls', names=[]).results == {}
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+import time
+
+import pytest
+
+from fbxtools.exceptions import FbxRequestError
+from fbxtools.retry import RetryPolicy
+
+CALLS = 'GET /call/log/'
+NEW_CONTACT = 'POST /contact/'
+
+
+def test_request_retried_until_success(app, box, requests_to):
+    box.fail_next(2)
+    app.reset_stats()
+    assert len(app.get_calls()) == 50
+    assert requests_to(app, CALLS) == 3
+    assert app.stats()[CALLS]['errors'] == {'ratelimited': 2}
+
+
+def test_request_fails_once_retries_are_spent(app, box):
+    box.fail_next(3)
+    with pytest.raises(FbxRequestError) as e:
+        app.request_result('/call/log/')
+    assert e.value.err_code == 'ratelimited'
+
+
+def test_get_by_id_raises_the_request_error(app, box):
+    box.fail_next(3, error_code='busy', status=503)
+    with pytest.raises(FbxRequestError) as e:
+        app.get_contacts()
+    assert e.value.err_code == 'busy'
+
+
+def test_no_retry(make_app, box):
+    app = make_app(retry=0)
+    box.fail_next(1)
+    with pytest.raises(FbxRequestError):
+        app.get_calls()
+    assert len(app.get_calls()) == 50
+
+
+@pytest.mark.parametrize('iterate', [
+    lambda app: list(app.iter_calls()),
+    lambda app: list(app.iter_calls_since()),
+    lambda app: app.calls_frame(backend='array')['id'],
+])
+def test_streams_retried(app, box, iterate):
+    box.fail_next(2)
+    assert len(iterate(app)) == 50
+
+
+def test_stream_fails_once_retries_are_spent(app, box):
+    box.fail_next(3)
+    with pytest.raises(FbxRequestError) as e:
+        list(app.iter_calls())
+    assert e.value.err_code == 'ratelimited'
+
+
+def test_stream_renews_expired_session(app, box):
+    box.expire_sessions()
+    assert len(list(app.iter_calls())) == 50
+
+
+def test_post_replayed_only_when_rejected(app, box, requests_to):
+    contacts = len(box.tables['contact'].rows)
+    box.fail_next(1)
+    app.new_contact({'display_name': 'Rejected once'})
+    assert len(box.tables['contact'].rows) == contacts + 1
+
+    # the box may have created it before failing: not replayed
+    app.reset_stats()
+    box.fail_next(1, error_code='internal_error', status=500)
+    with pytest.raises(FbxRequestError):
+        app.request_result('/contact/', method='POST',
+                           data={'display_name': 'Failed once'})
+    assert requests_to(app, NEW_CONTACT) == 1
+
+
+def test_rate_limit(make_app):
+    app = make_app(rate_limit=20, burst=1)
+    start = time.time()
+    for _ in range(6):
+        app.request_result('/call/log/')
+    # the first request used the burst, the next five waited 1/20 s each
+    assert time.time() - start >= 5 / 20.0 * 0.9
+
+
+def test_retry_policy_delays():
+    policy = RetryPolicy(retries=3, backoff=0.5, max_backoff=1.0)
+    for attempt in range(5):
+        assert 0 <= policy.delay(attempt) <= min(1.0, 0.5 * 2 ** attempt)
+
+
+def test_writes_return_the_object(app, box):
+    contact = app.new_contact({'display_name': 'Created'})
+    assert contact.id in box.tables['contact'].rows
+    updated = app.set_contact(contact.id, {'display_name': 'Updated'})
+    assert (updated.id, updated.display_name) == (contact.id, 'Updated')
+    assert app.delete_contact(contact.id) is True
+    assert contact.id not in box.tables['contact'].rows
+
+
+@pytest.mark.parametrize('write', [
+    lambda app: app.new_contact({'display_name': 'Not created'}),
+    lambda app: app.set_contact(1, {'display_name': 'Not updated'}),
+    lambda app: app.delete_contact(1),
+])
+def test_writes_raise_once_retries_are_spent(app, box, capsys, write):
+    box.fail_next(3)
+    with pytest.raises(FbxRequestError) as e:
+        write(app)
+    assert e.value.err_code == 'ratelimited'
+    assert box.tables['contact'].get(1)['display_name'] != 'Not updated'
+    assert capsys.readouterr().out == ''
+
+
+def test_write_of_missing_object_raises(app):
+    with pytest.raises(FbxRequestError) as e:
+        app.set_contact(9999, {'display_name': 'Nobody'})
+    assert e.value.err_code == 'noent'
+    with pytest.raises(FbxRequestError) as e:
+        app.delete_contact(9999)
+    assert e.value.err_code == 'noent'
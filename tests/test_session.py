@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+import json
+import os
+
+from fbxtools.fbx import Fbx
+
+LOGIN = 'POST /login/session/'
+
+
+def test_session_reused_by_next_run(box, app_files, requests_to):
+    app_infos, app_auth = app_files
+    first = Fbx(box.url, app_infos=app_infos, app_auth=app_auth, mute=True)
+    token = first.get_session_token()
+    assert requests_to(first, LOGIN) == 1
+    assert os.path.exists(first.app_session)
+
+    second = Fbx(box.url, app_infos=app_infos, app_auth=app_auth, mute=True)
+    assert second.get_session_token() == token
+    assert requests_to(second, LOGIN) == 0
+    assert len(second.get_calls()) == 50
+
+
+def test_session_file_derived_from_app_auth(box, app_files):
+    app_infos, app_auth = app_files
+    app = Fbx(box.url, app_infos=app_infos, app_auth=app_auth, mute=True)
+    assert app.app_session == app_auth[:-len('.json')] + '.session.json'
+
+
+def test_expired_session_logs_in_again(app, box, requests_to):
+    box.expire_sessions()
+    app.reset_stats()
+    assert len(app.get_calls()) == 50
+    assert requests_to(app, LOGIN) == 1
+
+
+def test_use_cache_false_forces_login(box, app_files, requests_to):
+    app_infos, app_auth = app_files
+    app = Fbx(box.url, app_infos=app_infos, app_auth=app_auth, mute=True)
+    token = app.get_session_token()
+    assert app.get_session_token(use_cache=False) != token
+    assert requests_to(app, LOGIN) == 2
+
+
+def test_boxes_sharing_a_directory_keep_their_session(box, other_box, tmp_path, requests_to):
+    directory = str(tmp_path)
+    files = {}
+    for name, target in (('a', box), ('b', other_box)):
+        files[name] = (target,) + target.write_app_files(directory, prefix=name)
+    # both boxes gave their first track_id
+    track_ids = [json.load(open(app_auth))['track_id']
+                 for target, app_infos, app_auth in files.values()]
+    assert track_ids == [1, 1]
+
+    tokens = {}
+    for run in range(2):
+        for name, (target, app_infos, app_auth) in sorted(files.items()):
+            app = Fbx(target.url, app_infos=app_infos, app_auth=app_auth,
+                      mute=True)
+            tokens.setdefault(name, set()).add(app.get_session_token())
+            assert requests_to(app, LOGIN) == (1 if run == 0 else 0)
+            assert len(app.get_calls()) == len(target.dataset.calls)
+    assert len(tokens['a']) == len(tokens['b']) == 1
+    assert tokens['a'] != tokens['b']
+
+
+def test_session_not_sent_to_another_box(box, other_box, app_files, requests_to):
+    app_infos, app_auth = app_files
+    auth = json.load(open(app_auth))
+    other_box.register_app('fr.freebox.fbxtools', app_token=auth['app_token'])
+    token = Fbx(box.url, app_infos=app_infos, app_auth=app_auth,
+                mute=True).get_session_token()
+
+    app = Fbx(other_box.url, app_infos=app_infos, app_auth=app_auth, mute=True)
+    assert app.get_session_token() != token
+    assert requests_to(app, LOGIN) == 1
+
+
+def test_session_not_reused_with_another_app_token(box, app_files, requests_to):
+    app_infos, app_auth = app_files
+    Fbx(box.url, app_infos=app_infos, app_auth=app_auth,
+        mute=True).get_session_token()
+    # same track_id, another token: the stored session is not for it
+    app_token, track_id = box.register_app('fr.freebox.fbxtools')
+    with open(app_auth, 'w') as f:
+        json.dump({'app_token': app_token, 'track_id': 1}, f)
+
+    app = Fbx(box.url, app_infos=app_infos, app_auth=app_auth, mute=True)
+    app.get_session_token()
+    assert requests_to(app, LOGIN) == 1
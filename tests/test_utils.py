@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+
+import json
+import os
+
+import pytest
+
+from fbxtools.fakebox import API_VERSION
+from fbxtools.utils import api_cache_key, get_url_api, parse_api_cache_file
+
+# nothing listens there: the connection is refused at once
+DEAD_HOST = '127.0.0.1:1'
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return str(tmp_path / 'cache' / 'api_config.json')
+
+
+def box_host(box):
+    return '%s:%d' % (box.host, box.port)
+
+
+def api_url(box):
+    return 'http://%s/api/v%s' % (box.host, API_VERSION.split('.')[0])
+
+
+def test_discovery_cached_per_hosts(box, cache_file):
+    hosts = [box_host(box)]
+    url = get_url_api(hosts=hosts, cache_file=cache_file)
+    assert url == api_url(box)
+    entries = parse_api_cache_file(cache_file)
+    assert list(entries) == [api_cache_key(hosts)]
+    assert entries[api_cache_key(hosts)]['host'] == box_host(box)
+
+    box.stop()
+    # served from the cache entry of these hosts only
+    assert get_url_api(hosts=hosts, cache_file=cache_file) == url
+    with pytest.raises(Exception):
+        get_url_api(hosts=[DEAD_HOST], cache_file=cache_file, timeout=0.5)
+
+
+def test_first_answer_wins(box, cache_file):
+    url = get_url_api(hosts=[DEAD_HOST, box_host(box)], cache_file=cache_file)
+    assert url == api_url(box)
+
+
+def test_stale_cache_used_when_no_host_answers(box, cache_file):
+    hosts = [box_host(box)]
+    url = get_url_api(hosts=hosts, cache_file=cache_file)
+    box.stop()
+    assert get_url_api(hosts=hosts, cache_file=cache_file, ttl=0,
+                       timeout=0.5) == url
+    with pytest.raises(Exception):
+        get_url_api(hosts=hosts, cache_file=cache_file, use_cache=False,
+                    timeout=0.5)
+
+
+def test_invalid_cache_file_ignored(box, cache_file):
+    os.makedirs(os.path.dirname(cache_file))
+    with open(cache_file, 'w') as f:
+        f.write('{"host": "old format"')
+    assert parse_api_cache_file(cache_file) == {}
+    get_url_api(hosts=[box_host(box)], cache_file=cache_file)
+    with open(cache_file) as f:
+        assert list(json.load(f)['entries']) == [box_host(box)]
+
+
+def test_api_cache_key():
+    assert api_cache_key(None) == ''
+    assert api_cache_key(['b', 'a']) == api_cache_key(('a', 'b')) == 'a,b'
+